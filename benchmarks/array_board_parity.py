@@ -0,0 +1,77 @@
+from os.path import dirname, abspath, join
+import sys
+THIS_DIR = dirname(__file__)
+CODE_DIR = abspath(join(THIS_DIR, '..'))
+sys.path.append(CODE_DIR)
+import itertools
+import random
+import time
+import numpy as np
+from kaggle_environments import make
+from kaggle_environments.envs.halite.helpers import *
+from halite_rl.environments.helpers.array_board import array_board
+from halite_rl.environments.helpers.random_agent import random_agent
+
+# NOTE: rules parity of array_board against the kaggle Board. Seeded random games for every combination of player
+# count, board size and move cost: each turn random_agent picks the actions on the kaggle Board, the same actions are
+# set on the array_board by id, both step with next() and have to agree on cell halite, ship ids, positions and cargo,
+# shipyard ids and positions and player halite, any mismatch is an assert naming the game and the turn. Then both
+# next() are timed on the same games.
+
+_player_counts = [1, 2, 4]
+_board_sizes = [5, 10, 15, 21]
+_move_costs = [0.0, 0.1]
+_turns = 150
+_seed = 1234
+_tolerance = 1e-9
+
+
+def assert_same(game, turn, board, other):
+    expected, actual = board.observation, other.observation
+    assert board.step == other.step, (game, turn, board.step, other.step)
+    assert np.allclose(expected['halite'], actual['halite'], rtol=0, atol=_tolerance), (game, turn, 'halite')
+    for player_id, (expected_player, actual_player) in enumerate(zip(expected['players'], actual['players'])):
+        where = (game, turn, player_id)
+        assert abs(expected_player[0] - actual_player[0]) <= _tolerance, where + ('player halite',)
+        assert expected_player[1] == actual_player[1], where + ('shipyards',)
+        assert list(expected_player[2]) == list(actual_player[2]), where + ('ship ids',)
+        for ship_id, (position, cargo) in expected_player[2].items():
+            assert actual_player[2][ship_id][0] == position, where + (ship_id, 'position')
+            assert abs(actual_player[2][ship_id][1] - cargo) <= _tolerance, where + (ship_id, 'cargo')
+
+
+def parity_game(game, player_count, board_size, move_cost):
+    # (turns played, seconds in Board.next(), seconds in array_board.next())
+    environment = make('halite', configuration={'size': board_size, 'startingHalite': 5000, 'moveCost': move_cost,
+                                                'episodeSteps': _turns + 1, 'randomSeed': _seed + game})
+    environment.reset(player_count)
+    observation = environment.state[0].observation
+    board = Board(observation, environment.configuration)
+    other = array_board(observation, environment.configuration)
+    board_seconds, other_seconds = 0.0, 0.0
+    for turn in range(_turns):
+        for player in board.players.values():
+            random_agent(board, player)
+        for ship in board.ships.values():
+            other.ships[ship.id].next_action = ship.next_action
+        for shipyard in board.shipyards.values():
+            other.shipyards[shipyard.id].next_action = shipyard.next_action
+        start = time.perf_counter()
+        board = board.next()
+        board_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        other = other.next()
+        other_seconds += time.perf_counter() - start
+        assert_same(game, turn, board, other)
+    return_object = (_turns, board_seconds, other_seconds)
+    return return_object
+
+
+if __name__ == '__main__':
+    random.seed(_seed)
+    cases = list(itertools.product(_player_counts, _board_sizes, _move_costs))
+    for game, (player_count, board_size, move_cost) in enumerate(cases):
+        turns, board_seconds, other_seconds = parity_game(game, player_count, board_size, move_cost)
+        print(f'{player_count} players, size {board_size}, moveCost {move_cost}: {turns} turns identical, next() '
+              f'{board_seconds / turns * 1e6:.0f} us (kaggle Board), {other_seconds / turns * 1e6:.0f} us '
+              f'(array_board)')
@@ -0,0 +1,121 @@
+from os.path import dirname, abspath, join
+import sys
+THIS_DIR = dirname(__file__)
+CODE_DIR = abspath(join(THIS_DIR, '..'))
+sys.path.append(CODE_DIR)
+import time
+import numpy as np
+from kaggle_environments.envs.halite.helpers import *
+from halite_rl.environments.helpers.board_template import board_template
+from halite_rl.environments.helpers.random_agent import random_agent
+from halite_rl.environments.halite_v1.helpers.pixel_encoder import pixel_encoder, board_halite
+
+# NOTE: micro-benchmark of the 3 channel pixel observation, the old per cell loops of halite_v1 get_state and
+# halite_v2 get_state_v2 (copied below) against pixel_encoder, on boards from random games at sizes 15, 21 and 32.
+# pixel_encoder is timed on a kaggle observation (encode) and on the kaggle Board itself (encode_board, what the envs
+# call), board.observation alone for reference.
+
+_board_sizes = [15, 21, 32]
+_turns = 100
+_repeats = 5
+
+
+def get_state_loop_v1(board, actionable_object_id, actionable_type):
+    # halite_v1 get_state before pixel_encoder, the pixel part
+    size = board.configuration.size
+    pixels = []
+    for x in range(0, size):
+        row = []
+        for y in range(0, size):
+            cell = board[(x, size - y - 1)]
+            cell_halite = 1.0 * cell.halite / float(board.configuration.max_cell_halite)
+
+            pixel = [0, 0, 0]
+            if cell.ship is not None:
+                if actionable_type == 'ship' and cell.ship.id == actionable_object_id:
+                    pixel[1] = 1
+                else:
+                    pixel[1] = 0.5
+            elif cell.shipyard is not None:
+                if actionable_type == 'shipyard' and cell.shipyard.id == actionable_object_id:
+                    pixel[2] = 1
+                else:
+                    pixel[2] = 0.5
+            pixel[0] = cell_halite
+            row.append(np.array(pixel))
+        pixels.append(np.array(row))
+    return np.array(pixels, dtype=np.float32)
+
+
+def get_state_loop_v2(board, board_size):
+    # halite_v2 get_state_v2 before pixel_encoder, without the gaussian_board of the reward heatmap
+    reward_heatmap = np.zeros([board_size, board_size])
+    state_pixels = np.zeros([3, board_size, board_size], dtype=np.float32)
+    for x in range(0, board_size):
+        for y in range(0, board_size):
+            cell = board[(x, board_size - y - 1)]
+            cell_halite = 1.0 * cell.halite / float(board.configuration.max_cell_halite)
+            cell_halite_heat = 255 * cell.halite / float(board.configuration.max_cell_halite)
+            reward_heatmap[y, x] = cell_halite_heat
+            state_pixels[0, y, x] = cell_halite
+            if cell.ship is not None:
+                if cell.ship.player_id == 0:
+                    state_pixels[1, y, x] = 1
+                else:
+                    state_pixels[1, y, x] = 0.5
+            elif cell.shipyard is not None:
+                if cell.shipyard.player_id == 0:
+                    state_pixels[2, y, x] = 1
+                else:
+                    state_pixels[2, y, x] = 0.5
+    return state_pixels, reward_heatmap
+
+
+def random_game_boards(board_size):
+    # kaggle Boards of one random game (both players random)
+    template = board_template({"size": board_size, "startingHalite": 1000, "episodeSteps": _turns}, 2,
+                              [('ship', ShipAction.CONVERT), ('shipyard', ShipyardAction.SPAWN)])
+    board = template.new_game()[-1].to_board()
+    boards = []
+    for _ in range(_turns):
+        boards.append(board)
+        for player in board.players.values():
+            random_agent(board, player)
+        board = board.next()
+    return boards
+
+
+def microseconds_per_call(encode, inputs):
+    best = float('inf')
+    for _ in range(_repeats):
+        start = time.perf_counter()
+        for value in inputs:
+            encode(value)
+        best = min(best, (time.perf_counter() - start) / len(inputs) * 1e6)
+    return best
+
+
+if __name__ == '__main__':
+    for board_size in _board_sizes:
+        boards = random_game_boards(board_size)
+        observations = [board.observation for board in boards]
+        encoder = pixel_encoder(board_size, boards[0].configuration.max_cell_halite)
+
+        # same values as the loops on every board, one hot on player 0's first ship
+        for board, obs in zip(boards, observations):
+            ship_id = board.players[0].ships[0].id if board.players[0].ships else None
+            expected = get_state_loop_v1(board, ship_id, 'ship')
+            assert np.array_equal(encoder.encode(obs, ship_id=ship_id).transpose(2, 1, 0), expected)
+            assert np.array_equal(encoder.encode_board(board, ship_id=ship_id).transpose(2, 1, 0), expected)
+            expected, expected_heatmap = get_state_loop_v2(board, board_size)
+            assert np.array_equal(encoder.encode(obs, player_id=0), expected)
+            assert np.array_equal(encoder.encode_board(board, player_id=0), expected)
+            max_cell_halite = float(board.configuration.max_cell_halite)
+            assert np.array_equal(255 * board_halite(board) / max_cell_halite, expected_heatmap)
+
+        before = microseconds_per_call(lambda board: get_state_loop_v1(board, None, 'UNKNOWN'), boards)
+        after = microseconds_per_call(lambda obs: encoder.encode(obs), observations)
+        after_board = microseconds_per_call(lambda board: encoder.encode_board(board), boards)
+        observation = microseconds_per_call(lambda board: board.observation, boards)
+        print(f'size {board_size}: loop {before:.0f} us, pixel_encoder {after:.1f} us (observation), '
+              f'{after_board:.1f} us (Board), board.observation {observation:.0f} us')
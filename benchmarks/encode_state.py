@@ -0,0 +1,118 @@
+from os.path import dirname, abspath, join
+import sys
+THIS_DIR = dirname(__file__)
+CODE_DIR = abspath(join(THIS_DIR, '..'))
+sys.path.append(CODE_DIR)
+import time
+import numpy as np
+import scipy as sp
+from scipy import ndimage
+from kaggle_environments.envs.halite.helpers import *
+from halite_rl.environments.helpers.array_board import array_board
+from halite_rl.environments.helpers.board_template import board_template
+from halite_rl.environments.helpers.random_agent import random_agent
+from halite_rl.environments.halite_v4.helpers.state_encoder import state_encoder
+
+# NOTE: micro-benchmark of the halite_v4 observation encoder, the old per entity loop (copied below) against
+# state_encoder, on boards from random games at sizes 15 and 21, for both board backends.
+
+_board_sizes = [15, 21]
+_turns = 100
+_repeats = 5
+
+
+def get_state_v2_loop(board, board_size, channels, ship_in_question_id, target):
+    # halite_v4 get_state_v2 before state_encoder
+    attract_heatmap = np.zeros([board_size, board_size])
+    detract_heatmap = np.zeros([board_size, board_size])
+    self_location = np.zeros([board_size, board_size])
+    state = np.zeros([channels, board_size, board_size])
+    navigation_map = np.full([board_size, board_size], 0.5)
+
+    attract_heatmap_topoff_location = None
+    detract_heatmap_topoff_location = []
+
+    hot_spot = board_size * 10
+
+    for ship_id in board.ships:
+        ship = board.ships[ship_id]
+        if not ship.player_id == 0:
+            detract_heatmap[board_size - ship.position.y - 1, ship.position.x] = hot_spot
+            detract_heatmap_topoff_location.append((board_size - ship.position.y - 1, ship.position.x))
+        if ship.id == ship_in_question_id:
+            self_location[board_size - ship.position.y - 1, ship.position.x] = 1.0
+        if ship_id == ship_in_question_id and target is not None:
+            target_location = (board_size - target[0] - 1, target[1])
+            attract_heatmap[target_location] = hot_spot * 50
+            attract_heatmap_topoff_location = target_location
+    for shipyard_id in board.shipyards:
+        shipyard = board.shipyards[shipyard_id]
+        if not shipyard.player_id == 0:
+            detract_heatmap[board_size - shipyard.position.y - 1, shipyard.position.x] = hot_spot
+
+    attract_heatmap = sp.ndimage.gaussian_filter(attract_heatmap, [board_size / 3, board_size / 3], mode='constant')
+    detract_heatmap = sp.ndimage.gaussian_filter(detract_heatmap, [board_size / 20, board_size / 20], mode='constant')
+
+    if attract_heatmap_topoff_location is not None:
+        attract_heatmap[attract_heatmap_topoff_location] = hot_spot
+    for _ in detract_heatmap_topoff_location:
+        detract_heatmap[_] = hot_spot
+
+    attract_heatmap_max = np.max(attract_heatmap)
+    if attract_heatmap_max > 0:
+        attract_heatmap = ((attract_heatmap * 0.5) / attract_heatmap_max)
+    detract_heatmap_max = np.max(detract_heatmap)
+    if detract_heatmap_max > 0:
+        detract_heatmap = ((detract_heatmap * 0.5) / detract_heatmap_max)
+
+    navigation_map += attract_heatmap
+    navigation_map -= detract_heatmap
+    state[0] = navigation_map
+    state[1] = self_location
+    return state
+
+
+def random_game_boards(board_size):
+    # boards of one random game (both players random), the kaggle Board and the array_board of every turn
+    template = board_template({"size": board_size, "startingHalite": 1000, "episodeSteps": _turns}, 2,
+                              [('ship', ShipAction.CONVERT), ('shipyard', ShipyardAction.SPAWN)])
+    kaggle_board = template.new_game()[-1].to_board()
+    boards = []
+    for _ in range(_turns):
+        boards.append((kaggle_board, array_board(kaggle_board.observation, kaggle_board.configuration)))
+        for player in kaggle_board.players.values():
+            random_agent(kaggle_board, player)
+        kaggle_board = kaggle_board.next()
+    return boards
+
+
+def steps_per_second(encode, boards):
+    best = 0
+    for _ in range(_repeats):
+        start = time.perf_counter()
+        for board in boards:
+            encode(board)
+        best = max(best, len(boards) / (time.perf_counter() - start))
+    return best
+
+
+if __name__ == '__main__':
+    for board_size in _board_sizes:
+        boards = random_game_boards(board_size)
+        ship_id = boards[0][1].players[0].ships[0].id
+        target = (board_size // 2, board_size // 2)
+        encoder = state_encoder(board_size)
+
+        # both encoders agree on every board (float32 vs float64)
+        for kaggle_board, board in boards:
+            expected = get_state_v2_loop(kaggle_board, board_size, 2, ship_id, target)
+            assert np.allclose(encoder.encode(kaggle_board, ship_id, target), expected, atol=1e-5)
+            assert np.allclose(encoder.encode(board, ship_id, target), expected, atol=1e-5)
+
+        kaggle_boards = [kaggle_board for kaggle_board, _ in boards]
+        array_boards = [board for _, board in boards]
+        before = steps_per_second(lambda b: get_state_v2_loop(b, board_size, 2, ship_id, target), kaggle_boards)
+        after_kaggle = steps_per_second(lambda b: encoder.encode(b, ship_id, target), kaggle_boards)
+        after_numpy = steps_per_second(lambda b: encoder.encode(b, ship_id, target), array_boards)
+        print(f'size {board_size}: loop {before:.0f} steps/s, state_encoder {after_kaggle:.0f} steps/s (kaggle Board), '
+              f'{after_numpy:.0f} steps/s (array_board)')
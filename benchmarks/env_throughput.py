@@ -0,0 +1,407 @@
+from os.path import dirname, abspath, join
+import sys
+THIS_DIR = dirname(__file__)
+CODE_DIR = abspath(join(THIS_DIR, '..'))
+sys.path.append(CODE_DIR)
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import numpy as np
+
+# NOTE: throughput benchmark of every environment, driven by a fixed seed random policy. Each (env, board size) runs in
+# its own process (own peak RSS, a broken env only fails its own case) inside a scratch working directory that holds
+# the config.json / agent files the envs read from the cwd. Per case: construction time, reset latency, env steps/sec
+# (game steps/sec for the batched env, ship steps/sec for the fleet env), observation encode time, render time and
+# peak RSS. Rendering is off while steps are timed wherever the env allows it (halite_v0 always renders) and is timed
+# on its own; windows are not shown unless --show, so only the drawing is measured. Results go to a JSON file per commit, --baseline compares against an
+# earlier one and exits 1 on a regression. encode_state.py is the micro-benchmark of the v4 encoder alone.
+#   python benchmarks/env_throughput.py [--envs halite_v4,halite_v4_batched] [--sizes 15,21] [--baseline old.json]
+
+_seed = 1234
+_steps = 300
+_resets = 10
+_repeats = 50
+_tolerance = 0.1
+_batch_size = 8
+_fleet_size = 4
+
+# lower is better for these, higher for steps per second
+_timings = ['construct_s', 'reset_ms', 'encode_us', 'render_ms']
+_rates = ['steps_per_sec', 'game_steps_per_sec']
+
+
+def halite_v0(size):
+    from halite_rl.environments.halite_v0.env import halite
+    env = halite('Benchmark')
+    return_object = {'env': env, 'render_in_step': True,
+                     'encode': lambda: env.get_state(),
+                     'render': lambda: env.halite_image_render.render_board(env.board, 0, 0)}
+    return return_object
+
+
+def halite_v1(size):
+    from halite_rl.environments.halite_v1.env import halite
+    env = halite('Benchmark', render_me=False)
+    return_object = {'env': env,
+                     'encode': lambda: env.get_state(),
+                     'render': lambda: env.halite_image_render.render_board(env.board, 0, 0)}
+    return return_object
+
+
+def halite_v2(size):
+    from halite_rl.environments.halite_v2.env import halite_ship_navigation
+    env = halite_ship_navigation('Benchmark', render_me=False, board_size=size)
+    return_object = {'env': env,
+                     'encode': lambda: env.get_state_v2(),
+                     'render': lambda: env.halite_image_render.render_board(
+                         env.board, *env.get_state_v2(), total_reward=0, this_step_reward=0, window_name='Benchmark')}
+    return return_object
+
+
+def halite_v3(size):
+    from halite_rl.environments.halite_v3.env import halite_ship_navigation
+    env = halite_ship_navigation('Benchmark', render_me=False, board_size=size)
+    return_object = {'env': env,
+                     'encode': lambda: env.get_state_v2(),
+                     'render': lambda: env.halite_image_render.render_board(
+                         env.board, *env.get_state_v2(), total_reward=0, this_step_reward=0, window_name='Benchmark')}
+    return return_object
+
+
+def halite_v4(size, backend='kaggle'):
+    # seeded, so both backends play the same episodes
+    from halite_rl.environments.halite_v4.env import halite_ship_navigation
+    from halite_rl.environments.halite_v4.helpers.headless_render import headless_render
+    env = halite_ship_navigation('Benchmark', render_me=False, backend=backend, board_size=size, seed=_seed)
+    renderer = headless_render(size)
+    return_object = {'env': env,
+                     'encode': lambda: env.get_state_v2(),
+                     'render': lambda: renderer.render_board(env.board, env.state)}
+    return return_object
+
+
+def halite_v4_numpy(size):
+    return_object = halite_v4(size, backend='numpy')
+    return return_object
+
+
+def halite_v4_batched(size):
+    from halite_rl.environments.halite_v4.batched_env import batched_halite_ship_navigation
+    from halite_rl.environments.halite_v4.helpers.headless_render import headless_render
+    env = batched_halite_ship_navigation('Benchmark', batch_size=_batch_size, render_me=False, board_size=size,
+                                         seed=_seed)
+    renderer = headless_render(size)
+    return_object = {'env': env,
+                     'encode': lambda: env.get_state_v2(),
+                     'render': lambda: renderer.render_board(env.board.board(0), env.state[0])}
+    return return_object
+
+
+def halite_v4_fleet(size):
+    from halite_rl.environments.halite_v4.fleet_env import fleet_halite_ship_navigation
+    from halite_rl.environments.halite_v4.helpers.headless_render import headless_render
+    env = fleet_halite_ship_navigation('Benchmark', fleet_size=_fleet_size, render_me=False, board_size=size,
+                                       seed=_seed)
+    renderer = headless_render(size)
+    return_object = {'env': env,
+                     'encode': lambda: env.get_state_v2(),
+                     'render': lambda: renderer.render_board(env.board, env.state[0])}
+    return return_object
+
+
+def halite_wrapper_v0(size):
+    sys.path.append(join(CODE_DIR, 'halite_rl'))
+    from halite_rl.HaliteWrapperV0 import HaliteWrapperV0
+    env = HaliteWrapperV0()
+    return_object = {'env': env, 'render_in_step': True,
+                     'encode': lambda: env.get_state(),
+                     'render': lambda: env.halite_image_render.render_board(env.board)}
+    return return_object
+
+
+def find_the_dot_v0(size):
+    from susman_rl.environments.find_the_dot_v0.env import find_the_dot
+    env = find_the_dot('Benchmark')
+    env.enable_render_image = False
+    return_object = {'env': env,
+                     'encode': lambda: env.render_new_state(),
+                     'render': lambda: render_find_the_dot(env)}
+    return return_object
+
+
+def find_the_dot_v1(size):
+    from susman_rl.environments.find_the_dot_v1.env import find_the_dot
+    env = find_the_dot('Benchmark')
+    env.enable_render_image = False
+    return_object = {'env': env,
+                     'encode': lambda: env.render_new_state(),
+                     'render': lambda: render_find_the_dot(env)}
+    return return_object
+
+
+def render_find_the_dot(env):
+    env.enable_render_image = True
+    env.render_image()
+    env.enable_render_image = False
+
+
+def sample_code_halite_gym(size):
+    from halite_rl.SampleCode import HaliteGym, transform_observation
+    env = HaliteGym()
+    return_object = {'env': env,
+                     'encode': lambda: transform_observation(env.obs, env.config),
+                     'render': None}
+    return return_object
+
+
+# env: (factory, board sizes), fixed size envs ignore --sizes
+_envs = {
+    'halite_v0': (halite_v0, None, [5]),
+    'halite_v1': (halite_v1, None, [5]),
+    'halite_v2': (halite_v2, [15, 25], None),
+    'halite_v3': (halite_v3, [5, 15], None),
+    'halite_v4': (halite_v4, [15, 21], None),
+    'halite_v4_numpy': (halite_v4_numpy, [15, 21], None),
+    'halite_v4_batched': (halite_v4_batched, [15, 21], None),
+    'halite_v4_fleet': (halite_v4_fleet, [15, 21], None),
+    'halite_wrapper_v0': (halite_wrapper_v0, None, [5]),
+    'find_the_dot_v0': (find_the_dot_v0, None, [5]),
+    'find_the_dot_v1': (find_the_dot_v1, None, [5]),
+    'sample_code_halite_gym': (sample_code_halite_gym, None, [10]),
+}
+
+
+def milliseconds(samples, scale=1000.0):
+    samples = np.array(samples) * scale
+    return_object = {'mean': float(samples.mean()), 'p50': float(np.percentile(samples, 50)),
+                     'p90': float(np.percentile(samples, 90))}
+    return return_object
+
+
+def random_actions(spec, batch_size, rng):
+    # uniform over the bounded action spec, one action per game for a batched env
+    shape = spec.shape if batch_size is None else (batch_size,) + tuple(spec.shape)
+    if np.issubdtype(spec.dtype, np.integer):
+        return_object = rng.integers(spec.minimum, spec.maximum + 1, size=shape).astype(spec.dtype)
+    else:
+        return_object = rng.uniform(spec.minimum, spec.maximum, size=shape).astype(spec.dtype)
+    return return_object
+
+
+def run_case(name, board_size, steps, resets, repeats, show):
+    random.seed(_seed)
+    np.random.seed(_seed)
+    rng = np.random.default_rng(_seed)
+    import cv2
+    if not show:
+        cv2.imshow = lambda *args, **kwargs: None
+        cv2.waitKey = lambda *args, **kwargs: -1
+
+    factory = _envs[name][0]
+    start = time.perf_counter()
+    case = factory(board_size)
+    construct_s = time.perf_counter() - start
+    env = case['env']
+    batch_size = env.batch_size if env.batched else None
+
+    reset_times = []
+    for _ in range(resets):
+        start = time.perf_counter()
+        time_step = env.reset()
+        reset_times.append(time.perf_counter() - start)
+
+    action_spec = env.action_spec()
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        time_step = env.step(random_actions(action_spec, batch_size, rng))
+        finished = int(np.sum(time_step.is_last()))
+        episodes += finished
+        if finished > 0 and batch_size is None:
+            env.reset()
+    step_s = time.perf_counter() - start
+
+    encode_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        case['encode']()
+        encode_times.append(time.perf_counter() - start)
+
+    # a renderer that fails only loses the render timing
+    render_times = []
+    render_error = None
+    if case['render'] is not None:
+        try:
+            for _ in range(repeats):
+                start = time.perf_counter()
+                case['render']()
+                render_times.append(time.perf_counter() - start)
+        except Exception as error:
+            render_times = []
+            render_error = f'{type(error).__name__}: {str(error).strip().splitlines()[-1]}'
+
+    return_object = {'env': name, 'board_size': board_size, 'batch_size': batch_size, 'construct_s': construct_s,
+                     'reset_ms': milliseconds(reset_times), 'steps': steps, 'episodes': episodes,
+                     'steps_per_sec': steps / step_s, 'game_steps_per_sec': steps * (batch_size or 1) / step_s,
+                     'render_in_step': case.get('render_in_step', False),
+                     'encode_us': milliseconds(encode_times, 1e6),
+                     'render_ms': milliseconds(render_times) if render_times else None, 'render_error': render_error,
+                     'peak_rss_mb': peak_rss_mb()}
+    return return_object
+
+
+def peak_rss_mb():
+    # resource is unix only, ru_maxrss is KB on linux and bytes on mac
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return_object = peak / (1024.0 ** 2 if sys.platform == 'darwin' else 1024.0)
+    return return_object
+
+
+def scratch_dir():
+    # the working directory of a case: config.json (find_the_dot), idle.py (SampleCode agents), image dirs
+    directory = tempfile.mkdtemp(prefix='env_throughput_')
+    stills = {'dir': 'stills', 'name': 'benchmark'}
+    config = {'files': {'policy': {'base_dir': directory, 'images': {'stills': stills}}}}
+    with open(join(directory, 'config.json'), 'w') as f:
+        json.dump(config, f)
+    os.makedirs(join(directory, 'stills', 'benchmark'), exist_ok=True)
+    shutil.copy(join(CODE_DIR, 'halite_rl', 'idle.py'), directory)
+    return directory
+
+
+def spawn_case(name, board_size, arguments):
+    directory = scratch_dir()
+    result_path = join(directory, 'result.json')
+    command = [sys.executable, abspath(__file__), '--case', name, '--board-size', str(board_size),
+               '--result', result_path, '--steps', str(arguments.steps), '--resets', str(arguments.resets),
+               '--repeats', str(arguments.repeats)] + (['--show'] if arguments.show else [])
+    worker_env = dict(os.environ, PYTHONPATH=os.pathsep.join([CODE_DIR] + sys.path))
+    try:
+        completed = subprocess.run(command, cwd=directory, env=worker_env, capture_output=True, text=True,
+                                   timeout=arguments.timeout)
+        if os.path.exists(result_path):
+            with open(result_path) as f:
+                return_object = json.load(f)
+        else:
+            error = (completed.stderr.strip().splitlines() or [f'exit code {completed.returncode}'])[-1]
+            return_object = {'env': name, 'board_size': board_size, 'error': error}
+    except subprocess.TimeoutExpired:
+        return_object = {'env': name, 'board_size': board_size, 'error': f'timeout after {arguments.timeout}s'}
+    shutil.rmtree(directory, ignore_errors=True)
+    return return_object
+
+
+def git_commit():
+    try:
+        return_object = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=CODE_DIR, capture_output=True, text=True,
+                                       check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return_object = None
+    return return_object
+
+
+def compare(results, baseline, tolerance):
+    # regressions of more than tolerance against the baseline run, per (env, board size) and metric
+    old_cases = {(case['env'], case['board_size']): case for case in baseline['results'] if 'error' not in case}
+    regressions = []
+    for case in results['results']:
+        old = old_cases.get((case['env'], case['board_size']))
+        if old is None or 'error' in case:
+            continue
+        for metric in _timings + _rates:
+            new_value, old_value = case.get(metric), old.get(metric)
+            if new_value is None or old_value is None:
+                continue
+            if isinstance(new_value, dict):
+                new_value, old_value = new_value['p50'], old_value['p50']
+            if old_value <= 0:
+                continue
+            ratio = new_value / old_value
+            regressed = ratio > 1 + tolerance if metric in _timings else ratio < 1 - tolerance
+            print(f'{case["env"]:<24}{case["board_size"]:>4}  {metric:<20}{old_value:>12.3f}{new_value:>12.3f}'
+                  f'{ratio:>8.2f}x' + ('  REGRESSION' if regressed else ''))
+            if regressed:
+                regressions.append((case['env'], case['board_size'], metric))
+    return regressions
+
+
+def summary_line(case):
+    if 'error' in case:
+        return_object = f'{case["env"]:<24}{case["board_size"]:>4}  error: {case["error"]}'
+        return return_object
+    render = 'error' if case['render_error'] else '-' if case['render_ms'] is None else f'{case["render_ms"]["p50"]:.2f}'
+    return_object = (f'{case["env"]:<24}{case["board_size"]:>4}{case["game_steps_per_sec"]:>12.0f}'
+                     f'{case["reset_ms"]["p50"]:>10.2f}{case["encode_us"]["p50"]:>12.1f}{render:>10}'
+                     f'{case["peak_rss_mb"] or 0:>10.0f}')
+    return return_object
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='environment throughput benchmark')
+    parser.add_argument('--envs', default=','.join(_envs), help='comma separated, default all')
+    parser.add_argument('--sizes', default=None, help='board sizes of the sizable envs, default per env')
+    parser.add_argument('--steps', type=int, default=_steps)
+    parser.add_argument('--resets', type=int, default=_resets)
+    parser.add_argument('--repeats', type=int, default=_repeats)
+    parser.add_argument('--timeout', type=int, default=1800, help='seconds per case')
+    parser.add_argument('--show', action='store_true', help='show the render windows')
+    parser.add_argument('--output', default=None, help='default benchmarks/results/env_throughput_<commit>.json')
+    parser.add_argument('--baseline', default=None, help='earlier results to compare against')
+    parser.add_argument('--tolerance', type=float, default=_tolerance)
+    parser.add_argument('--case', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--board-size', type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--result', default=None, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.case is not None:
+        # one case, in the process spawned by spawn_case
+        result = run_case(arguments.case, arguments.board_size, arguments.steps, arguments.resets,
+                          arguments.repeats, arguments.show)
+        with open(arguments.result, 'w') as f:
+            json.dump(result, f)
+        sys.exit(0)
+
+    names = arguments.envs.split(',')
+    unknown = [name for name in names if name not in _envs]
+    if unknown:
+        parser.error(f'unknown envs {unknown}, expected some of {list(_envs)}')
+    sizes = None if arguments.sizes is None else [int(size) for size in arguments.sizes.split(',')]
+
+    commit = git_commit()
+    results = {'commit': commit, 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+               'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+               'seed': _seed, 'steps': arguments.steps, 'resets': arguments.resets, 'repeats': arguments.repeats,
+               'results': []}
+    print(f'{"env":<24}{"size":>4}{"steps/s":>12}{"reset ms":>10}{"encode us":>12}{"render ms":>10}{"rss MB":>10}')
+    for name in names:
+        _, default_sizes, fixed_sizes = _envs[name]
+        for board_size in fixed_sizes or sizes or default_sizes:
+            case = spawn_case(name, board_size, arguments)
+            results['results'].append(case)
+            print(summary_line(case))
+
+    output = arguments.output or join(THIS_DIR, 'results', f'env_throughput_{(commit or "unknown")[:8]}.json')
+    os.makedirs(dirname(abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'results written to {output}')
+
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as f:
+            baseline = json.load(f)
+        print(f'against {arguments.baseline} (commit {baseline.get("commit")}), p50 for distributions')
+        regressions = compare(results, baseline, arguments.tolerance)
+        if regressions:
+            print(f'{len(regressions)} regressions over {arguments.tolerance:.0%}')
+            sys.exit(1)
@@ -0,0 +1,180 @@
+from os.path import dirname, abspath, join
+import sys
+THIS_DIR = dirname(__file__)
+CODE_DIR = abspath(join(THIS_DIR, '..'))
+sys.path.append(CODE_DIR)
+import time
+import numpy as np
+from kaggle_environments import make
+from kaggle_environments.envs.halite.helpers import Board
+from halite_rl.SampleCode import sort_cells, transform_observation, transform_reward, player_totals, \
+    transform_actions, action_slots, N_FEATURES, MAX_SHIP_HALITE, REWARD_WON, REWARD_LOST, MAX_DELTA, \
+    SHIP_ACTIONS, YARD_ACTIONS, N_SHIP_ACTIONS, N_YARD_ACTIONS, MAX_SHIPS, MAX_YARDS
+
+# NOTE: SampleCode's HaliteGym glue against the simulator on a full episode (21x21, 4 random players, 400 steps unless
+# all but one are out before). The old Board based transform_observation / transform_reward / transform_actions
+# (copied below) and the raw observation ones have to agree on every step for every player (random action vectors),
+# then both are timed per step, the new reward with the totals and the actions with the slot table kept like HaliteGym
+# does, next to the simulator's time per step.
+# Importing SampleCode prints the cpu count and makes ./log/, like it always did.
+
+_config = {'episodeSteps': 400, 'size': 21}
+_agents = ['random'] * 4
+_repeats = 3
+
+
+def transform_observation_board(obs, config):
+    # SampleCode transform_observation before the raw observation rewrite
+    board = Board(obs, config)
+    me = board.current_player
+    board_cells = sort_cells(board.cells)
+    features = [[] for _ in range(N_FEATURES)]
+    step, cell_yield, me_yard, me_ship, me_ship_cargo, opp_yard, opp_ship, opp_ship_cargo = features
+    for _, c in board_cells.items():
+        step.append(obs['step'] / config.episodeSteps)
+        cell_yield.append(c.halite / config.maxCellHalite)
+        if c.ship is None:
+            me_ship.append(0)
+            me_ship_cargo.append(0)
+            opp_ship.append(0)
+            opp_ship_cargo.append(0)
+        elif c.ship in me.ships:
+            me_ship.append(1)
+            me_ship_cargo.append(c.ship.halite / MAX_SHIP_HALITE)
+            opp_ship.append(0)
+            opp_ship_cargo.append(0)
+        else:
+            me_ship.append(0)
+            me_ship_cargo.append(0)
+            opp_ship.append(1)
+            opp_ship_cargo.append(c.ship.halite / MAX_SHIP_HALITE)
+        if c.shipyard is None:
+            me_yard.append(0)
+            opp_yard.append(0)
+        elif c.shipyard in me.shipyards:
+            me_yard.append(1)
+            opp_yard.append(0)
+        else:
+            me_yard.append(0)
+            opp_yard.append(1)
+    x_obs = np.vstack(features)
+    x_obs = x_obs.reshape(config.size, config.size, N_FEATURES)
+    return x_obs.astype(np.float32).clip(0, 1)
+
+
+def transform_reward_board(done, last_obs, obs, config):
+    # SampleCode transform_reward before the raw observation rewrite
+    board = Board(obs, config)
+    me = board.current_player
+    nships = len(me.ships)
+    nyards = len(me.shipyards)
+    halite = me.halite
+    cargo = sum(s.halite for s in me.ships)
+    if nships == 0:
+        if nyards == 0:
+            return REWARD_LOST
+        if halite < config.spawnCost:
+            return REWARD_LOST
+    if done:
+        scores = [p.halite for p in board.players.values() if
+                  len(p.ships) > 0 or (len(p.shipyards) > 0 and p.halite >= config.spawnCost)]
+        if halite == max(scores):
+            if scores.count(halite) == 1:
+                return REWARD_WON
+        return REWARD_LOST
+    delta = 0
+    if last_obs is not None:
+        last_me = Board(last_obs, config).current_player
+        delta = (nships - len(last_me.ships)) * config.spawnCost
+        delta += (nyards - len(last_me.shipyards)) * (config.convertCost + config.spawnCost)
+        delta += halite - last_me.halite
+        delta += cargo - sum(s.halite for s in last_me.ships)
+        if nyards == 0:
+            delta -= config.convertCost
+        if nships == 0:
+            delta -= config.spawnCost
+        delta = float(np.clip(delta / MAX_DELTA, -1, 1))
+    return delta + 0.01
+
+
+def transform_actions_board(actions, obs, config):
+    # SampleCode transform_actions before action_slots
+    next_actions = dict()
+    board = Board(obs, config)
+    me = board.current_player
+    si = 0
+    yi = MAX_SHIPS
+    for _, c in sort_cells(board.cells).items():
+        if c.ship in me.ships and si < MAX_SHIPS:
+            ship_action = SHIP_ACTIONS[actions[si]]
+            si += 1
+            if ship_action is not None:
+                next_actions[c.ship.id] = ship_action
+        if c.shipyard in me.shipyards and yi < MAX_SHIPS + MAX_YARDS:
+            yard_action = YARD_ACTIONS[actions[yi]]
+            yi += 1
+            if yard_action is not None:
+                next_actions[c.shipyard.id] = yard_action
+    return next_actions
+
+
+def episode():
+    # (observations per player, one per step, the configuration, simulator seconds per step)
+    env = make('halite', configuration=_config)
+    start = time.perf_counter()
+    env.run(_agents)
+    simulator = (time.perf_counter() - start) / (len(env.steps) - 1)
+    observations = [[dict(step[0].observation, player=player) for step in env.steps] for player in range(len(_agents))]
+    return_object = (observations, env.configuration, simulator)
+    return return_object
+
+
+def old_glue(observations, actions, config):
+    last_obs = None
+    for i, obs in enumerate(observations):
+        transform_actions_board(actions[i], obs, config)
+        transform_observation_board(obs, config)
+        transform_reward_board(i == len(observations) - 1, last_obs, obs, config)
+        last_obs = obs
+
+
+def new_glue(observations, actions, config):
+    last_obs, last_totals = None, None
+    for i, obs in enumerate(observations):
+        slots = action_slots(obs, config)
+        transform_actions(actions[i], obs, config, slots)
+        totals = player_totals(obs)
+        transform_observation(obs, config)
+        transform_reward(i == len(observations) - 1, last_obs, obs, config, totals, last_totals)
+        last_obs, last_totals = obs, totals
+
+
+def milliseconds_per_step(glue, observations, actions, config):
+    best = float('inf')
+    for _ in range(_repeats):
+        start = time.perf_counter()
+        glue(observations, actions, config)
+        best = min(best, (time.perf_counter() - start) / len(observations) * 1e3)
+    return best
+
+
+if __name__ == '__main__':
+    observations, config, simulator = episode()
+    rng = np.random.default_rng(0)
+    actions = np.concatenate([rng.integers(0, N_SHIP_ACTIONS, size=(len(observations[0]), MAX_SHIPS)),
+                              rng.integers(0, N_YARD_ACTIONS, size=(len(observations[0]), MAX_YARDS))], axis=1)
+
+    # same observations, rewards and decoded actions for every player on every step
+    for player_observations in observations:
+        for i, obs in enumerate(player_observations):
+            done = i == len(player_observations) - 1
+            last_obs = player_observations[i - 1] if i > 0 else None
+            assert np.array_equal(transform_observation(obs, config), transform_observation_board(obs, config))
+            assert transform_reward(done, last_obs, obs, config) == transform_reward_board(done, last_obs, obs, config)
+            assert transform_actions(actions[i], obs, config) == transform_actions_board(actions[i], obs, config)
+
+    before = milliseconds_per_step(old_glue, observations[0], actions, config)
+    after = milliseconds_per_step(new_glue, observations[0], actions, config)
+    print(f'{len(observations[0]) - 1} steps, {config.size}x{config.size}, {len(_agents)} players: simulator '
+          f'{simulator * 1e3:.2f} ms per step, transforms {before:.2f} ms per step (Board), {after:.3f} ms per step '
+          f'(raw observation)')
@@ -0,0 +1,107 @@
+from os.path import dirname, abspath, join
+import sys
+THIS_DIR = dirname(__file__)
+CODE_DIR = abspath(join(THIS_DIR, '..'))
+sys.path.append(CODE_DIR)
+import copy
+import random
+import time
+import numpy as np
+from kaggle_environments import make
+from kaggle_environments.envs.halite.helpers import *
+from halite_rl.environments.helpers.array_board import array_board
+from halite_rl.environments.helpers.random_agent import random_agent, vectorized_random_agent
+
+# NOTE: micro-benchmark of the random opponent, the per entity random_agent against vectorized_random_agent on the
+# kaggle Board and on the array_board. First checks that both draw the same actions in distribution (action shares
+# pooled over the boards of a few random 4 player games), then times one player's turn at growing ship counts.
+
+_board_size = 21
+_games = 4
+_trials = 100
+_tolerance = 0.01
+_ship_counts = [1, 4, 16, 32]
+_repeats = 100
+_seed = 1234
+
+_ship_outcomes = ['NONE', 'NORTH', 'EAST', 'SOUTH', 'WEST', 'CONVERT']
+
+
+def random_game_observations():
+    # every 6th turn of a few random games, both the early (no shipyard) and the later turns
+    environment = make('halite', configuration={'size': _board_size, 'episodeSteps': 120})
+    observations = []
+    for _ in range(_games):
+        environment.reset(4)
+        board = Board(environment.state[0].observation, environment.configuration)
+        for turn in range(110):
+            if turn % 6 == 0:
+                observations.append(board.observation)
+            for player in board.players.values():
+                random_agent(board, player)
+            board = board.next()
+    return observations, environment.configuration
+
+
+def action_shares(agent, backend, observations, configuration):
+    # share of each ship action (NONE is mining) and of spawning shipyards
+    counts = np.zeros(len(_ship_outcomes) + 2)
+    for observation in observations:
+        for _ in range(_trials):
+            board = backend(observation, configuration)
+            for player_id in range(4):
+                agent(board, player_id)
+                for ship in board.players[player_id].ships:
+                    action = ship.next_action
+                    counts[_ship_outcomes.index('NONE' if action is None else action.name)] += 1
+                for shipyard in board.players[player_id].shipyards:
+                    counts[len(_ship_outcomes) + (shipyard.next_action is not None)] += 1
+    ships = counts[:len(_ship_outcomes)].sum()
+    return_object = np.concatenate([counts[:len(_ship_outcomes)] / ships,
+                                    counts[len(_ship_outcomes):] / max(counts[len(_ship_outcomes):].sum(), 1)])
+    return return_object
+
+
+def crowded_observation(observation, ship_count):
+    # every player with ship_count ships, one shipyard and enough halite to convert and spawn
+    observation = copy.deepcopy(observation)
+    cells = random.sample(range(_board_size ** 2), 5 * ship_count + 4)
+    for player_id, player in enumerate(observation['players']):
+        player[0] = 5000
+        player[1] = {f'{player_id}-yard': cells[4 * ship_count + player_id]}
+        player[2] = {f'{player_id}-{ship}': [cells[player_id * ship_count + ship], random.randint(0, 500)]
+                     for ship in range(ship_count)}
+    return observation
+
+
+def microseconds_per_turn(agent, backend, observation, configuration):
+    boards = [backend(observation, configuration) for _ in range(_repeats)]
+    start = time.perf_counter()
+    for board in boards:
+        for player_id in range(4):
+            agent(board, player_id)
+    return_object = (time.perf_counter() - start) / (4 * _repeats) * 1e6
+    return return_object
+
+
+if __name__ == '__main__':
+    random.seed(_seed)
+    rng = np.random.default_rng(_seed)
+    legacy = lambda board, player_id: random_agent(board, board.players[player_id])
+    vectorized = lambda board, player_id: vectorized_random_agent(board, player_id, rng)
+
+    observations, configuration = random_game_observations()
+    expected = action_shares(legacy, Board, observations, configuration)
+    for name, backend in [('kaggle Board', Board), ('array_board', array_board)]:
+        shares = action_shares(vectorized, backend, observations, configuration)
+        difference = np.abs(shares - expected).max()
+        print(f'{name}: largest action share difference {difference:.4f}')
+        assert difference < _tolerance, (expected, shares)
+
+    for ship_count in _ship_counts:
+        observation = crowded_observation(observations[0], ship_count)
+        before = microseconds_per_turn(legacy, Board, observation, configuration)
+        after_kaggle = microseconds_per_turn(vectorized, Board, observation, configuration)
+        after_numpy = microseconds_per_turn(vectorized, array_board, observation, configuration)
+        print(f'{ship_count} ships: random_agent {before:.1f} us, vectorized_random_agent {after_kaggle:.1f} us '
+              f'(kaggle Board), {after_numpy:.1f} us (array_board)')
@@ -0,0 +1,70 @@
+from os.path import dirname, abspath, join
+import sys
+THIS_DIR = dirname(__file__)
+CODE_DIR = abspath(join(THIS_DIR, '..'))
+sys.path.append(CODE_DIR)
+import time
+import numpy as np
+from kaggle_environments.envs.halite.helpers import *
+from halite_rl.environments.helpers.array_board import array_board
+from halite_rl.environments.helpers.board_template import board_template
+from halite_rl.environments.helpers.random_agent import random_agent
+from halite_rl.environments.halite_v4.helpers.headless_render import headless_render, cell_tiles, state_pixels
+
+# NOTE: per frame cost of the v4 rendering on both board backends, boards from random games at sizes 15, 21 and 32.
+# The snapshot (cell_tiles + state_pixels) is what render_worker.frame pays in the env process on every recorded step,
+# render_board is the whole frame as the render worker draws it. The kaggle Board and the array_board of the same
+# game have to give the same tiles, and the kaggle Board's halite has to be board.observation['halite'].
+
+_board_sizes = [15, 21, 32]
+_turns = 100
+_repeats = 5
+
+
+def random_game_boards(board_size):
+    # (kaggle Boards, array_boards) of one random game (both players random)
+    template = board_template({"size": board_size, "startingHalite": 1000, "episodeSteps": _turns}, 2,
+                              [('ship', ShipAction.CONVERT), ('shipyard', ShipyardAction.SPAWN)])
+    board = template.new_game()[-1].to_board()
+    boards, other_boards = [], []
+    for _ in range(_turns):
+        boards.append(board)
+        other_boards.append(array_board(board.observation, board.configuration))
+        for player in board.players.values():
+            random_agent(board, player)
+        board = board.next()
+    return_object = (boards, other_boards)
+    return return_object
+
+
+def milliseconds_per_call(render, boards, state):
+    best = float('inf')
+    for _ in range(_repeats):
+        start = time.perf_counter()
+        for board in boards:
+            render(board, state)
+        best = min(best, (time.perf_counter() - start) / len(boards) * 1e3)
+    return best
+
+
+if __name__ == '__main__':
+    for board_size in _board_sizes:
+        boards, other_boards = random_game_boards(board_size)
+        state = np.random.default_rng(0).random([2, board_size, board_size], dtype=np.float32)
+        renderer = headless_render(board_size)
+
+        # same tiles on both backends, kaggle halite read from the cells like the observation has it
+        for board, other in zip(boards, other_boards):
+            tiles = cell_tiles(board, board_size)
+            assert np.array_equal(tiles, cell_tiles(other, board_size))
+            halite = np.array(board.observation['halite'], dtype=np.float64)
+            expected = (9.0 * halite / float(board.configuration.max_cell_halite)).astype(np.uint8)
+            assert np.array_equal(tiles[tiles < 10], expected[tiles < 10])
+
+        results = []
+        for backend, backend_boards in [('kaggle Board', boards), ('array_board', other_boards)]:
+            snapshot = milliseconds_per_call(lambda board, state: (cell_tiles(board, board_size), state_pixels(state)),
+                                             backend_boards, state)
+            frame = milliseconds_per_call(renderer.render_board, backend_boards, state)
+            results.append(f'{backend} snapshot {snapshot:.3f} ms, render_board {frame:.3f} ms')
+        print(f'size {board_size}: ' + ', '.join(results))
@@ -0,0 +1,128 @@
+from os.path import dirname, abspath, join
+import sys
+THIS_DIR = dirname(__file__)
+CODE_DIR = abspath(join(THIS_DIR, '..'))
+sys.path.append(CODE_DIR)
+import gc
+import time
+import tracemalloc
+import numpy as np
+from tf_agents.trajectories import time_step as ts
+from halite_rl.environments.halite_v4.env import halite_ship_navigation
+from halite_rl.environments.halite_v4.batched_env import batched_halite_ship_navigation
+from halite_rl.environments.helpers.frame_stack import frame_stack
+from halite_rl.environments.halite_v4.helpers.time_step_buffer import time_step_buffer
+
+# NOTE: tracemalloc check of the v4 step path. First the time step hand off alone, ts.transition on a copy of the
+# observation (what _step used to return) against time_step_buffer: bytes still held per returned time step (the
+# caller keeps them all, like a driver would) and bytes allocated and freed again per call. time_step_buffer may hold
+# nothing per time step (below one byte, numpy caches a few bytes once). Then whole env steps in steady state, with
+# the cyclic collector off while they run: the net growth once the collector ran has to stay below _net_tolerance
+# bytes per step (the live board at both ends differs by its ships, a leak would be one copy per step), the objects it
+# collected per step are the cyclic garbage behind the GC pauses (the kaggle Board's cells point back to their
+# board) and the per step peak is what the board update and the encoder still allocate and free inside a step.
+
+_board_size = 15
+_batch_size = 8
+_calls = 1000
+_warmup_steps = 300
+_steps = 1000
+_seed = 1234
+_net_tolerance = 16
+
+
+def handoff_bytes(make_time_step):
+    # (bytes held per time step while all are kept, bytes allocated and freed per call)
+    make_time_step()
+    kept = [None] * _calls
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for i in range(_calls):
+        kept[i] = make_time_step()
+    held, _ = tracemalloc.get_traced_memory()
+    del kept
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    for _ in range(_calls):
+        make_time_step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return_object = ((held - before) / _calls, peak - start)
+    return return_object
+
+
+def steady_state_bytes(env, batch=None):
+    # (net bytes per step over _steps steady state steps, cyclic garbage objects per step, peak bytes within one step,
+    # us per step untraced)
+    rng = np.random.default_rng(_seed)
+    actions = rng.integers(0, 5, size=(2 * _warmup_steps + 2 * _steps, batch or 1)).astype(np.int32)
+    time_step = env.reset()
+
+    def step(i):
+        nonlocal time_step
+        if batch is None and time_step.is_last():
+            time_step = env.reset()
+        else:
+            time_step = env.step(actions[i] if batch else actions[i, 0])
+
+    for i in range(_warmup_steps):
+        step(i)
+    start = time.perf_counter()
+    for i in range(_warmup_steps, _warmup_steps + _steps):
+        step(i)
+    microseconds = (time.perf_counter() - start) / _steps * 1e6
+    # traced warm up, the live board and state are then traced at both ends
+    tracemalloc.start()
+    for i in range(_warmup_steps + _steps, 2 * _warmup_steps + _steps):
+        step(i)
+    gc.collect()
+    gc.disable()
+    before, _ = tracemalloc.get_traced_memory()
+    peak = 0
+    for i in range(2 * _warmup_steps + _steps, 2 * _warmup_steps + 2 * _steps):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        step(i)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    garbage = gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.enable()
+    return_object = ((after - before) / _steps, garbage / _steps, peak, microseconds)
+    return return_object
+
+
+if __name__ == '__main__':
+    frames = frame_stack(1, [2, _board_size, _board_size], dtype=np.float32)
+    single = time_step_buffer([1, 2, _board_size, _board_size], dtype=np.float32)
+    history = np.zeros([_batch_size, 1, 2, _board_size, _board_size], dtype=np.float32)
+    batched = time_step_buffer(history.shape[1:], dtype=np.float32, batch_size=_batch_size)
+    reward = np.float32(0.25)
+    rewards = np.zeros(_batch_size, dtype=np.float32)
+    step_type = np.ones(_batch_size, dtype=np.int32)
+    ended = np.zeros(_batch_size, dtype=bool)
+    cases = [('single, ts.transition', lambda: ts.transition(frames.observation(), reward=reward, discount=1.0)),
+             ('single, time_step_buffer', lambda: single.transition(frames.frames(), reward=reward, discount=1.0)),
+             ('batched, ts.TimeStep', lambda: ts.TimeStep(step_type.astype(np.int32), rewards,
+                                                          np.where(ended, 0.0, 1.0).astype(np.float32),
+                                                          history.copy())),
+             ('batched, time_step_buffer', lambda: batched.write(step_type, rewards, ~ended, history))]
+    for name, make_time_step in cases:
+        held, transient = handoff_bytes(make_time_step)
+        print(f'{name:<28} {held:>9.1f} bytes held per time step, {transient:>7} bytes allocated and freed per call')
+        if 'time_step_buffer' in name:
+            assert held < 1, held
+
+    envs = [('halite_v4 kaggle', halite_ship_navigation('Allocations', render_me=False, board_size=_board_size,
+                                                        seed=_seed), None),
+            ('halite_v4 numpy', halite_ship_navigation('Allocations', render_me=False, backend='numpy',
+                                                       board_size=_board_size, seed=_seed), None),
+            ('halite_v4 batched', batched_halite_ship_navigation('Allocations', batch_size=_batch_size,
+                                                                 render_me=False, board_size=_board_size,
+                                                                 seed=_seed), _batch_size)]
+    for name, env, batch in envs:
+        net, garbage, peak, microseconds = steady_state_bytes(env, batch)
+        print(f'{name:<20} net {net:>6.1f} bytes per step, {garbage:>7.1f} cyclic garbage objects per step, '
+              f'peak {peak / 1024:>6.1f} KiB within a step, {microseconds:>8.1f} us per step')
+        assert abs(net) < _net_tolerance, net
+        env.close()
@@ -68,33 +68,39 @@ MAX_SHIPS = 5
 MAX_YARDS = 5
 
 
-def transform_actions(actions, obs, config):
+def action_slots(obs, config):
+    # (ship ids, shipyard ids) of the observing player in action slot order, the sort_cells order (x major, then y) of
+    # their cells, at most MAX_SHIPS / MAX_YARDS, no padding. One table per observation, transform_actions reuses it
+    size = config.size
+    _, yards, ships = obs['players'][obs['player']]
+
+    def cell_order(position):
+        # the observation's cell index is (size - y - 1) * size + x
+        return (position % size) * size + size - 1 - position // size
+
+    ship_ids = sorted(ships, key=lambda ship_id: cell_order(ships[ship_id][0]))[:MAX_SHIPS]
+    yard_ids = sorted(yards, key=lambda yard_id: cell_order(yards[yard_id]))[:MAX_YARDS]
+    return_object = (ship_ids, yard_ids)
+    return return_object
+
+
+def transform_actions(actions, obs, config, slots=None):
+    # actions[:MAX_SHIPS] are the ship slots, the rest the shipyard slots, slots: action_slots(obs, config) when the
+    # caller kept it from the observation. Only the occupied slots are decoded
+    if slots is None:
+        slots = action_slots(obs, config)
+    ship_ids, yard_ids = slots
     next_actions = dict()
 
-    board = Board(obs, config)
-    me = board.current_player
+    for ship_id, i in zip(ship_ids, actions[:MAX_SHIPS]):
+        ship_action = SHIP_ACTIONS[i]
+        if ship_action is not None:
+            next_actions[ship_id] = ship_action
 
-    board_cells = sort_cells(board.cells)
-
-    si = 0
-    yi = MAX_SHIPS
-
-    for _, c in board_cells.items():
-        if c.ship in me.ships and si < MAX_SHIPS:
-            i = actions[si]
-            ship_action = SHIP_ACTIONS[i]
-            si += 1
-
-            if ship_action is not None:
-                next_actions[c.ship.id] = ship_action
-
-        if c.shipyard in me.shipyards and yi < MAX_SHIPS + MAX_YARDS:
-            i = actions[yi]
-            yard_action = YARD_ACTIONS[i]
-            yi += 1
-
-            if yard_action is not None:
-                next_actions[c.shipyard.id] = yard_action
+    for yard_id, i in zip(yard_ids, actions[MAX_SHIPS:MAX_SHIPS + MAX_YARDS]):
+        yard_action = YARD_ACTIONS[i]
+        if yard_action is not None:
+            next_actions[yard_id] = yard_action
 
     return next_actions
 
@@ -104,63 +110,23 @@ MAX_SHIP_HALITE = 1000
 
 
 def transform_observation(obs, config):
-    board = Board(obs, config)
-    me = board.current_player
-
-    board_cells = sort_cells(board.cells)
-
-    step = []
-    cell_yield = []
-    me_yard = []
-    me_ship = []
-    me_ship_cargo = []
-    opp_yard = []
-    opp_ship = []
-    opp_ship_cargo = []
-
-    for _, c in board_cells.items():
-        step.append(obs['step'] / config.episodeSteps)
-
-        cell_yield.append(c.halite / config.maxCellHalite)
-
-        if c.ship is None:
-            me_ship.append(0)
-            me_ship_cargo.append(0)
-            opp_ship.append(0)
-            opp_ship_cargo.append(0)
-
-        elif c.ship in me.ships:
-            me_ship.append(1)
-            me_ship_cargo.append(c.ship.halite / MAX_SHIP_HALITE)
-            opp_ship.append(0)
-            opp_ship_cargo.append(0)
-
-        else:
-            me_ship.append(0)
-            me_ship_cargo.append(0)
-            opp_ship.append(1)
-            opp_ship_cargo.append(c.ship.halite / MAX_SHIP_HALITE)
-
-        if c.shipyard is None:
-            me_yard.append(0)
-            opp_yard.append(0)
-
-        elif c.shipyard in me.shipyards:
-            me_yard.append(1)
-            opp_yard.append(0)
-
-        else:
-            me_yard.append(0)
-            opp_yard.append(1)
-
-    x_obs = np.vstack((step,
-                       cell_yield,
-                       me_yard,
-                       me_ship,
-                       me_ship_cargo,
-                       opp_yard,
-                       opp_ship,
-                       opp_ship_cargo))
+    # straight from the raw observation: features are filled as [feature, row, col] planes (obs order, row is
+    # size - y - 1) and turned into the sort_cells order (x major, then y) with one flip and a transpose
+    size = config.size
+    x_obs = np.zeros([N_FEATURES, size * size])
+    x_obs[0] = obs['step'] / config.episodeSteps
+    x_obs[1] = np.asarray(obs['halite'], dtype=np.float64) / config.maxCellHalite
+
+    for player, (_, yards, ships) in enumerate(obs['players']):
+        # me: me_yard, me_ship, me_ship_cargo, opponents: opp_yard, opp_ship, opp_ship_cargo
+        yard, ship, cargo = (2, 3, 4) if player == obs['player'] else (5, 6, 7)
+        x_obs[yard, list(yards.values())] = 1
+        cells = [position for position, _ in ships.values()]
+        x_obs[ship, cells] = 1
+        x_obs[cargo, cells] = np.array([halite for _, halite in ships.values()], dtype=np.float64) / MAX_SHIP_HALITE
+
+    # [feature, x, y], the np.vstack of the per cell lists in sort_cells order
+    x_obs = x_obs.reshape(N_FEATURES, size, size)[:, ::-1].transpose(0, 2, 1)
 
     x_obs = x_obs.reshape(config.size, config.size, N_FEATURES)
     x_obs = x_obs.astype(np.float32).clip(0, 1)
@@ -174,14 +140,18 @@ REWARD_LOST = -REWARD_WON
 MAX_DELTA = 1000
 
 
-def transform_reward(done, last_obs, obs, config):
-    board = Board(obs, config)
-    me = board.current_player
+def player_totals(obs):
+    # (ships, shipyards, halite, cargo) of the observing player, read from the raw observation
+    halite, yards, ships = obs['players'][obs['player']]
+    return_object = (len(ships), len(yards), halite, sum(cargo for _, cargo in ships.values()))
+    return return_object
 
-    nships = len(me.ships)
-    nyards = len(me.shipyards)
-    halite = me.halite
-    cargo = sum(s.halite for s in me.ships)
+
+def transform_reward(done, last_obs, obs, config, totals=None, last_totals=None):
+    # totals / last_totals: player_totals(obs) / player_totals(last_obs) when the caller kept them from the last step
+    if totals is None:
+        totals = player_totals(obs)
+    nships, nyards, halite, cargo = totals
 
     if nships == 0:
         if nyards == 0:
@@ -191,9 +161,9 @@ def transform_reward(done, last_obs, obs, config):
             return REWARD_LOST
 
     if done:
-        scores = [p.halite for p in board.players.values() if
-                  len(p.ships) > 0 or
-                  (len(p.shipyards) > 0 and p.halite >= config.spawnCost)]
+        scores = [player_halite for player_halite, yards, ships in obs['players'] if
+                  len(ships) > 0 or
+                  (len(yards) > 0 and player_halite >= config.spawnCost)]
 
         if halite == max(scores):
             if scores.count(halite) == 1:
@@ -203,13 +173,9 @@ def transform_reward(done, last_obs, obs, config):
     delta = 0
 
     if last_obs is not None:
-        last_board = Board(last_obs, config)
-        last_me = last_board.current_player
-
-        last_nships = len(last_me.ships)
-        last_nyards = len(last_me.shipyards)
-        last_halite = last_me.halite
-        last_cargo = sum(s.halite for s in last_me.ships)
+        if last_totals is None:
+            last_totals = player_totals(last_obs)
+        last_nships, last_nyards, last_halite, last_cargo = last_totals
 
         delta_ships = (nships - last_nships) * config.spawnCost
         delta_yards = (nyards - last_nyards) * (config.convertCost + config.spawnCost)
@@ -231,8 +197,9 @@ def transform_reward(done, last_obs, obs, config):
 
 def get_actions(model, obs, config, deterministic=False):
     x_obs = transform_observation(obs, config)
+    slots = action_slots(obs, config)
     actions, state = model.predict(x_obs, deterministic=deterministic)
-    next_actions = transform_actions(actions, obs, config)
+    next_actions = transform_actions(actions, obs, config, slots)
     return next_actions
 
 
@@ -265,6 +232,10 @@ class HaliteGym(py_environment.PyEnvironment):
 
         self.obs = None
         self.last_obs = None
+        # player_totals of obs, the next step's last_totals
+        self.totals = None
+        # action_slots of obs, decodes the next step's actions
+        self.slots = None
 
         self.spec = None
         self.metadata = None
@@ -280,18 +251,22 @@ class HaliteGym(py_environment.PyEnvironment):
     def _reset(self):
         self.last_obs = None
         self.obs = self.env.reset()
+        self.totals = player_totals(self.obs)
         x_obs = transform_observation(self.obs, self.config)
+        self.slots = action_slots(self.obs, self.config)
         x_obs = ts.restart(np.array(x_obs, dtype=np.int32))
         return x_obs
 
     def _step(self, actions):
-        next_actions = transform_actions(actions, self.obs, self.config)
+        next_actions = transform_actions(actions, self.obs, self.config, self.slots)
 
         self.last_obs = self.obs
         self.obs, reward, done, info = self.env.step(next_actions)
 
+        last_totals, self.totals = self.totals, player_totals(self.obs)
         x_obs = transform_observation(self.obs, self.config)
-        x_reward = transform_reward(done, self.last_obs, self.obs, self.config)
+        self.slots = action_slots(self.obs, self.config)
+        x_reward = transform_reward(done, self.last_obs, self.obs, self.config, self.totals, last_totals)
 
 
         # final
@@ -7,6 +7,8 @@ from tf_agents.replay_buffers import tf_uniform_replay_buffer
 from tf_agents.trajectories import trajectory
 from tf_agents.utils import common
 from halite_rl.environments.halite_v2.env import halite_ship_navigation
+from halite_rl.dqn_bots.helpers.observation_codec import observation_codec
+from halite_rl.dqn_bots.helpers.mmap_replay_buffer import mmap_replay_buffer
 from tqdm import tqdm
 import os
 import cv2
@@ -36,6 +38,10 @@ _batch_size = 64  # @param {type:"integer"}
 _learning_rate = 0.0001  # @param {type:"number"}
 _num_train_episodes = 100 # @param {type:"integer"}
 _num_eval_episodes = 10  # @param {type:"integer"}
+_quantize_replay_observations = False  # @param {type:"boolean"}
+_prioritized_replay = False  # @param {type:"boolean"}
+_priority_exponent = 0.6  # @param {type:"number"}
+_importance_sampling_exponent = 0.4  # @param {type:"number"}
 #_render_on_episode = 10  # @param {type:"integer"}
 
 
@@ -111,10 +117,26 @@ def compute_avg_return(environment, policy, num_episodes=10):
     return avg_return.numpy()[0]
 
 
-_replay_buffer = tf_uniform_replay_buffer.TFUniformReplayBuffer(
-    data_spec=_agent.collect_data_spec,
-    batch_size=_train_env.batch_size,
-    max_length=_replay_buffer_max_length)
+# replay observations are stored quantized and dequantized when a batch is sampled
+# halite planes and the 0 / 0.5 / 1 ship and shipyard planes all go to uint8
+_replay_data_spec = _agent.collect_data_spec
+if _quantize_replay_observations:
+    _observation_codec = observation_codec(_train_env.observation_spec(), binary_planes=[])
+    _replay_data_spec = _replay_data_spec._replace(observation=_observation_codec.spec)
+
+# the priorities live in the memory-mapped buffer (next to the checkpoint, remapped on restart instead of restored)
+if _prioritized_replay:
+    _replay_buffer = mmap_replay_buffer(
+        data_spec=_replay_data_spec,
+        batch_size=_train_env.batch_size,
+        max_length=_replay_buffer_max_length,
+        directory=os.path.join(_checkpoint_policy_dir, 'replay_buffer'),
+        priority_exponent=_priority_exponent)
+else:
+    _replay_buffer = tf_uniform_replay_buffer.TFUniformReplayBuffer(
+        data_spec=_replay_data_spec,
+        batch_size=_train_env.batch_size,
+        max_length=_replay_buffer_max_length)
 
 
 def collect_step(environment, policy):
@@ -122,6 +144,8 @@ def collect_step(environment, policy):
     action_step = policy.action(time_step)
     next_time_step = environment.step(action_step.action)
     traj = trajectory.from_transition(time_step, action_step, next_time_step)
+    if _quantize_replay_observations:
+        traj = traj._replace(observation=_observation_codec.quantize(traj.observation))
     # Add trajectory to the replay buffer
     _replay_buffer.add_batch(traj)
 
@@ -165,7 +189,12 @@ def render_history():
 dataset = _replay_buffer.as_dataset(
     num_parallel_calls=30,
     sample_batch_size=_batch_size,
-    num_steps=2).prefetch(30)
+    num_steps=2)
+if _quantize_replay_observations:
+    dataset = dataset.map(lambda experience, info: (
+        experience._replace(observation=_observation_codec.dequantize(experience.observation)), info),
+        num_parallel_calls=30)
+dataset = dataset.prefetch(30)
 
 _agent.train = common.function(_agent.train)
 
@@ -175,13 +204,14 @@ avg_return = compute_avg_return(_eval_env, _agent.policy, _num_eval_episodes)
 returns = [avg_return]
 iterator = iter(dataset)
 
+_checkpoint_objects = {'agent': _agent, 'policy': _agent.policy, 'global_step': _train_step_counter}
+if not _prioritized_replay:
+    _checkpoint_objects['replay_buffer'] = _replay_buffer
+
 train_checkpointer = common.Checkpointer(
     ckpt_dir=_checkpoint_policy_dir,
     max_to_keep=1,
-    agent=_agent,
-    policy=_agent.policy,
-    replay_buffer=_replay_buffer,
-    global_step=_train_step_counter
+    **_checkpoint_objects
 )
 
 tf_policy_saver = policy_saver.PolicySaver(_agent.policy)
@@ -202,14 +232,23 @@ while True:
             collect_step(_train_env, _agent.collect_policy)
             time_step = _train_env.current_time_step()
     print('Training...')
-    experience, unused_info = next(iterator)
-    train_loss = _agent.train(experience).loss
+    experience, sample_info = next(iterator)
+    if _prioritized_replay:
+        # importance weights undo the bias of prioritized sampling, scaled so the largest is 1
+        weights = (sample_info.probabilities * _replay_buffer.num_frames()) ** -_importance_sampling_exponent
+        loss_info = _agent.train(experience, weights=weights / tf.reduce_max(weights))
+        _replay_buffer.update_priorities(sample_info.ids.numpy(), loss_info.extra.td_error.numpy())
+    else:
+        loss_info = _agent.train(experience)
+    train_loss = loss_info.loss
     step = _agent.train_step_counter.numpy()
     print('step = {0}: loss = {1}'.format(step, train_loss))
     print('Evaulating...')
     avg_return = compute_avg_return(_eval_env, _agent.policy, _num_eval_episodes)
     returns.append(avg_return)
     train_checkpointer.save(_train_step_counter)
+    if _prioritized_replay:
+        _replay_buffer.flush()
     print('step = {0}: Average Return = {1:.2f}'.format(step, avg_return))
     reward_history.append(avg_return)
     loss_history.append(train_loss)
@@ -14,6 +14,12 @@ from tf_agents.replay_buffers import tf_uniform_replay_buffer
 from tf_agents.trajectories import trajectory
 from tf_agents.utils import common
 from halite_rl.environments.halite_v4.env import halite_ship_navigation
+from halite_rl.environments.halite_v4.batched_env import batched_halite_ship_navigation
+from halite_rl.environments.halite_v4.parallel_env import parallel_halite_ship_navigation
+from halite_rl.environments.halite_v4.fleet_env import fleet_halite_ship_navigation
+from halite_rl.environments.halite_v4.helpers.step_profiler import step_profiler
+from halite_rl.dqn_bots.helpers.observation_codec import observation_codec
+from halite_rl.dqn_bots.helpers.mmap_replay_buffer import mmap_replay_buffer
 from tqdm import tqdm
 import os
 import cv2
@@ -43,9 +49,18 @@ _batch_size = 64  # @param {type:"integer"}
 _learning_rate = 0.00001  # @param {type:"number"}
 _num_train_episodes = 100 # @param {type:"integer"}
 _num_eval_episodes = 10  # @param {type:"integer"}
+_quantize_replay_observations = False  # @param {type:"boolean"}
+_memmap_replay_buffer = False  # @param {type:"boolean"}
+_prioritized_replay = False  # @param {type:"boolean"}
+_priority_exponent = 0.6  # @param {type:"number"}
+_importance_sampling_exponent = 0.4  # @param {type:"number"}
 _num_save_episodes = 5  # @param {type:"integer"}
 _num_dump_replay_buffer_episodes = 10  # @param {type:"integer"}
-#_render_on_episode = 10  # @param {type:"integer"}
+_num_parallel_games = 8  # @param {type:"integer"}
+_fleet_size = 1  # @param {type:"integer"}
+_render_on_episode = 10  # @param {type:"integer"}
+_profile_every_n_episodes = 0  # @param {type:"integer"}
+_seed = None  # @param {type:"integer"}
 
 
 reward_history = []
@@ -67,10 +82,57 @@ _checkpoint_policy_dir = os.path.join(_config['files']['policy'][base_directory_
                                       _config['files']['policy']['checkpoint_policy']['dir'],
                                       _config['files']['policy']['checkpoint_policy']['name'])
 
+_gifs_dir = os.path.join(_config['files']['policy'][base_directory_key],
+                         _config['files']['policy']['images']['gifs']['dir'],
+                         _config['files']['policy']['images']['gifs']['name'])
+
+# env worker processes for collection, config.json collect.workers (or collect.<host>-workers)
+_num_workers = 1
+if 'collect' in _config:
+    workers_key = 'workers'
+    if f'{host_name}-workers' in _config['collect']:
+        workers_key = f'{host_name}-workers'
+    _num_workers = _config['collect'].get(workers_key, 1)
+
 # instantiate two environments. I personally don't feel this is necessary,
 # however google did it in their tutorial...
-_train_py_env = halite_ship_navigation(env_name='Training', render_me=True)
-_eval_py_env = halite_ship_navigation(env_name='Testing', render_me=True)
+# training games are stepped as one batch, one policy call serves every game
+# with several workers each one steps _num_parallel_games games in its own process (no rendering there)
+# _fleet_size > 1 plays one game with a fleet of ships instead, the batch is the fleet (one policy call per turn)
+if _fleet_size > 1:
+    if _num_workers > 1:
+        _train_py_env = parallel_halite_ship_navigation(
+            'halite_rl.environments.halite_v4.fleet_env_core.fleet_halite_ship_navigation_core',
+            {'env_name': 'Training', 'fleet_size': _fleet_size, 'render_me': False,
+             'profile_every_n_episodes': _profile_every_n_episodes, 'seed': _seed}, _num_workers)
+    else:
+        _train_py_env = fleet_halite_ship_navigation(env_name='Training', fleet_size=_fleet_size, render_me=True,
+                                                     render_every_n_episodes=_render_on_episode,
+                                                     profile_every_n_episodes=_profile_every_n_episodes, seed=_seed)
+elif _num_workers > 1:
+    if _num_parallel_games > 1:
+        _train_py_env = parallel_halite_ship_navigation(
+            'halite_rl.environments.halite_v4.batched_env_core.batched_halite_ship_navigation_core',
+            {'env_name': 'Training', 'batch_size': _num_parallel_games, 'render_me': False,
+             'profile_every_n_episodes': _profile_every_n_episodes, 'seed': _seed}, _num_workers)
+    else:
+        _train_py_env = parallel_halite_ship_navigation(
+            'halite_rl.environments.halite_v4.env_core.halite_ship_navigation_core',
+            {'env_name': 'Training', 'render_me': False, 'profile_every_n_episodes': _profile_every_n_episodes,
+             'seed': _seed}, _num_workers)
+elif _num_parallel_games > 1:
+    _train_py_env = batched_halite_ship_navigation(env_name='Training', batch_size=_num_parallel_games,
+                                                   render_me=True, render_every_n_episodes=_render_on_episode,
+                                                   profile_every_n_episodes=_profile_every_n_episodes, seed=_seed)
+else:
+    _train_py_env = halite_ship_navigation(env_name='Training', render_me=True,
+                                           render_every_n_episodes=_render_on_episode,
+                                           profile_every_n_episodes=_profile_every_n_episodes, seed=_seed)
+# rendering runs in a background process, evaluation episodes are recorded to the gifs dir
+# evaluation games are seeded apart from the training games
+_eval_py_env = halite_ship_navigation(env_name='Testing', render_me=False, record_dir=_gifs_dir,
+                                      render_every_n_episodes=_render_on_episode,
+                                      seed=None if _seed is None else _seed + 1)
 
 # wrap the pure python game in a tensorflow wrapper
 _train_env = tf_py_environment.TFPyEnvironment(_train_py_env)
@@ -120,19 +182,51 @@ def compute_avg_return(environment, policy, num_episodes=10):
     return avg_return.numpy()[0]
 
 
-_replay_buffer = tf_uniform_replay_buffer.TFUniformReplayBuffer(
-    data_spec=_agent.collect_data_spec,
-    batch_size=_train_env.batch_size,
-    max_length=_replay_buffer_max_length)
+# replay observations are stored quantized and dequantized when a batch is sampled
+# navigation plane to uint8, self location plane (0 / 1) to packed bits
+_replay_data_spec = _agent.collect_data_spec
+if _quantize_replay_observations:
+    _observation_codec = observation_codec(_train_env.observation_spec(), binary_planes=[1])
+    _replay_data_spec = _replay_data_spec._replace(observation=_observation_codec.spec)
+
+# the memory-mapped buffer lives next to the checkpoint and is remapped on restart instead of restored
+if _memmap_replay_buffer:
+    _replay_buffer = mmap_replay_buffer(
+        data_spec=_replay_data_spec,
+        batch_size=_train_env.batch_size,
+        max_length=_replay_buffer_max_length // _train_env.batch_size,
+        directory=os.path.join(_checkpoint_policy_dir, 'replay_buffer'),
+        priority_exponent=_priority_exponent if _prioritized_replay else None,
+        seed=None if _seed is None else _seed + 2)
+elif _prioritized_replay:
+    raise ValueError('prioritized replay needs the memory-mapped replay buffer')
+else:
+    _replay_buffer = tf_uniform_replay_buffer.TFUniformReplayBuffer(
+        data_spec=_replay_data_spec,
+        batch_size=_train_env.batch_size,
+        max_length=_replay_buffer_max_length // _train_env.batch_size)
+
+
+# the train envs profile their own _step phases, this one covers the collect loop around them
+_collect_profiler = step_profiler('Collect', _profile_every_n_episodes)
 
 
 def collect_step(environment, policy):
+    _collect_profiler.start_step()
     time_step = environment.current_time_step()
     action_step = policy.action(time_step)
+    _collect_profiler.lap('policy_action')
     next_time_step = environment.step(action_step.action)
+    _collect_profiler.lap('env_step')
     traj = trajectory.from_transition(time_step, action_step, next_time_step)
+    if _quantize_replay_observations:
+        traj = traj._replace(observation=_observation_codec.quantize(traj.observation))
+    _collect_profiler.lap('trajectory')
     # Add trajectory to the replay buffer
     _replay_buffer.add_batch(traj)
+    _collect_profiler.lap('replay_add')
+    _collect_profiler.end_step(int(np.sum(next_time_step.is_last())))
+    return next_time_step
 
 def moving_average(x, w):
     return np.convolve(x, np.ones(w), 'valid') / w
@@ -174,7 +268,12 @@ def render_history():
 dataset = _replay_buffer.as_dataset(
     num_parallel_calls=3,
     sample_batch_size=_batch_size,
-    num_steps=2).prefetch(3)
+    num_steps=2)
+if _quantize_replay_observations:
+    dataset = dataset.map(lambda experience, info: (
+        experience._replace(observation=_observation_codec.dequantize(experience.observation)), info),
+        num_parallel_calls=3)
+dataset = dataset.prefetch(3)
 
 _agent.train = common.function(_agent.train)
 
@@ -184,13 +283,14 @@ _agent.train_step_counter.assign(0)
 #returns = [avg_return]
 iterator = iter(dataset)
 
+_checkpoint_objects = {'agent': _agent, 'policy': _agent.policy, 'global_step': _train_step_counter}
+if not _memmap_replay_buffer:
+    _checkpoint_objects['replay_buffer'] = _replay_buffer
+
 train_checkpointer = common.Checkpointer(
     ckpt_dir=_checkpoint_policy_dir,
     max_to_keep=1,
-    agent=_agent,
-    policy=_agent.policy,
-    replay_buffer=_replay_buffer,
-    global_step=_train_step_counter
+    **_checkpoint_objects
 )
 
 tf_policy_saver = policy_saver.PolicySaver(_agent.policy)
@@ -204,17 +304,32 @@ if restore_network:
 
 returns = []
 
+# reset once, rounds carry on from current_time_step: a reset per round would cut the unfinished batched games short
+# and store their last MID step followed by the FIRST step of an unrelated game
+time_step = _train_env.reset()
+
 while True:
     print('Collecting...')
-    for _ in tqdm(range(_num_train_episodes)):
-        time_step = _train_env.reset()
-        episode_return = 0.0
-        while not time_step.is_last():
-            collect_step(_train_env, _agent.collect_policy)
-            time_step = _train_env.current_time_step()
+    episodes_collected = 0
+    with tqdm(total=_num_train_episodes) as progress:
+        while episodes_collected < _num_train_episodes:
+            time_step = collect_step(_train_env, _agent.collect_policy)
+            # batched games restart on their own, a single game is reset here
+            finished = int(np.sum(time_step.is_last()))
+            if finished > 0 and not _train_py_env.batched:
+                time_step = _train_env.reset()
+            episodes_collected += finished
+            progress.update(finished)
     print('Training...')
-    experience, unused_info = next(iterator)
-    train_loss = _agent.train(experience).loss
+    experience, sample_info = next(iterator)
+    if _prioritized_replay:
+        # importance weights undo the bias of prioritized sampling, scaled so the largest is 1
+        weights = (sample_info.probabilities * _replay_buffer.num_frames()) ** -_importance_sampling_exponent
+        loss_info = _agent.train(experience, weights=weights / tf.reduce_max(weights))
+        _replay_buffer.update_priorities(sample_info.ids.numpy(), loss_info.extra.td_error.numpy())
+    else:
+        loss_info = _agent.train(experience)
+    train_loss = loss_info.loss
     step = _agent.train_step_counter.numpy()
     print('step = {0}: loss = {1}'.format(step, train_loss))
     print('Evaulating...')
@@ -222,7 +337,10 @@ while True:
     returns.append(avg_return)
     if step % _num_save_episodes == 0:
         train_checkpointer.save(_train_step_counter)
-    if step % _num_dump_replay_buffer_episodes == 0:
+        if _memmap_replay_buffer:
+            _replay_buffer.flush()
+    # prioritized replay lowers the weight of stale transitions instead of dropping them
+    if not _prioritized_replay and step % _num_dump_replay_buffer_episodes == 0:
         _replay_buffer.clear()
     print('step = {0}: Average Return = {1:.2f}'.format(step, avg_return))
     reward_history.append(avg_return)
@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import numpy as np
+import tensorflow as tf
+from tf_agents.replay_buffers import tf_uniform_replay_buffer
+from halite_rl.dqn_bots.helpers.sum_tree import sum_tree
+
+# NOTE: drop-in for TFUniformReplayBuffer (add_batch / as_dataset / clear / num_frames) that keeps its storage in
+# memory-mapped .npy segments, one per data_spec leaf, shaped [max_length, batch_size, ...] like the uniform buffer's
+# variables. Nothing goes through the TF checkpoint: flush() writes the write cursor to state.json, a restart maps the
+# same files again (no deserialization) and carries on from the last flush. A changed data spec starts empty.
+# With a priority_exponent the buffer samples proportionally to (|td error| + epsilon) ^ exponent through a sum tree
+# over the [max_length, batch_size] slots. A slot's leaf holds the priority of the sequence_length steps starting
+# there, so the newest sequence_length - 1 rows and the row being overwritten stay at 0 until they are complete.
+# Sampled ids are absolute item ids (id * batch_size + column), update_priorities() ignores ids that left the window.
+# Samples are drawn from the buffer's own generator (seed), never from np.random: kaggle's populate_board reseeds the
+# global np.random on every new layout, which in the trainer is every env reset.
+
+
+class mmap_replay_buffer():
+    def __init__(self, data_spec, batch_size, max_length, directory, priority_exponent=None, sequence_length=2,
+                 priority_epsilon=1e-6, seed=None):
+        self.data_spec = data_spec
+        self._batch_size = batch_size
+        self._max_length = max_length
+        self._directory = directory
+        self._specs = tf.nest.flatten(data_spec)
+        self._lock = threading.Lock()
+        self._state_path = os.path.join(directory, 'state.json')
+        self._priority_exponent = priority_exponent
+        self._sequence_length = sequence_length
+        self._priority_epsilon = priority_epsilon
+        self._max_priority = 1.0
+        self._rng = np.random.default_rng(seed)
+
+        layout = [{'shape': [max_length, batch_size] + spec.shape.as_list(),
+                   'dtype': np.dtype(spec.dtype.as_numpy_dtype).str} for spec in self._specs]
+        paths = [os.path.join(directory, f'segment_{index:02d}.npy') for index in range(len(self._specs))]
+        if priority_exponent is not None:
+            layout.append({'shape': [max_length, batch_size], 'dtype': np.dtype(np.float64).str})
+            paths.append(os.path.join(directory, 'priorities.npy'))
+
+        state = None
+        if os.path.exists(self._state_path) and all(os.path.exists(path) for path in paths):
+            with open(self._state_path) as f:
+                state = json.load(f)
+            if state['layout'] != layout:
+                print(f'replay buffer layout in {directory} changed, starting empty')
+                state = None
+
+        os.makedirs(directory, exist_ok=True)
+        if state is None:
+            self._arrays = [np.lib.format.open_memmap(path, mode='w+', dtype=segment['dtype'],
+                                                      shape=tuple(segment['shape']))
+                            for path, segment in zip(paths, layout)]
+            self._last_id = -1
+        else:
+            self._arrays = [np.lib.format.open_memmap(path, mode='r+') for path in paths]
+            self._last_id = state['last_id']
+            self._max_priority = state.get('max_priority', 1.0)
+            print(f'replay buffer restored from {directory}, {self.num_frames()} frames')
+        self._layout = layout
+
+        self._priorities = None
+        if priority_exponent is not None:
+            self._priorities = self._arrays.pop()
+            self._tree = sum_tree(max_length * batch_size)
+            self._tree.rebuild(self._priorities.reshape(-1))
+
+    def num_frames(self):
+        return_object = min(self._last_id + 1, self._max_length) * self._batch_size
+        return return_object
+
+    def add_batch(self, items):
+        row = (self._last_id + 1) % self._max_length
+        values = [np.asarray(item) for item in tf.nest.flatten(items)]
+        with self._lock:
+            for array, value in zip(self._arrays, values):
+                array[row] = value
+            self._last_id += 1
+            if self._priorities is not None:
+                # the new row ends the sequence starting sequence_length - 1 rows back, which becomes sampleable
+                self._tree.set(self._row_slots(row), 0.0)
+                start_id = self._last_id - self._sequence_length + 1
+                if start_id >= max(self._last_id + 1 - self._max_length, 0):
+                    self._tree.set(self._row_slots(start_id % self._max_length), self._max_priority)
+
+    def _row_slots(self, row):
+        return_object = row * self._batch_size + np.arange(self._batch_size)
+        return return_object
+
+    def clear(self):
+        with self._lock:
+            self._last_id = -1
+            if self._priorities is not None:
+                self._tree.rebuild(0.0)
+
+    def flush(self):
+        # make the segments and the write cursor durable, call next to the checkpoint save
+        with self._lock:
+            if self._priorities is not None:
+                self._priorities[:] = self._tree.leaves().reshape(self._priorities.shape)
+                self._priorities.flush()
+            for array in self._arrays:
+                array.flush()
+            with open(self._state_path + '.tmp', 'w') as f:
+                json.dump({'last_id': self._last_id, 'layout': self._layout, 'max_priority': self._max_priority}, f)
+            os.replace(self._state_path + '.tmp', self._state_path)
+
+    def _sample(self, sample_batch_size, num_steps):
+        steps = num_steps or 1
+        with self._lock:
+            min_id = max(self._last_id + 1 - self._max_length, 0)
+            max_start_id = self._last_id - steps + 1
+            if max_start_id < min_id:
+                raise ValueError(f'replay buffer holds {self._last_id - min_id + 1} steps, {steps} needed to sample')
+            if self._priorities is None:
+                ids = self._rng.integers(min_id, max_start_id + 1, size=sample_batch_size)
+                columns = self._rng.integers(0, self._batch_size, size=sample_batch_size)
+                probabilities = np.full(sample_batch_size, 1.0 / ((max_start_id - min_id + 1) * self._batch_size))
+            else:
+                # one draw per equal slice of the total priority
+                total = self._tree.total()
+                values = (np.arange(sample_batch_size) + self._rng.uniform(size=sample_batch_size)) / sample_batch_size
+                slots = self._tree.find(values * total)
+                rows, columns = np.divmod(slots, self._batch_size)
+                # rows back to absolute ids, the newest row holds last_id
+                ids = self._last_id - (self._last_id - rows) % self._max_length
+                probabilities = self._tree.get(slots) / total
+            if num_steps is None:
+                rows = ids % self._max_length
+            else:
+                rows = (ids[:, np.newaxis] + np.arange(num_steps)) % self._max_length
+                columns = columns[:, np.newaxis]
+            values = [array[rows, columns] for array in self._arrays]
+        item_ids = ids * self._batch_size + np.asarray(columns).reshape(-1)
+        return [item_ids.astype(np.int64), probabilities.astype(np.float32)] + values
+
+    def update_priorities(self, item_ids, td_errors):
+        # td_errors [sample_batch_size] or [sample_batch_size, time], the largest error of a sequence counts
+        td_errors = np.abs(np.asarray(td_errors, dtype=np.float64)).reshape(len(item_ids), -1).max(axis=1)
+        priorities = (td_errors + self._priority_epsilon) ** self._priority_exponent
+        ids, columns = np.divmod(np.asarray(item_ids, dtype=np.int64), self._batch_size)
+        with self._lock:
+            # sequences overwritten since they were sampled keep the priority of their new data
+            valid = (ids >= max(self._last_id + 1 - self._max_length, 0)) & \
+                    (ids <= self._last_id - self._sequence_length + 1)
+            slots = (ids % self._max_length) * self._batch_size + columns
+            self._tree.set(slots[valid], priorities[valid])
+            if valid.any():
+                self._max_priority = max(self._max_priority, float(priorities[valid].max()))
+
+    def as_dataset(self, sample_batch_size, num_steps=None, num_parallel_calls=None):
+        if self._priorities is not None and (num_steps or 1) != self._sequence_length:
+            raise ValueError(f'prioritized buffer samples sequences of {self._sequence_length} steps, '
+                             f'not {num_steps}')
+        output_types = [tf.int64, tf.float32] + [spec.dtype for spec in self._specs]
+        outer_shape = [sample_batch_size] + ([] if num_steps is None else [num_steps])
+
+        def sample(_):
+            outputs = tf.numpy_function(lambda: self._sample(sample_batch_size, num_steps), [], output_types)
+            ids, probabilities = outputs[:2]
+            ids.set_shape([sample_batch_size])
+            probabilities.set_shape([sample_batch_size])
+            for output, spec in zip(outputs[2:], self._specs):
+                output.set_shape(outer_shape + spec.shape.as_list())
+            experience = tf.nest.pack_sequence_as(self.data_spec, outputs[2:])
+            return experience, tf_uniform_replay_buffer.BufferInfo(ids=ids, probabilities=probabilities)
+
+        return_object = tf.data.Dataset.range(1).repeat().map(sample, num_parallel_calls=num_parallel_calls)
+        return return_object
@@ -0,0 +1,58 @@
+import numpy as np
+import tensorflow as tf
+
+# NOTE: replay storage for the float32 [frames, channels, height, width] observations of halite_v2 - v4. Planes are
+# stored as uint8 (round(x * 255), at most 1/510 off) and binary planes (0 / 1 only, e.g. the v4 self location) as
+# packed bits, 8 cells per byte. quantize() runs when a trajectory is added, dequantize() in the dataset map, so only
+# the sampled batch is ever float32 again. A 4M entry buffer shrinks 4x (uint8) to 32x (bits) on the observations.
+
+_bit_weights = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class observation_codec():
+    def __init__(self, observation_spec, binary_planes=()):
+        self._frames, self._channels, self._height, self._width = observation_spec.shape
+        self._binary_planes = [plane for plane in range(self._channels) if plane in binary_planes]
+        self._quantized_planes = [plane for plane in range(self._channels) if plane not in binary_planes]
+        self._cells = self._height * self._width
+        self._packed_cells = -(-self._cells // 8)
+        # position of each original plane in concat([quantized, binary])
+        self._plane_order = np.argsort(self._quantized_planes + self._binary_planes).tolist()
+
+        self.spec = {}
+        if self._quantized_planes:
+            self.spec['quantized'] = tf.TensorSpec(
+                [self._frames, len(self._quantized_planes), self._height, self._width], tf.uint8, name='quantized')
+        if self._binary_planes:
+            self.spec['bits'] = tf.TensorSpec(
+                [self._frames, len(self._binary_planes), self._packed_cells], tf.uint8, name='bits')
+
+    def quantize(self, observation):
+        # [..., frames, channels, height, width] float -> stored dict
+        stored = {}
+        if self._quantized_planes:
+            planes = tf.gather(observation, self._quantized_planes, axis=-3)
+            stored['quantized'] = tf.cast(tf.round(tf.clip_by_value(planes, 0.0, 1.0) * 255.0), tf.uint8)
+        if self._binary_planes:
+            planes = tf.gather(observation, self._binary_planes, axis=-3) > 0.5
+            outer_shape = tf.shape(planes)[:-2]
+            cells = tf.reshape(tf.cast(planes, tf.int32), tf.concat([outer_shape, [self._cells]], axis=0))
+            padding = [[0, 0]] * (len(planes.shape) - 2) + [[0, self._packed_cells * 8 - self._cells]]
+            cells = tf.reshape(tf.pad(cells, padding), tf.concat([outer_shape, [self._packed_cells, 8]], axis=0))
+            stored['bits'] = tf.cast(tf.reduce_sum(cells * _bit_weights, axis=-1), tf.uint8)
+        return stored
+
+    def dequantize(self, stored):
+        # stored dict -> [..., frames, channels, height, width] float32
+        planes = []
+        if self._quantized_planes:
+            planes.append(tf.cast(stored['quantized'], tf.float32) / 255.0)
+        if self._binary_planes:
+            packed = tf.cast(stored['bits'], tf.int32)
+            outer_shape = tf.shape(packed)[:-1]
+            cells = tf.bitwise.bitwise_and(packed[..., tf.newaxis], _bit_weights) > 0
+            cells = tf.reshape(cells, tf.concat([outer_shape, [self._packed_cells * 8]], axis=0))[..., :self._cells]
+            cells = tf.reshape(cells, tf.concat([outer_shape, [self._height, self._width]], axis=0))
+            planes.append(tf.cast(cells, tf.float32))
+        return_object = tf.gather(tf.concat(planes, axis=-3), self._plane_order, axis=-3)
+        return return_object
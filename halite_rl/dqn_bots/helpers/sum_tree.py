@@ -0,0 +1,57 @@
+import numpy as np
+
+# NOTE: binary sum tree over a fixed number of leaves for proportional prioritized replay. Node 1 is the root, node i
+# has children 2i and 2i + 1 and the leaves start at the first power of two >= capacity. set() and find() work on
+# whole batches of leaves at once, one numpy step per tree level, so both are O(batch * log capacity).
+
+
+class sum_tree():
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._leaf_offset = 1 << max(capacity - 1, 0).bit_length()
+        self._nodes = np.zeros(2 * self._leaf_offset, dtype=np.float64)
+
+    def total(self):
+        return_object = self._nodes[1]
+        return return_object
+
+    def get(self, indices):
+        return_object = self._nodes[np.asarray(indices) + self._leaf_offset]
+        return return_object
+
+    def leaves(self):
+        return_object = self._nodes[self._leaf_offset:self._leaf_offset + self._capacity]
+        return return_object
+
+    def set(self, indices, priorities):
+        nodes = np.asarray(indices, dtype=np.int64).reshape(-1) + self._leaf_offset
+        if nodes.size == 0:
+            return
+        self._nodes[nodes] = priorities
+        # all leaves sit on the same level, so every parent set is one level further up
+        nodes = np.unique(nodes // 2)
+        while nodes[0] > 0:
+            self._nodes[nodes] = self._nodes[2 * nodes] + self._nodes[2 * nodes + 1]
+            nodes = np.unique(nodes // 2)
+
+    def rebuild(self, leaves):
+        self._nodes[:] = 0.0
+        self._nodes[self._leaf_offset:self._leaf_offset + self._capacity] = leaves
+        level = self._leaf_offset
+        while level > 1:
+            parents = np.arange(level // 2, level)
+            self._nodes[parents] = self._nodes[2 * parents] + self._nodes[2 * parents + 1]
+            level //= 2
+
+    def find(self, values):
+        # leaf whose slice of the running sum contains each value in [0, total)
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(values.shape, dtype=np.int64)
+        while self._leaf_offset > 1 and nodes[0] < self._leaf_offset:
+            left = 2 * nodes
+            left_sum = self._nodes[left]
+            go_right = (values >= left_sum) & (self._nodes[left + 1] > 0.0)
+            values = np.where(go_right, values - left_sum, values)
+            nodes = np.where(go_right, left + 1, left)
+        return_object = nodes - self._leaf_offset
+        return return_object
@@ -22,6 +22,7 @@ import cv2
 import uuid
 import matplotlib
 from halite_rl.environments.halite_v0.helpers.image_render import image_render
+from halite_rl.environments.helpers.frame_stack import frame_stack
 
 
 tf.compat.v1.enable_v2_behavior()
@@ -58,15 +59,15 @@ class halite(py_environment.PyEnvironment):
         self._action_spec = array_spec.BoundedArraySpec(
             shape=(), dtype=np.int32, minimum=0, maximum=len(self._action_def)-1, name='action')
         self._observation_spec = array_spec.BoundedArraySpec(
-            shape=(self._frames, self._board_size, self._board_size, self._channels), dtype=np.int32, minimum=0,
-            maximum=1, name='observation')
+            shape=(self._frames, self._board_size, self._board_size, self._channels), dtype=np.float32, minimum=0.0,
+            maximum=1.0, name='observation')
 
-        self.state = np.zeros([self._board_size, self._board_size, self._channels])
+        self.state = np.zeros([self._board_size, self._board_size, self._channels], dtype=np.float32)
         # 0 = Halite 0-1
         # 1 = Ships (This One Hot, rest are .5)
         # 2 = Shipyardss (This One Hot, rest are .5)
 
-        self.state_history = [self.state] * self._frames
+        self.state_history = frame_stack(self._frames, self.state.shape, dtype=np.float32)
 
         # get board
         self.board = self.get_board()
@@ -92,8 +93,8 @@ class halite(py_environment.PyEnvironment):
         self.environment.reset(self._agent_count)
         # get board
         self.board = self.get_board()
-        self.state_history = [self.state] * self._frames
-        return_object = ts.restart(np.array(self.state_history, dtype=np.int32))
+        self.state_history.reset()
+        return_object = ts.restart(self.state_history.observation())
         return return_object
 
     def _step(self, action):
@@ -158,16 +159,15 @@ class halite(py_environment.PyEnvironment):
         # final wrap up
         self.turns_counter += 1
         self.state_history.append(self.state)
-        del self.state_history[:1]
 
         #self.renderer()
 
         # final
         if self.episode_ended:
-            return_object = ts.termination(np.array(self.state_history, dtype=np.int32), reward)
+            return_object = ts.termination(self.state_history.observation(), reward)
             return return_object
         else:
-            return_object = ts.transition(np.array(self.state_history, dtype=np.int32), reward=reward, discount=1.0)
+            return_object = ts.transition(self.state_history.observation(), reward=reward, discount=1.0)
             return return_object
 
     def get_board(self):
@@ -237,7 +237,7 @@ class halite(py_environment.PyEnvironment):
 
                 row.append(np.array(pixel))
             pixels.append(np.array(row))
-        return np.array(pixels), actionable_object_id, actionable_type
+        return np.array(pixels, dtype=np.float32), actionable_object_id, actionable_type
 
     def renderer(self, highlight=None):
         size = self.board.configuration.size
@@ -22,6 +22,10 @@ import cv2
 import uuid
 import matplotlib
 from halite_rl.environments.halite_v0.helpers.image_render import image_render
+from halite_rl.environments.helpers.board_template import board_template
+from halite_rl.environments.helpers.frame_stack import frame_stack
+from halite_rl.environments.halite_v1.helpers.entity_scheduler import entity_scheduler
+from halite_rl.environments.halite_v1.helpers.pixel_encoder import pixel_encoder
 
 
 tf.compat.v1.enable_v2_behavior()
@@ -47,29 +51,30 @@ class halite(py_environment.PyEnvironment):
         self.turns_counter = 0
         self.episode_ended = False
         self.total_reward = 0
-        self.ships_idle = []
-        self.shipyards_idle = []
+        # the player's ships still waiting for an action this turn, one per _step
+        self._scheduler = entity_scheduler(player_id=0, shipyards=False)
         self.last_reward = 0
 
         self.render_step = render_me
 
-        # initialize game
-        self.environment = make("halite", configuration={"size": self._board_size, "startingHalite": 1000,
-                                                         "episodeSteps": self._max_turns })
-        self.environment.reset(self._agent_count)
+        # initialize game, the kaggle environment is made once and every episode draws a new layout into it
+        self._board_template = board_template({"size": self._board_size, "startingHalite": 1000,
+                                               "episodeSteps": self._max_turns}, self._agent_count)
+        self.environment = self._board_template.environment
 
         self._action_spec = array_spec.BoundedArraySpec(
             shape=(), dtype=np.int32, minimum=0, maximum=len(self._action_def)-1, name='action')
         self._observation_spec = array_spec.BoundedArraySpec(
-            shape=(self._frames, self._board_size, self._board_size, self._channels), dtype=np.int32, minimum=0,
-            maximum=1, name='observation')
+            shape=(self._frames, self._board_size, self._board_size, self._channels), dtype=np.float32, minimum=0.0,
+            maximum=1.0, name='observation')
 
-        self.state = np.zeros([self._board_size, self._board_size, self._channels])
+        self.state = np.zeros([self._board_size, self._board_size, self._channels], dtype=np.float32)
         # 0 = Halite 0-1
         # 1 = Ships (This One Hot, rest are .5)
         # 2 = Shipyardss (This One Hot, rest are .5)
 
-        self.state_history = [self.state] * self._frames
+        self.state_history = frame_stack(self._frames, self.state.shape, dtype=np.float32)
+        self._pixel_encoder = pixel_encoder(self._board_size, self.environment.configuration.maxCellHalite)
 
         # get board
         self.board = self.get_board()
@@ -92,16 +97,15 @@ class halite(py_environment.PyEnvironment):
         self.episode_ended = False
         self.total_reward = 0
         # initialize game
-        self.environment = make("halite", configuration={"size": self._board_size, "startingHalite": 1000,
-                                                         "episodeSteps": self._max_turns })
-        self.environment.reset(self._agent_count)
+        # get_state can advance the board while priming, so the opening is still played on the kaggle board
+        self._board_template.new_layout()
         # get board
         self.board = self.get_board()
-        self.state = np.zeros([self._board_size, self._board_size, self._channels])
-        self.state_history = [self.state] * self._frames
+        self.state = np.zeros([self._board_size, self._board_size, self._channels], dtype=np.float32)
+        self.state_history.reset()
 
         self.prime_board()
-        return_object = ts.restart(np.array(self.state_history, dtype=np.int32))
+        return_object = ts.restart(self.state_history.observation())
         return return_object
 
     def _step(self, action):
@@ -132,24 +136,24 @@ class halite(py_environment.PyEnvironment):
                 if action == 6:
                     reward += -100000
                     ignore_action = True
-                    self.ships_idle.append(actionable_object_id)
+                    self._scheduler.idle(actionable_object_id)
             else:
                 if action != 6 and action != 2:
                     reward += -100000
                     ignore_action = True
-                    self.shipyards_idle.append(actionable_object_id)
+                    self._scheduler.idle(actionable_object_id)
 
         if self.episode_ended == False and ignore_action == False:
             if actionable_type == 'ship':
                 if self._action_def[int_action] != "NOTHING":
                     self.board.ships[actionable_object_id].next_action = self._action_def[int_action]
                 else:
-                    self.ships_idle.append(actionable_object_id)
+                    self._scheduler.idle(actionable_object_id)
             else:
                 if self._action_def[int_action] != "NOTHING":
                     self.board.shipyards[actionable_object_id].next_action = self._action_def[int_action]
                 else:
-                    self.shipyards_idle.append(actionable_object_id)
+                    self._scheduler.idle(actionable_object_id)
 
         self.state, actionable_object_id, actionable_type = self.get_state()
 
@@ -170,16 +174,15 @@ class halite(py_environment.PyEnvironment):
         # final wrap up
         self.turns_counter += 1
         self.state_history.append(self.state)
-        del self.state_history[:1]
 
         #self.renderer()
 
         # final
         if self.episode_ended:
-            return_object = ts.termination(np.array(self.state_history, dtype=np.int32), reward)
+            return_object = ts.termination(self.state_history.observation(), reward)
             return return_object
         else:
-            return_object = ts.transition(np.array(self.state_history, dtype=np.int32), reward=reward, discount=1.0)
+            return_object = ts.transition(self.state_history.observation(), reward=reward, discount=1.0)
             return return_object
 
     def prime_board(self):
@@ -187,13 +190,11 @@ class halite(py_environment.PyEnvironment):
         self.board = self.board.next()
         self.state, actionable_object_id, actionable_type = self.get_state()
         self.state_history.append(self.state)
-        del self.state_history[:1]
         self.turns_counter += 1
         self.board.players[0].shipyards[0].next_action = ShipyardAction.SPAWN
         self.board = self.board.next()
         self.state, actionable_object_id, actionable_type = self.get_state()
         self.state_history.append(self.state)
-        del self.state_history[:1]
         self.turns_counter += 1
 
 
@@ -210,61 +211,23 @@ class halite(py_environment.PyEnvironment):
         human_complete = False
 
         while True:
-            # ship check first
-            for ship_id in self.board.ships:
-                if self.board.ships[ship_id]._player_id == 0 and self.board.ships[ship_id].next_action == None \
-                        and ship_id not in self.ships_idle:
-                    actionable_object_id = ship_id
-                    actionable_type = 'ship'
-                    break
-
-            if actionable_type == 'UNKNOWN' and 1==2:
-                for shipyard_id in self.board.shipyards:
-                    if self.board.shipyards[shipyard_id]._player_id == 0 and self.board.shipyards[shipyard_id].next_action == None \
-                        and shipyard_id not in self.shipyards_idle:
-                        actionable_object_id = shipyard_id
-                        actionable_type = 'shipyard'
-                        break
+            # ships first, shipyards are not handed out (entity_scheduler(shipyards=False))
+            actionable_object_id, actionable_type = self._scheduler.current(self.board)
 
             if actionable_type == 'UNKNOWN':
+                # the scheduler refills for the new board
                 self.board = self.board.next()
-                self.ships_idle = []
-                self.shipyards_idle = []
                 if loop_counter == 1:
                     break
                 loop_counter += 1
             else:
                 break
 
-        size = self.board.configuration.size
-        pixels = []
-        for x in range(0, size):
-            row = []
-            for y in range(0, size):
-                cell = self.board[(x, size - y - 1)]
-                # cell_halite = int(9.0 * cell.halite / float(board.configuration.max_cell_halite))
-                cell_halite = 1.0 * cell.halite / float(self.board.configuration.max_cell_halite)
-
-                pixel = [0, 0, 0]
-                if cell.ship is not None:
-                    if actionable_type == 'ship' and cell.ship.id == actionable_object_id:
-                        pixel[1] = 1 # onehot
-                    else:
-                        pixel[1] = 0.5
-                elif cell.shipyard is not None:
-                    if actionable_type == 'shipyard' and cell.shipyard.id == actionable_object_id:
-                        pixel[2] = 1 # onehot
-                    else:
-                        pixel[2] = 0.5
-                pixel[0] = cell_halite
-                # 0 = Halite
-                # 1 = Ship Presence (One Hot 'ship_id', rest 0.5)
-                # 2 = Shipyard Presence (One Hot 'ship_id', rest 0.5)
-
-
-                row.append(np.array(pixel))
-            pixels.append(np.array(row))
-        return np.array(pixels), actionable_object_id, actionable_type
+        # [x][y][channel], see pixel_encoder
+        pixels = self._pixel_encoder.encode_board(
+            self.board, ship_id=actionable_object_id if actionable_type == 'ship' else None,
+            shipyard_id=actionable_object_id if actionable_type == 'shipyard' else None).transpose(2, 1, 0)
+        return pixels, actionable_object_id, actionable_type
 
     def renderer(self, highlight=None):
         size = self.board.configuration.size
@@ -0,0 +1,44 @@
+from collections import deque
+
+# NOTE: picks the next of a player's ships / shipyards still waiting for an action this turn, for the envs that hand
+# out one entity per _step (halite_v1, HaliteWrapperV0). Instead of rescanning every ship on the board with a list
+# membership test per ship on each call (O(n^2) per turn), the entities are queued once per turn, ships first then
+# shipyards in board order, and entities that got an action or were set idle are popped off the front: O(1) amortized
+# per pick. The queue is refilled whenever it is asked about a different board (after board.next(), a reset), which
+# also clears the idle set.
+
+
+class entity_scheduler():
+    def __init__(self, player_id=0, shipyards=True):
+        self._player_id = player_id
+        self._shipyards = shipyards
+        self._board = None
+        self._queue = deque()
+        self._idle = set()
+
+    def refill(self, board):
+        player = board.players[self._player_id]
+        self._board = board
+        self._queue = deque([('ship', ship.id) for ship in player.ships])
+        if self._shipyards:
+            self._queue.extend(('shipyard', shipyard.id) for shipyard in player.shipyards)
+        self._idle = set()
+
+    def idle(self, entity_id):
+        # no action this turn, the entity is skipped until the next refill
+        self._idle.add(entity_id)
+
+    def current(self, board):
+        # (id, 'ship' / 'shipyard') of the first entity without an action, (None, 'UNKNOWN') when the turn is complete.
+        # The same entity comes back until it gets an action or is set idle
+        if board is not self._board:
+            self.refill(board)
+        while self._queue:
+            entity_type, entity_id = self._queue[0]
+            entity = (board.ships if entity_type == 'ship' else board.shipyards).get(entity_id)
+            if entity is not None and entity.next_action is None and entity_id not in self._idle:
+                return_object = (entity_id, entity_type)
+                return return_object
+            self._queue.popleft()
+        return_object = (None, 'UNKNOWN')
+        return return_object
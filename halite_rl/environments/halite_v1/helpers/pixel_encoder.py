@@ -0,0 +1,75 @@
+import numpy as np
+
+# NOTE: the 3 channel pixel observation of halite_v1, HaliteWrapperV0 and halite_v2 (halite, ships, shipyards) without
+# the cell by cell board[(x, size - y - 1)] loop. Planes are [3, size, size] with rows top down (row = size - y - 1,
+# like state_encoder), written into one of buffer_count preallocated float32 buffers, valid for buffer_count - 1
+# further encode calls. Entities are scattered by flat cell index (row * size + col, pos // size and pos % size).
+# encode reads a kaggle observation, obs['halite'] is already in that flat order. encode_board reads a kaggle Board
+# directly (board.observation rebuilds the whole observation through a Point per cell, slower than the encoding):
+# its cells are stored x major, y up, so the halite is read [x, y] and flipped to rows top down with one .T[::-1].
+# halite_v1 and HaliteWrapperV0 index their pixels [x][y][channel], that is the planes .transpose(2, 1, 0).
+
+
+def board_halite(board):
+    # [size, size] float64 halite of a kaggle Board, rows top down
+    size = board.configuration.size
+    return_object = np.fromiter((cell.halite for cell in board.cells.values()), np.float64,
+                                size * size).reshape(size, size).T[::-1]
+    return return_object
+
+
+class pixel_encoder():
+    def __init__(self, board_size, max_cell_halite, buffer_count=2):
+        self._board_size = board_size
+        self._max_cell_halite = float(max_cell_halite)
+        self._pixels = np.zeros([buffer_count, 3, board_size, board_size], dtype=np.float32)
+        self._next_pixels = 0
+
+    def encode(self, obs, player_id=None, ship_id=None, shipyard_id=None, shipyard_value=0.5,
+               shipyards_under_ships=False):
+        # [3, size, size]: 0 = halite / max_cell_halite, 1 = ships, 2 = shipyards. Entities are 1.0 when they belong to
+        # player_id or are ship_id / shipyard_id (one hot), the other ships 0.5 and the other shipyards shipyard_value.
+        # A shipyard under a ship is left out unless shipyards_under_ships
+        size = self._board_size
+        halite = np.asarray(obs['halite'], dtype=np.float64).reshape(size, size)
+        players = [(shipyards, {entity_id: ship[0] for entity_id, ship in ships.items()})
+                   for _, shipyards, ships in obs['players']]
+        return_object = self._encode(halite, players, player_id, ship_id, shipyard_id, shipyard_value,
+                                     shipyards_under_ships)
+        return return_object
+
+    def encode_board(self, board, player_id=None, ship_id=None, shipyard_id=None, shipyard_value=0.5,
+                     shipyards_under_ships=False):
+        # encode for a kaggle Board
+        size = self._board_size
+        halite = board_halite(board)
+        players = [({shipyard.id: shipyard.position.to_index(size) for shipyard in player.shipyards},
+                    {ship.id: ship.position.to_index(size) for ship in player.ships})
+                   for player in board.players.values()]
+        return_object = self._encode(halite, players, player_id, ship_id, shipyard_id, shipyard_value,
+                                     shipyards_under_ships)
+        return return_object
+
+    def _encode(self, halite, players, player_id, ship_id, shipyard_id, shipyard_value, shipyards_under_ships):
+        # halite [size, size] rows top down, players [(shipyard id: cell, ship id: cell)] per player
+        pixels = self._pixels[self._next_pixels]
+        self._next_pixels = (self._next_pixels + 1) % len(self._pixels)
+        pixels[1:] = 0
+        ships, shipyards = pixels[1].reshape(-1), pixels[2].reshape(-1)
+
+        # divided in float64 like the per cell loop, then stored as float32
+        np.divide(halite, self._max_cell_halite, out=pixels[0], casting='unsafe')
+
+        for player, (player_shipyards, player_ships) in enumerate(players):
+            own = player == player_id
+            shipyards[list(player_shipyards.values())] = 1.0 if own else shipyard_value
+            ships[list(player_ships.values())] = 1.0 if own else 0.5
+            if ship_id in player_ships:
+                ships[player_ships[ship_id]] = 1.0
+            if shipyard_id in player_shipyards:
+                shipyards[player_shipyards[shipyard_id]] = 1.0
+
+        if not shipyards_under_ships:
+            shipyards[ships > 0] = 0
+
+        return pixels
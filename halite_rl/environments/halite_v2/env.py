@@ -19,7 +19,11 @@ import uuid
 import matplotlib
 from .helpers.image_render_v2 import image_render_v2
 from .helpers.stopwatch import stopwatch
-from .helpers.random_agent import random_agent
+from halite_rl.environments.helpers.random_agent import vectorized_random_agent
+from halite_rl.environments.helpers.board_template import board_template
+from halite_rl.environments.helpers.gaussian_kernel import gaussian_board
+from halite_rl.environments.helpers.frame_stack import frame_stack
+from halite_rl.environments.halite_v1.helpers.pixel_encoder import pixel_encoder, board_halite
 
 # NOTE: This class is only to train a single bot to navigate, collect halite and return it to base.
 # In later envs, we will introduce other bots
@@ -27,11 +31,11 @@ from .helpers.random_agent import random_agent
 tf.compat.v1.enable_v2_behavior()
 
 class halite_ship_navigation(py_environment.PyEnvironment):
-    def __init__(self, window_name, render_me=True):
+    def __init__(self, window_name, render_me=True, board_size=25):
         self._this_stopwatch = stopwatch()
         print('Initializing Env')
         # game parameters
-        self._board_size = 25
+        self._board_size = board_size
         self._max_turns = 400
         if self._max_turns > 25:
             self._frames = 25
@@ -46,6 +50,8 @@ class halite_ship_navigation(py_environment.PyEnvironment):
                             4: ShipAction.WEST}
         self.render_step = render_me
         self.window_name = f''
+        # the opponents' rolls
+        self._rng = np.random.default_rng()
 
         # runtime parameters
         self.turns_counter = 0
@@ -59,27 +65,28 @@ class halite_ship_navigation(py_environment.PyEnvironment):
         self.last_action = 'NOTHING'
         self.max_turns_not_moved = 10
 
-        # initialize game
-        self.environment = make("halite", configuration={"size": self._board_size, "startingHalite": 1000,
-                                                         "episodeSteps": self._max_turns })
-        self.environment.reset(self._agent_count)
+        # initialize game, the kaggle environment is made once and every episode starts from the board template
+        self._board_template = board_template({"size": self._board_size, "startingHalite": 1000,
+                                               "episodeSteps": self._max_turns}, self._agent_count,
+                                              [('ship', ShipAction.CONVERT), ('shipyard', ShipyardAction.SPAWN)])
+        self.environment = self._board_template.environment
 
         self._action_spec = array_spec.BoundedArraySpec(
             shape=(), dtype=np.int32, minimum=0, maximum=len(self._action_def)-1, name='action')
         self._observation_spec = array_spec.BoundedArraySpec(
-            shape=(self._frames, self._channels, self._board_size, self._board_size), dtype=np.int32, minimum=0,
-            maximum=1, name='observation')
+            shape=(self._frames, self._channels, self._board_size, self._board_size), dtype=np.float32, minimum=0.0,
+            maximum=1.0, name='observation')
 
-        self.state = np.zeros([self._channels, self._board_size, self._board_size])
+        self.state = np.zeros([self._channels, self._board_size, self._board_size], dtype=np.float32)
         # 0 = Halite 0-1
         # 1 = Ships (This One Hot, rest are .5)
         # 2 = Shipyards (This One Hot, rest are .5)
         # 3 = Halite Heat Map
 
-        self.state_history = [self.state] * self._frames
+        self.state_history = frame_stack(self._frames, self.state.shape, dtype=np.float32)
+        self._pixel_encoder = pixel_encoder(self._board_size, self.environment.configuration.maxCellHalite)
 
         # get board
-        self.board = self.get_board()
         self.prime_board()
         self.halite_image_render = image_render_v2(self._board_size)
         self.previous_ship_count = 0
@@ -100,17 +107,12 @@ class halite_ship_navigation(py_environment.PyEnvironment):
         self.episode_ended = False
         self.total_reward = 0
         self.turns_not_moved = 0
-        # initialize game
-        self.environment = make("halite", configuration={"size": self._board_size, "startingHalite": 1000,
-                                                         "episodeSteps": self._max_turns })
-        self.environment.reset(self._agent_count)
         # get board
-        self.board = self.get_board()
-        self.state = np.zeros([self._channels, self._board_size, self._board_size])
-        self.state_history = [self.state] * self._frames
+        self.state = np.zeros([self._channels, self._board_size, self._board_size], dtype=np.float32)
+        self.state_history.reset()
 
         self.prime_board()
-        return_object = ts.restart(np.array(self.state_history, dtype=np.int32))
+        return_object = ts.restart(self.state_history.observation())
         return return_object
 
     def _step(self, action):
@@ -137,9 +139,8 @@ class halite_ship_navigation(py_environment.PyEnvironment):
             cargo_before_turn = self.board.ships['2-1'].halite
         halite_before_turn = self.board.players[0].halite
 
-        random_agent(self.board, self.board.players[1])
-        random_agent(self.board, self.board.players[2])
-        random_agent(self.board, self.board.players[3])
+        for player_id in range(1, self._agent_count):
+            vectorized_random_agent(self.board, player_id, self._rng)
 
         self.board = self.board.next()
 
@@ -183,32 +184,25 @@ class halite_ship_navigation(py_environment.PyEnvironment):
         # final wrap up
         self.turns_counter += 1
         self.state_history.append(self.state)
-        del self.state_history[:1]
 
         # final
         if self.episode_ended:
-            return_object = ts.termination(np.array(self.state_history, dtype=np.int32), reward)
+            return_object = ts.termination(self.state_history.observation(), reward)
             return return_object
         else:
-            return_object = ts.transition(np.array(self.state_history, dtype=np.int32), reward=reward, discount=1.0)
+            return_object = ts.transition(self.state_history.observation(), reward=reward, discount=1.0)
             return return_object
 
     def set_rendering(self, enabled=True):
         self.render_step = enabled
 
     def prime_board(self):
-        self.board.players[0].ships[0].next_action = ShipAction.CONVERT
-        self.board = self.board.next()
-        self.state, heat_map = self.get_state_v2()
-        self.state_history.append(self.state)
-        del self.state_history[:1]
-        self.turns_counter += 1
-        self.board.players[0].shipyards[0].next_action = ShipyardAction.SPAWN
-        self.board = self.board.next()
-        self.state, heat_map = self.get_state_v2()
-        self.state_history.append(self.state)
-        del self.state_history[:1]
-        self.turns_counter += 1
+        # convert, spawn, replayed by the board template on a fresh layout
+        for board in self._board_template.new_game():
+            self.board = board.to_board()
+            self.state, heat_map = self.get_state_v2()
+            self.state_history.append(self.state)
+            self.turns_counter += 1
 
 
     def get_board(self):
@@ -219,30 +213,13 @@ class halite_ship_navigation(py_environment.PyEnvironment):
 
     def get_state_v2(self):
         # this method, we are constructing both the board to be rendered and what is provided to the neural network.
-        reward_heatmap = np.zeros([self._board_size, self._board_size])
-        state_pixels = np.zeros([self._channels, self._board_size, self._board_size])
-        for x in range(0, self._board_size):
-            for y in range(0, self._board_size):
-                cell = self.board[(x, self._board_size - y - 1)]
-                cell_halite = 1.0 * cell.halite / float(self.board.configuration.max_cell_halite)
-                cell_halite_heat = 255 * cell.halite / float(self.board.configuration.max_cell_halite)
-                reward_heatmap[y, x] = cell_halite_heat
-                # 0 = Halite
-                # 1 = Ship Presence (One Hot 'ship_id', rest 0.5)
-                # 2 = Shipyard Presence (One Hot 'ship_id', rest 0.5)
-                state_pixels[0, y, x] = cell_halite
-                if cell.ship is not None:
-                    if cell.ship.player_id == 0:
-                        state_pixels[1, y, x] = 1
-                    else:
-                        state_pixels[1, y, x] = 0.5
-                elif cell.shipyard is not None:
-                    if cell.shipyard.player_id == 0:
-                        state_pixels[2, y, x] = 1
-                    else:
-                        state_pixels[2, y, x] = 0.5
+        # 0 = Halite
+        # 1 = Ship Presence (player 0's ships 1, rest 0.5)
+        # 2 = Shipyard Presence (player 0's shipyards 1, rest 0.5)
+        state_pixels = self._pixel_encoder.encode_board(self.board, player_id=0)
+        reward_heatmap = 255 * board_halite(self.board) / float(self.board.configuration.max_cell_halite)
 
         sigma = [0.7, 0.7]
-        reward_heatmap = sp.ndimage.filters.gaussian_filter(reward_heatmap, sigma, mode='constant')
+        reward_heatmap = gaussian_board(reward_heatmap, sigma, mode='constant')
 
         return state_pixels, reward_heatmap
\ No newline at end of file
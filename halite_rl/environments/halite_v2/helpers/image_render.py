@@ -2,7 +2,7 @@ import cv2
 import uuid
 import numpy as np
 import math
-from skimage import draw
+from halite_rl.environments.helpers.sprite_atlas import sprite_atlas, premade_sprites
 import math
 from kaggle_environments import make
 from kaggle_environments.envs.halite.helpers import *
@@ -35,78 +35,12 @@ class image_render():
         self.initialize_sprite_models()
 
     def initialize_sprite_models(self):
-        # calculate sprite size
-        sprite_size = math.floor(self._final_image_dimension / self._board_size)
-
-        # render ship and shipyard model
-        ship_sprite_model = np.zeros([sprite_size, sprite_size])
-        shipyard_sprite_model = np.zeros([sprite_size, sprite_size])
-        ship_and_shipyard_sprite_model = np.zeros([sprite_size, sprite_size])
-
-        for h in range(sprite_size):
-            for w in range(sprite_size):
-                if h > ((sprite_size / 3) * 1) and h < ((sprite_size / 3) * 2) and \
-                    w > ((sprite_size / 3) * 1) and w < ((sprite_size / 3) * 2):
-                    ship_sprite_model[h, w] = 1
-                else:
-                    shipyard_sprite_model[h, w] = 1
-                ship_and_shipyard_sprite_model[h, w] = 1
-
-        self.sprite_models['ship_sprite'] = ship_sprite_model
-        self.sprite_models['shipyard_sprite'] = shipyard_sprite_model
-        self.sprite_models['ship_and_shipyard_sprite'] = ship_and_shipyard_sprite_model
-
-        for player_id in range(4):
-            BGR_color = self.BGR_colors[self.player_colors[player_id]]
-            render_ship_sprite = np.zeros([sprite_size, sprite_size, 3])
-            for h in range(sprite_size):
-                for w in range(sprite_size):
-                    if self.sprite_models['ship_sprite'][h, w] == 1:
-                        render_ship_sprite[h, w] = BGR_color
-                    else:
-                        render_ship_sprite[h, w] = self.BGR_colors['black']
-
-            self.premade_rendered_sprites[f'ship_sprite_player_{player_id}'] = render_ship_sprite
-
-            render_shipyard_sprite = np.zeros([sprite_size, sprite_size, 3])
-            for h in range(sprite_size):
-                for w in range(sprite_size):
-                    if self.sprite_models['shipyard_sprite'][h, w] == 1:
-                        render_shipyard_sprite[h, w] = BGR_color
-                    else:
-                        render_shipyard_sprite[h, w] = self.BGR_colors['black']
-
-            self.premade_rendered_sprites[f'shipyard_sprite_player_{player_id}'] = render_shipyard_sprite
-
-            render_ship_and_shipyard_sprite = np.zeros([sprite_size, sprite_size, 3])
-            for h in range(sprite_size):
-                for w in range(sprite_size):
-                    if self.sprite_models['ship_and_shipyard_sprite'][h, w] == 1:
-                        render_ship_and_shipyard_sprite[h, w] = BGR_color
-                    else:
-                        render_ship_and_shipyard_sprite[h, w] = self.BGR_colors['black']
-
-            self.premade_rendered_sprites[f'ship_and_shipyard_sprite_player_{player_id}'] = render_ship_and_shipyard_sprite
-
-
-
-        circle_center = math.floor(sprite_size / 2)
-        for s in range(10):
-            circle_sprite_model = np.zeros([sprite_size, sprite_size])
-            radius = ((sprite_size * (s * 3)) / 100)
-            ri, ci = draw.circle(circle_center, circle_center, radius=radius, shape=circle_sprite_model.shape)
-            circle_sprite_model[ri, ci] = 1
-            self.sprite_models[f'circle_sprite_{s}'] = circle_sprite_model
-
-            render_halite_sprite = np.zeros([sprite_size, sprite_size, 3])
-            BGR_color = self.BGR_colors['cyan']
-            for h in range(sprite_size):
-                for w in range(sprite_size):
-                    if self.sprite_models[f'circle_sprite_{s}'][h, w] == 1:
-                        render_halite_sprite[h, w] = BGR_color
-                    else:
-                        render_halite_sprite[h, w] = self.BGR_colors['black']
-            self.premade_rendered_sprites[f'circle_sprite_{s}'] = render_halite_sprite
+        # the masks and painted sprites are built once per board size and shared (sprite_atlas)
+        _, sprite_models = sprite_atlas(self._board_size, self._final_image_dimension)
+        self.sprite_models.update(sprite_models)
+        # render_board paints the heat into the halite sprites, so keep writable float copies
+        for name, sprite in premade_sprites(self._board_size, self._final_image_dimension).items():
+            self.premade_rendered_sprites[name] = sprite.astype(np.float64)
 
     def render_board(self, board, state, total_reward, this_step_reward):
         # calculate sprite size
@@ -2,11 +2,12 @@ import cv2
 import uuid
 import numpy as np
 import math
-from skimage import draw
+from halite_rl.environments.helpers.sprite_atlas import sprite_atlas, premade_sprites
 import math
 from kaggle_environments import make
 from kaggle_environments.envs.halite.helpers import *
 import scipy as sp
+from halite_rl.environments.helpers.gaussian_kernel import gaussian_board
 
 
 class image_render_v2():
@@ -36,84 +37,10 @@ class image_render_v2():
         self.initialize_sprite_models()
 
     def initialize_sprite_models(self):
-        # calculate sprite size
-        sprite_size = math.floor(self._final_image_dimension / self._board_size)
-
-        # render ship and shipyard model
-        ship_sprite_model = np.zeros([sprite_size, sprite_size])
-        shipyard_sprite_model = np.zeros([sprite_size, sprite_size])
-        ship_and_shipyard_sprite_model = np.zeros([sprite_size, sprite_size])
-
-        for h in range(sprite_size):
-            for w in range(sprite_size):
-                if h > ((sprite_size / 3) * 1) and h < ((sprite_size / 3) * 2) and \
-                    w > ((sprite_size / 3) * 1) and w < ((sprite_size / 3) * 2):
-                    ship_sprite_model[h, w] = 1
-                else:
-                    shipyard_sprite_model[h, w] = 1
-                ship_and_shipyard_sprite_model[h, w] = 1
-
-        self._sprite_models['ship_sprite'] = ship_sprite_model
-        self._sprite_models['shipyard_sprite'] = shipyard_sprite_model
-        self._sprite_models['ship_and_shipyard_sprite'] = ship_and_shipyard_sprite_model
-
-        # paint the models
-        for player_id in range(4):
-            # get this player color
-            BGR_color = self._BGR_colors[self._player_colors[player_id]]
-
-            # paint ships
-            render_ship_sprite = np.zeros([sprite_size, sprite_size, 3])
-            for h in range(sprite_size):
-                for w in range(sprite_size):
-                    if self._sprite_models['ship_sprite'][h, w] == 1:
-                        render_ship_sprite[h, w] = BGR_color
-                    else:
-                        render_ship_sprite[h, w] = [0, 0, 0] # heatmap background
-
-            self._premade_rendered_sprites[f'ship_sprite_player_{player_id}'] = render_ship_sprite
-
-            # paint shipyards
-            render_shipyard_sprite = np.zeros([sprite_size, sprite_size, 3])
-            for h in range(sprite_size):
-                for w in range(sprite_size):
-                    if self._sprite_models['shipyard_sprite'][h, w] == 1:
-                        render_shipyard_sprite[h, w] = BGR_color
-                    else:
-                        render_shipyard_sprite[h, w] = [0, 0, 0] # heatmap background
-
-            self._premade_rendered_sprites[f'shipyard_sprite_player_{player_id}'] = render_shipyard_sprite
-
-            # paint shipyard and ship
-            render_ship_and_shipyard_sprite = np.zeros([sprite_size, sprite_size, 3])
-            for h in range(sprite_size):
-                for w in range(sprite_size):
-                    if self._sprite_models['ship_and_shipyard_sprite'][h, w] == 1:
-                        render_ship_and_shipyard_sprite[h, w] = BGR_color
-                    else:
-                        render_ship_and_shipyard_sprite[h, w] = [0, 0, 0] # heatmap background
-
-            self._premade_rendered_sprites[f'ship_and_shipyard_sprite_player_{player_id}'] = render_ship_and_shipyard_sprite
-
-
-        # paint halite
-        circle_center = math.floor(sprite_size / 2)
-        for s in range(10):
-            circle_sprite_model = np.zeros([sprite_size, sprite_size])
-            radius = ((sprite_size * (s * 3)) / 100)
-            ri, ci = draw.circle(circle_center, circle_center, radius=radius, shape=circle_sprite_model.shape)
-            circle_sprite_model[ri, ci] = 1
-            self._sprite_models[f'circle_sprite_{s}'] = circle_sprite_model
-
-            render_halite_sprite = np.zeros([sprite_size, sprite_size, 3])
-            BGR_color = self._BGR_colors['cyan']
-            for h in range(sprite_size):
-                for w in range(sprite_size):
-                    if self._sprite_models[f'circle_sprite_{s}'][h, w] == 1:
-                        render_halite_sprite[h, w] = BGR_color
-                    else:
-                        render_halite_sprite[h, w] = [0, 0, 0] # heatmap background
-            self._premade_rendered_sprites[f'circle_sprite_{s}'] = render_halite_sprite
+        # the masks and painted sprites are built once per board size and shared (sprite_atlas)
+        _, sprite_models = sprite_atlas(self._board_size, self._final_image_dimension)
+        self._sprite_models.update(sprite_models)
+        self._premade_rendered_sprites.update(premade_sprites(self._board_size, self._final_image_dimension))
 
     def render_board(self, board, state, heat_map, total_reward, this_step_reward, window_name, average_return_history = None):
         # calculate sprite size
@@ -132,7 +59,7 @@ class image_render_v2():
 
         # Apply gaussian filter
         sigma = [0.7, 0.7]
-        reward_heatmap = sp.ndimage.filters.gaussian_filter(reward_heatmap, sigma, mode='constant')
+        reward_heatmap = gaussian_board(reward_heatmap, sigma, mode='constant')
 
 
         for board_h in range(self._board_size):
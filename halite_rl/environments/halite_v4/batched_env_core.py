@@ -0,0 +1,263 @@
+import numpy as np
+
+from kaggle_environments.envs.halite.helpers import *
+from halite_rl.environments.halite_v4.helpers.render_worker import render_worker
+from halite_rl.environments.halite_v4.helpers.stopwatch import stopwatch
+from halite_rl.environments.halite_v4.helpers.step_profiler import step_profiler
+from halite_rl.environments.helpers.random_agent import batched_random_agent
+from halite_rl.environments.helpers.array_board import _ship_action_codes
+from halite_rl.environments.halite_v4.helpers.batched_board import batched_board
+from halite_rl.environments.helpers.board_template import board_template
+from halite_rl.environments.helpers.gaussian_kernel import gaussian_board
+from halite_rl.environments.halite_v4.helpers.step_type import FIRST, MID, LAST
+
+# NOTE: Same navigation task as halite_ship_navigation, but N games are held in one batched_board and stepped together,
+# so one policy.action call serves the whole batch (tf_agents batched PyEnvironment, batch_size=N).
+# A game that returned LAST is restarted on the next step and returns FIRST, the action for it is ignored.
+# Without tf_agents like halite_ship_navigation_core, batched_env.py is the PyEnvironment.
+
+
+class batched_halite_ship_navigation_core():
+    def __init__(self, env_name, batch_size=8, render_me=True, record_dir=None, render_every_n_episodes=1,
+                 profile_every_n_episodes=0, board_size=15, seed=None):
+        self._this_stopwatch = stopwatch()
+        print('Initializing Batched Env')
+        # game parameters
+        self._board_size = board_size
+        self._max_turns = 100
+        self._network_frame_depth = 1
+
+        if self._max_turns > self._network_frame_depth:
+            self._frames = self._network_frame_depth
+        else:
+            self._frames = self._max_turns
+
+        self._agent_count = 2
+        self._channels = 2
+        # heatmap edges, 'constant' fades out at the board edge, 'wrap' wraps around like the halite board does
+        self._heatmap_mode = 'constant'
+
+        self._action_def = {0: ShipAction.EAST,
+                            1: ShipAction.NORTH,
+                            2: "NOTHING",
+                            3: ShipAction.SOUTH,
+                            4: ShipAction.WEST}
+        self._action_codes = np.array([_ship_action_codes.get(self._action_def[i]) or 0
+                                       for i in range(len(self._action_def))], dtype=np.int8)
+
+        self.render_step = render_me
+        self._env_name = env_name
+        self._batch_size = batch_size
+        self._max_groth_step = 1
+
+        self._board_template = board_template({"size": self._board_size, "startingHalite": 1000,
+                                               "episodeSteps": self._max_turns}, self._agent_count,
+                                              [('ship', ShipAction.CONVERT), ('shipyard', ShipyardAction.SPAWN),
+                                               ('ship', ShipAction.NORTH), ('ship', ShipAction.NORTH)], seed=seed)
+        self.environment = self._board_template.environment
+        # layouts, target picks and the opponent's rolls, all from seed (None is fresh entropy)
+        self.seed(seed)
+
+        self._action_bounds = dict(
+            shape=(), dtype=np.int32, minimum=0, maximum=len(self._action_def) - 1, name='action')
+        self._observation_bounds = dict(
+            shape=(self._frames, self._channels, self._board_size, self._board_size), dtype=np.float32,
+            minimum=0.0, maximum=1.0, name='observation')
+
+        # runtime parameters, one entry per game
+        self.board = batched_board(batch_size, self.environment.configuration, self._agent_count)
+        self.turns_counter = np.zeros(batch_size, dtype=np.int64)
+        self.episode_ended = np.zeros(batch_size, dtype=bool)
+        self.agent_ship = np.full(batch_size, -1, dtype=np.int64)
+        self.has_target = np.zeros(batch_size, dtype=bool)
+        self.target = np.zeros(batch_size, dtype=np.int64)  # cell index in the state
+        self.env_step_count = 0
+
+        self.state = np.zeros([batch_size, self._channels, self._board_size, self._board_size], dtype=np.float32)
+        self.state_history = np.zeros([batch_size, self._frames, self._channels, self._board_size, self._board_size],
+                                      dtype=np.float32)
+        self._step_type = np.zeros(batch_size, dtype=np.int32)
+
+        # rendering runs in a worker process: a window (render_me) and / or a gif per episode of game 0 in record_dir,
+        # for every render_every_n_episodes-th episode
+        self._render_worker = None
+        if render_me or record_dir is not None:
+            self._render_worker = render_worker(self._board_size, env_name, show=render_me, record_dir=record_dir,
+                                                every_n_episodes=render_every_n_episodes)
+        # wall time per _step phase (whole batch), printed every profile_every_n_episodes episodes (0 is off)
+        self._profiler = step_profiler(env_name, profile_every_n_episodes)
+        print(f'Initialized at {self._this_stopwatch.elapsed()}')
+
+    @property
+    def batched(self):
+        return True
+
+    @property
+    def batch_size(self):
+        return self._batch_size
+
+    def action_bounds(self):
+        return_object = self._action_bounds
+        return return_object
+
+    def observation_bounds(self):
+        return_object = self._observation_bounds
+        return return_object
+
+    def close(self):
+        if self._render_worker is not None:
+            self._render_worker.close()
+
+    def seed(self, seed=None):
+        # same streams as halite_ship_navigation.seed
+        layouts, targets, opponent = np.random.SeedSequence(seed).spawn(3)
+        self._board_template.seed(layouts)
+        self._target_rng = np.random.default_rng(targets)
+        self._rng = np.random.default_rng(opponent)
+
+    def game_reset(self):
+        for game in range(self._batch_size):
+            self.reset_game(game)
+        self.state = self.get_state_v2()
+        self.state_history[:] = 0
+        self.state_history[:, -1] = self.state
+        return_object = (FIRST, 0.0, 1.0, self.state_history)
+        return return_object
+
+    def reset_game(self, game):
+        # fresh layout primed (convert, spawn, north, north) by the board template, then loaded into the batch
+        board = self._board_template.new_game()[-1]
+        uids = self.board.load(game, board)
+        self.agent_ship[game] = uids[board.players[0].ships[0].id]
+        self.turns_counter[game] = 4
+        self.has_target[game] = False
+        self.episode_ended[game] = False
+        if game == 0 and self._render_worker is not None:
+            self._render_worker.begin_episode()
+
+    def game_step(self, action):
+        # ===initialize variables===
+        self._profiler.start_step()
+        actions = np.asarray(action).reshape(-1)
+        size = self._board_size
+        restarting = self.episode_ended.copy()
+        stepping = ~restarting
+        self.env_step_count += 1
+
+        # ===pick targets===
+        picking = np.flatnonzero(stepping & ~self.has_target)
+        if len(picking) > 0:
+            if self.env_step_count >= self._max_groth_step:
+                max_range = size - 1
+            else:
+                max_range = int((size - 1 * self.env_step_count) / self._max_groth_step) + 1
+            max_range = min(max_range, size - 1)
+
+            # first shipyard of player 0 in each game, offset by a random (y, x) in board coordinates
+            home = np.flatnonzero(self.board.shipyard_owner == 0)
+            home_game, first = np.unique(self.board.shipyard_game[home], return_index=True)
+            home_pos = np.zeros(self._batch_size, dtype=np.int64)
+            home_pos[home_game] = self.board.shipyard_pos[home[first]]
+            offset = self._target_rng.integers(0, max_range, size=(len(picking), 2))
+            target_y = (size - 1 - home_pos[picking] // size + offset[:, 0]) % size
+            target_x = (home_pos[picking] % size + offset[:, 1]) % size
+            self.target[picking] = (size - target_y - 1) * size + target_x
+            self.has_target[picking] = True
+
+        # ===take action===
+        agent = np.flatnonzero(np.isin(self.board.ship_uid, self.agent_ship[stepping]))
+        self.board.ship_action[agent] = self._action_codes[actions[self.board.ship_game[agent]]]
+
+        self._profiler.lap('target_pick')
+
+        # ===move random bots===
+        batched_random_agent(self.board, 1, self._rng)
+        self._profiler.lap('random_agent')
+
+        # ===perform move===
+        self.board.advance()
+        for game in np.flatnonzero(restarting):
+            self.reset_game(game)
+        self._profiler.lap('board_next')
+        self.state = self.get_state_v2()
+        self._profiler.lap('get_state_v2')
+
+        # ===determine if game over=== (no punishment)
+        agent = np.flatnonzero(np.isin(self.board.ship_uid, self.agent_ship))
+        agent_alive = np.zeros(self._batch_size, dtype=bool)
+        agent_alive[self.board.ship_game[agent]] = True
+        ended = ~agent_alive | (self.board.player_shipyard_count(0) == 0) | (self.turns_counter == self._max_turns)
+        ended &= stepping
+
+        # ===calculate reward===
+        reward = np.zeros(self._batch_size, dtype=np.float32)
+        rewarded = ~ended[self.board.ship_game[agent]] & stepping[self.board.ship_game[agent]]
+        reward_game = self.board.ship_game[agent][rewarded]
+        reward_pos = self.board.ship_pos[agent][rewarded]
+        reward[reward_game] = self.state[reward_game, 0, reward_pos // size, reward_pos % size]
+
+        # ===append to state history===
+        self.turns_counter[stepping] += 1
+        self.state_history[stepping, :-1] = self.state_history[stepping, 1:]
+        self.state_history[restarting] = 0
+        self.state_history[:, -1] = self.state
+        self.episode_ended = ended
+        self._profiler.lap('reward')
+
+        # ===render image===
+        if self._render_worker is not None:
+            self._render_worker.frame(self.board.board(0), self.state[0])
+            if self.episode_ended[0]:
+                self._render_worker.end_episode()
+        self._profiler.lap('render')
+
+        # ===return to engine===
+        self._step_type[:] = MID
+        self._step_type[ended] = LAST
+        self._step_type[restarting] = FIRST
+        return_object = (self._step_type, reward, ~ended, self.state_history)
+        self._profiler.lap('transition')
+        self._profiler.end_step(int(np.sum(ended)))
+        return return_object
+
+    def get_state_v2(self):
+        # batched version of halite_ship_navigation.get_state_v2, one cached gaussian kernel product for all games
+        size = self._board_size
+        cell_count = size ** 2
+        board = self.board
+        attract_heatmap = np.zeros([self._batch_size, cell_count])
+        detract_heatmap = np.zeros([self._batch_size, cell_count])
+        self_location = np.zeros([self._batch_size, cell_count])
+        state = np.zeros([self._batch_size, self._channels, size, size], dtype=np.float32)
+
+        hot_spot = size * 10
+
+        enemy = board.ship_owner != 0
+        detract_heatmap[board.ship_game[enemy], board.ship_pos[enemy]] = hot_spot
+        enemy_shipyard = board.shipyard_owner != 0
+        detract_heatmap[board.shipyard_game[enemy_shipyard], board.shipyard_pos[enemy_shipyard]] = hot_spot
+
+        agent = np.isin(board.ship_uid, self.agent_ship)
+        self_location[board.ship_game[agent], board.ship_pos[agent]] = 1.0
+        targeted = board.ship_game[agent][self.has_target[board.ship_game[agent]]]
+        attract_heatmap[targeted, self.target[targeted]] = hot_spot * 50
+
+        attract_sigma = [size / 3, size / 3]
+        attract_heatmap = gaussian_board(attract_heatmap.reshape(-1, size, size), attract_sigma,
+                                         self._heatmap_mode).reshape(-1, cell_count)
+        detract_sigma = [size / 20, size / 20]
+        detract_heatmap = gaussian_board(detract_heatmap.reshape(-1, size, size), detract_sigma,
+                                         self._heatmap_mode).reshape(-1, cell_count)
+
+        attract_heatmap[targeted, self.target[targeted]] = hot_spot
+        detract_heatmap[board.ship_game[enemy], board.ship_pos[enemy]] = hot_spot
+
+        # normalize each...
+        for heatmap in [attract_heatmap, detract_heatmap]:
+            heatmap_max = heatmap.max(axis=1, keepdims=True)
+            np.divide(heatmap * 0.5, heatmap_max, out=heatmap, where=heatmap_max > 0)
+
+        state[:, 0] = (0.5 + attract_heatmap - detract_heatmap).reshape(-1, size, size)
+        state[:, 1] = self_location.reshape(-1, size, size)
+
+        return state
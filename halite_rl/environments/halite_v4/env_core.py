@@ -0,0 +1,273 @@
+import numpy as np
+
+from kaggle_environments.envs.halite.helpers import *
+from halite_rl.environments.halite_v4.helpers.render_worker import render_worker
+from halite_rl.environments.halite_v4.helpers.stopwatch import stopwatch
+from halite_rl.environments.halite_v4.helpers.step_profiler import step_profiler
+from halite_rl.environments.helpers.random_agent import vectorized_random_agent
+from halite_rl.environments.helpers.array_board import array_board
+from halite_rl.environments.helpers.board_template import board_template
+from halite_rl.environments.halite_v4.helpers.state_encoder import state_encoder
+from halite_rl.environments.helpers.frame_stack import frame_stack
+from halite_rl.environments.halite_v4.helpers.step_type import FIRST, MID, LAST
+
+# NOTE: This class is only to train a single bot to navigate, collect halite and return it to base.
+# In later envs, we will introduce other bots
+# The game itself, without tf_agents: game_reset / game_step return (step_type, reward, discount, observation) and the
+# specs are plain BoundedArraySpec arguments, env.py wraps it into the PyEnvironment. parallel_env workers step this
+# class directly, so only numpy and the kaggle Board are imported here. Rendering (cv2, imageio) is imported by the
+# render worker process, not by the env.
+
+
+class halite_ship_navigation_core():
+    def __init__(self, env_name, render_me=True, backend='kaggle', record_dir=None, render_every_n_episodes=1,
+                 profile_every_n_episodes=0, board_size=15, seed=None):
+        self._this_stopwatch = stopwatch()
+        print('Initializing Env')
+        # game parameters
+        self._board_size = board_size
+        self._max_turns = 100
+        self._network_frame_depth = 1
+
+        if self._max_turns > self._network_frame_depth:
+            self._frames = self._network_frame_depth
+        else:
+            self._frames = self._max_turns
+
+        self._agent_count = 2
+        self._channels = 2
+        # heatmap edges, 'constant' fades out at the board edge, 'wrap' wraps around like the halite board does
+        self._heatmap_mode = 'constant'
+        # attract Target /w heatmap - avoid Target w/ heatmap
+        # self
+
+        self._action_def = {0: ShipAction.EAST,
+                            1: ShipAction.NORTH,
+                            2: "NOTHING",
+                            3: ShipAction.SOUTH,
+                            4: ShipAction.WEST}
+
+        self.render_step = render_me
+        self._env_name = env_name
+        # 'kaggle' steps the kaggle Board, 'numpy' steps the array_board (same rules, no per turn object rebuild)
+        self._backends = {'kaggle': Board, 'numpy': array_board}
+        if backend not in self._backends:
+            raise ValueError(f'unknown backend {backend}, expected one of {list(self._backends)}')
+        self._backend = backend
+        self._max_groth_step = 1
+
+        self.station_to_ship = {}
+
+        # runtime parameters
+        self.turns_counter = 0
+        self.episode_ended = False
+        self.total_reward = 0
+        self.ship_directive = {}  # ship id: {target:T, Action At Target:A}
+        self.action_history = []
+        self.env_step_count = 0
+
+        # initialize game, the kaggle environment is made once and every episode starts from the board template
+        self._board_template = board_template({"size": self._board_size, "startingHalite": 1000,
+                                               "episodeSteps": self._max_turns}, self._agent_count,
+                                              [('ship', ShipAction.CONVERT), ('shipyard', ShipyardAction.SPAWN),
+                                               ('ship', ShipAction.NORTH), ('ship', ShipAction.NORTH)], seed=seed)
+        self.environment = self._board_template.environment
+        # layouts, target picks and the opponent's rolls, all from seed (None is fresh entropy)
+        self.seed(seed)
+
+        self._action_bounds = dict(
+            shape=(), dtype=np.int32, minimum=0, maximum=len(self._action_def) - 1, name='action')
+        self._observation_bounds = dict(
+            shape=(self._frames, self._channels, self._board_size, self._board_size), dtype=np.float32, minimum=0.0,
+            maximum=1.0, name='observation')
+
+        self.state = np.zeros([self._channels, self._board_size, self._board_size], dtype=np.float32)
+
+        self.state_history = frame_stack(self._frames, self.state.shape, dtype=np.float32)
+        self._state_encoder = state_encoder(self._board_size, self._channels, heatmap_mode=self._heatmap_mode)
+
+        # get board
+        self.prime_board()
+        # rendering runs in a worker process: a window (render_me) and / or a gif per episode in record_dir,
+        # for every render_every_n_episodes-th episode
+        self._render_worker = None
+        if render_me or record_dir is not None:
+            self._render_worker = render_worker(self._board_size, env_name, show=render_me, record_dir=record_dir,
+                                                every_n_episodes=render_every_n_episodes)
+
+        # wall time per _step phase, printed every profile_every_n_episodes episodes (0 is off)
+        self._profiler = step_profiler(env_name, profile_every_n_episodes)
+
+        self.previous_ship_count = 0
+        print(f'Initialized at {self._this_stopwatch.elapsed()}')
+
+    @property
+    def batched(self):
+        return False
+
+    @property
+    def batch_size(self):
+        return None
+
+    def action_bounds(self):
+        return_object = self._action_bounds
+        return return_object
+
+    def observation_bounds(self):
+        return_object = self._observation_bounds
+        return return_object
+
+    def close(self):
+        if self._render_worker is not None:
+            self._render_worker.close()
+
+    def seed(self, seed=None):
+        # separate streams, so e.g. a longer opponent turn does not shift the next target or layout.
+        # Episodes reset after seed(s) are the same for the same s and actions, with either backend
+        layouts, targets, opponent = np.random.SeedSequence(seed).spawn(3)
+        self._board_template.seed(layouts)
+        self._target_rng = np.random.default_rng(targets)
+        self._rng = np.random.default_rng(opponent)
+
+    def game_reset(self):
+        self.last_reward = 0
+        self.turns_counter = 0
+        self.previous_ship_count = 0
+        self.episode_ended = False
+        self.total_reward = 0
+        self.turns_not_moved = 0
+        self.action_history = []
+        self.ship_directive = {}
+        # get board
+        self.state = np.zeros([self._channels, self._board_size, self._board_size], dtype=np.float32)
+        self.state_history.reset()
+
+        self.prime_board()
+        if self._render_worker is not None:
+            self._render_worker.begin_episode()
+        return_object = (FIRST, 0.0, 1.0, self.state_history.frames())
+        return return_object
+
+    def game_step(self, action):
+        # ===initialize variables===
+        self._profiler.start_step()
+        int_action = int(action)
+        reward = 0
+        self.env_step_count += 1
+
+        # ===pick targets===
+        # modes
+        # -parking
+        # -parked
+
+        if not '2-1' in self.ship_directive:
+            if self.env_step_count >= self._max_groth_step:
+                max_range = self._board_size - 1
+            else:
+                max_range = int((self._board_size - 1 * self.env_step_count) / self._max_groth_step) + 1
+
+            if max_range >= self._board_size:
+                max_range = self._board_size - 1
+
+            rand_y, rand_x = (int(offset) for offset in self._target_rng.integers(0, max_range, size=2))
+
+            target_y = self.board.players[0].shipyards[0].position.y + rand_y
+            target_x = self.board.players[0].shipyards[0].position.x + rand_x
+
+            if target_y >= self._board_size:
+                target_y = target_y - self._board_size
+
+            if target_x >= self._board_size:
+                target_x = target_x - self._board_size
+
+            self.ship_directive['2-1'] = {
+                'mode': 'parking',
+                'target': (target_y, target_x),  # south
+                'action_at_target': 'park'
+            }
+
+        # ===take action===
+        if not self._action_def[int_action] == 'NOTHING':
+            self.board.ships['2-1'].next_action = self._action_def[int_action]
+
+        self._profiler.lap('target_pick')
+
+        # ===move random bots===
+        vectorized_random_agent(self.board, 1, self._rng)
+        self._profiler.lap('random_agent')
+
+        # ===perform move===
+        self.board = self.board.next()
+        self._profiler.lap('board_next')
+        self.state = self.get_state_v2()
+        self._profiler.lap('get_state_v2')
+
+        # ===determine if game over=== (no punishment)
+        # no ship
+        if len(self.board.players[0].ships) == 0:
+            self.episode_ended = True
+        # no shipyard
+        if len(self.board.players[0].shipyards) == 0:
+            self.episode_ended = True
+        # max turns
+        if self.turns_counter == self._max_turns:
+            self.episode_ended = True
+
+        # ===calculate reward===
+        if not self.episode_ended:
+            pos = self.board.ships['2-1'].position
+            reward += self.state[0, self._board_size - pos.y - 1, pos.x]
+
+        # ===append to state history===
+        self.turns_counter += 1
+        self.state_history.append(self.state)
+        self._profiler.lap('reward')
+
+        # ===render image===
+        if self._render_worker is not None:
+            self._render_worker.frame(self.board, self.state)
+            if self.episode_ended:
+                self._render_worker.end_episode()
+        self._profiler.lap('render')
+
+        # ===return to engine===
+        if self.episode_ended:
+            return_object = (LAST, reward, 0.0, self.state_history.frames())
+        else:
+            return_object = (MID, reward, 1.0, self.state_history.frames())
+        self._profiler.lap('transition')
+        self._profiler.end_step(int(self.episode_ended))
+        return return_object
+
+    def prime_board(self):
+        # convert, spawn, north, north, replayed by the board template on a fresh layout
+        for board in self._board_template.new_game():
+            self.board = board
+            self.state = self.get_state_v2()
+            self.state_history.append(self.state)
+            self.turns_counter += 1
+        if self._backend == 'kaggle':
+            self.board = self.board.to_board()
+
+        self.station_to_ship[self.board.players[0].shipyards[0].id] = self.board.players[0].ships[0].id
+
+    def get_board(self):
+        obs = self.environment.state[0].observation
+        config = self.environment.configuration
+        actions = [agent.action for agent in self.environment.state]
+        return self._backends[self._backend](obs, config, actions)
+
+    def scale(self, X, x_min, x_max):
+        nom = (X - X.min(axis=0)) * (x_max - x_min)
+        denom = X.max(axis=0) - X.min(axis=0)
+        denom[denom == 0] = 1
+        return x_min + nom / denom
+
+    def get_state_v2(self, ship_in_question_id='2-1'):
+        # this method, we are constructing both the board to be rendered and what is provided to the neural network.
+        target = None
+        directive = self.ship_directive.get(ship_in_question_id)
+        if directive is not None and directive['mode'][-3:] == 'ing':
+            target = directive['target']
+        return_object = self._state_encoder.encode(self.board, ship_in_question_id, target)
+        return return_object
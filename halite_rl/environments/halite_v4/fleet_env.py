@@ -0,0 +1,35 @@
+import numpy as np
+
+from tf_agents.environments import py_environment
+from tf_agents.specs import array_spec
+from halite_rl.environments.halite_v4.fleet_env_core import fleet_halite_ship_navigation_core
+from halite_rl.environments.halite_v4.helpers.time_step_buffer import time_step_buffer
+
+# NOTE: fleet_halite_ship_navigation_core as a batched tf_agents PyEnvironment, the game lives in
+# fleet_env_core.py. The time steps are written into a time_step_buffer, the specs are built from the core's bounds.
+
+
+class fleet_halite_ship_navigation(fleet_halite_ship_navigation_core, py_environment.PyEnvironment):
+    def __init__(self, *args, **kwargs):
+        fleet_halite_ship_navigation_core.__init__(self, *args, **kwargs)
+        self._action_spec = array_spec.BoundedArraySpec(**self._action_bounds)
+        self._observation_spec = array_spec.BoundedArraySpec(**self._observation_bounds)
+        # the returned time steps, reused, see time_step_buffer
+        self._time_steps = time_step_buffer(self._observation_spec.shape, dtype=np.float32,
+                                            batch_size=self.batch_size)
+
+    def action_spec(self):
+        return_object = self._action_spec
+        return return_object
+
+    def observation_spec(self):
+        return_object = self._observation_spec
+        return return_object
+
+    def _reset(self):
+        return_object = self._time_steps.write(*self.game_reset())
+        return return_object
+
+    def _step(self, action):
+        return_object = self._time_steps.write(*self.game_step(action))
+        return return_object
@@ -0,0 +1,255 @@
+import numpy as np
+
+from kaggle_environments.envs.halite.helpers import *
+from halite_rl.environments.halite_v4.helpers.render_worker import render_worker
+from halite_rl.environments.halite_v4.helpers.stopwatch import stopwatch
+from halite_rl.environments.halite_v4.helpers.step_profiler import step_profiler
+from halite_rl.environments.helpers.random_agent import vectorized_random_agent
+from halite_rl.environments.helpers.array_board import array_board
+from halite_rl.environments.helpers.board_template import board_template
+from halite_rl.environments.halite_v4.helpers.state_encoder import state_encoder
+from halite_rl.environments.halite_v4.helpers.step_type import FIRST, MID, LAST
+
+# NOTE: Same navigation task as halite_ship_navigation, but player 0 plays a fleet of fleet_size ships instead of the
+# single ship '2-1'. Every ship has its own target and its own ego-centric observation (its location, its target), the
+# fleet is one tf_agents batch (batch_size=fleet_size), so one policy.action call, one batched Q-network pass, picks
+# every ship's move and the whole fleet moves in one board.next(). Observations have the single env's shape, a policy
+# trained on one works on the other.
+# The game ends for every ship together (a fleet ship or the shipyard lost, max turns), it is restarted on the next
+# step and returns FIRST, the actions for it are ignored.
+# Without tf_agents like halite_ship_navigation_core, fleet_env.py is the PyEnvironment.
+
+
+class fleet_halite_ship_navigation_core():
+    def __init__(self, env_name, fleet_size=4, render_me=True, backend='kaggle', record_dir=None,
+                 render_every_n_episodes=1, profile_every_n_episodes=0, board_size=15, seed=None):
+        self._this_stopwatch = stopwatch()
+        print('Initializing Fleet Env')
+        # game parameters
+        self._board_size = board_size
+        self._max_turns = 100
+        self._network_frame_depth = 1
+
+        if self._max_turns > self._network_frame_depth:
+            self._frames = self._network_frame_depth
+        else:
+            self._frames = self._max_turns
+
+        self._agent_count = 2
+        self._channels = 2
+        # heatmap edges, 'constant' fades out at the board edge, 'wrap' wraps around like the halite board does
+        self._heatmap_mode = 'constant'
+
+        self._action_def = {0: ShipAction.EAST,
+                            1: ShipAction.NORTH,
+                            2: "NOTHING",
+                            3: ShipAction.SOUTH,
+                            4: ShipAction.WEST}
+        # the opening spawns a ship per turn, each fleet ship heads away from the shipyard in its own direction
+        self._prime_directions = [ShipAction.NORTH, ShipAction.EAST, ShipAction.SOUTH, ShipAction.WEST]
+
+        # the 4000 halite left after the opening pays for 8 more ships
+        if not 1 <= fleet_size <= 9:
+            raise ValueError(f'fleet_size {fleet_size} out of range, expected 1 to 9')
+        self.render_step = render_me
+        self._env_name = env_name
+        self._fleet_size = fleet_size
+        # 'kaggle' steps the kaggle Board, 'numpy' steps the array_board (same rules, no per turn object rebuild)
+        self._backends = {'kaggle': Board, 'numpy': array_board}
+        if backend not in self._backends:
+            raise ValueError(f'unknown backend {backend}, expected one of {list(self._backends)}')
+        self._backend = backend
+        self._max_groth_step = 1
+
+        # runtime parameters, one entry per fleet ship
+        self.turns_counter = 0
+        self.episode_ended = False
+        self.fleet = []  # ship id of every slot
+        self.targets = [None] * fleet_size  # (y, x) of every slot, None until picked
+        self.env_step_count = 0
+
+        # initialize game, the kaggle environment is made once and every episode starts from the board template
+        self._board_template = board_template({"size": self._board_size, "startingHalite": 1000,
+                                               "episodeSteps": self._max_turns}, self._agent_count,
+                                              [('ship', ShipAction.CONVERT), ('shipyard', ShipyardAction.SPAWN),
+                                               ('ship', ShipAction.NORTH), ('ship', ShipAction.NORTH)], seed=seed)
+        self.environment = self._board_template.environment
+        # layouts, target picks and the opponent's rolls, all from seed (None is fresh entropy)
+        self.seed(seed)
+
+        self._action_bounds = dict(
+            shape=(), dtype=np.int32, minimum=0, maximum=len(self._action_def) - 1, name='action')
+        self._observation_bounds = dict(
+            shape=(self._frames, self._channels, self._board_size, self._board_size), dtype=np.float32, minimum=0.0,
+            maximum=1.0, name='observation')
+
+        self.state = np.zeros([fleet_size, self._channels, self._board_size, self._board_size], dtype=np.float32)
+        self.state_history = np.zeros([fleet_size, self._frames, self._channels, self._board_size, self._board_size],
+                                      dtype=np.float32)
+        self._state_encoder = state_encoder(self._board_size, self._channels, heatmap_mode=self._heatmap_mode)
+        self._reward = np.zeros(fleet_size, dtype=np.float32)
+
+        # get board
+        self.prime_board()
+        # rendering runs in a worker process: a window (render_me) and / or a gif per episode in record_dir,
+        # for every render_every_n_episodes-th episode, drawn from the first ship's observation
+        self._render_worker = None
+        if render_me or record_dir is not None:
+            self._render_worker = render_worker(self._board_size, env_name, show=render_me, record_dir=record_dir,
+                                                every_n_episodes=render_every_n_episodes)
+
+        # wall time per _step phase (whole fleet), printed every profile_every_n_episodes episodes (0 is off)
+        self._profiler = step_profiler(env_name, profile_every_n_episodes)
+        print(f'Initialized at {self._this_stopwatch.elapsed()}')
+
+    @property
+    def batched(self):
+        return True
+
+    @property
+    def batch_size(self):
+        return self._fleet_size
+
+    def action_bounds(self):
+        return_object = self._action_bounds
+        return return_object
+
+    def observation_bounds(self):
+        return_object = self._observation_bounds
+        return return_object
+
+    def close(self):
+        if self._render_worker is not None:
+            self._render_worker.close()
+
+    def seed(self, seed=None):
+        # same streams as halite_ship_navigation.seed
+        layouts, targets, opponent = np.random.SeedSequence(seed).spawn(3)
+        self._board_template.seed(layouts)
+        self._target_rng = np.random.default_rng(targets)
+        self._rng = np.random.default_rng(opponent)
+
+    def game_reset(self):
+        self.prime_board()
+        if self._render_worker is not None:
+            self._render_worker.begin_episode()
+        return_object = (FIRST, 0.0, 1.0, self.state_history)
+        return return_object
+
+    def game_step(self, action):
+        if self.episode_ended:
+            return_object = self.game_reset()
+            return return_object
+
+        # ===initialize variables===
+        self._profiler.start_step()
+        actions = np.asarray(action).reshape(-1)
+        size = self._board_size
+        self.env_step_count += 1
+
+        # ===pick targets===
+        # every ship gets a target on the first step of the game, offset from the shipyard like the single ship's
+        if self.targets[0] is None:
+            if self.env_step_count >= self._max_groth_step:
+                max_range = size - 1
+            else:
+                max_range = int((size - 1 * self.env_step_count) / self._max_groth_step) + 1
+            max_range = min(max_range, size - 1)
+
+            home = self.board.players[0].shipyards[0].position
+            offset = self._target_rng.integers(0, max_range, size=(self._fleet_size, 2))
+            self.targets = [((home.y + int(y)) % size, (home.x + int(x)) % size) for y, x in offset]
+
+        # ===take action===
+        ships = self.board.ships
+        for ship_id, int_action in zip(self.fleet, actions):
+            if not self._action_def[int(int_action)] == 'NOTHING':
+                ships[ship_id].next_action = self._action_def[int(int_action)]
+
+        self._profiler.lap('target_pick')
+
+        # ===move random bots===
+        vectorized_random_agent(self.board, 1, self._rng)
+        self._profiler.lap('random_agent')
+
+        # ===perform move===
+        self.board = self.board.next()
+        self._profiler.lap('board_next')
+        self.state = self.get_state_v2()
+        self._profiler.lap('get_state_v2')
+
+        # ===determine if game over=== (no punishment)
+        ships = self.board.ships
+        # a fleet ship lost
+        if not all(ship_id in ships for ship_id in self.fleet):
+            self.episode_ended = True
+        # no shipyard
+        if len(self.board.players[0].shipyards) == 0:
+            self.episode_ended = True
+        # max turns
+        if self.turns_counter == self._max_turns:
+            self.episode_ended = True
+
+        # ===calculate reward===
+        self._reward[:] = 0
+        if not self.episode_ended:
+            for slot, ship_id in enumerate(self.fleet):
+                pos = ships[ship_id].position
+                self._reward[slot] = self.state[slot, 0, size - pos.y - 1, pos.x]
+
+        # ===append to state history===
+        self.turns_counter += 1
+        self.state_history[:, :-1] = self.state_history[:, 1:]
+        self.state_history[:, -1] = self.state
+        self._profiler.lap('reward')
+
+        # ===render image===
+        if self._render_worker is not None:
+            self._render_worker.frame(self.board, self.state[0])
+            if self.episode_ended:
+                self._render_worker.end_episode()
+        self._profiler.lap('render')
+
+        # ===return to engine===
+        if self.episode_ended:
+            return_object = (LAST, self._reward, 0.0, self.state_history)
+        else:
+            return_object = (MID, self._reward, 1.0, self.state_history)
+        self._profiler.lap('transition')
+        self._profiler.end_step(self._fleet_size * int(self.episode_ended))
+        return return_object
+
+    def prime_board(self):
+        # the template's opening (convert, spawn, north, north), then the shipyard spawns a ship per turn until the
+        # fleet is complete while every fleet ship moves on in its direction. A layout where the opening loses a ship
+        # (an opponent ship in the way) is replaced by the next one.
+        while True:
+            board = self._board_template.new_game()[-1]
+            fleet = [board.players[0].ships[0].id]
+            for turn in range(self._fleet_size if self._fleet_size > 1 else 0):
+                for slot, ship_id in enumerate(fleet):
+                    board.ships[ship_id].next_action = self._prime_directions[slot % len(self._prime_directions)]
+                spawning = len(fleet) < self._fleet_size
+                if spawning:
+                    board.players[0].shipyards[0].next_action = ShipyardAction.SPAWN
+                board = board.next()
+                if spawning:
+                    fleet += [ship.id for ship in board.players[0].ships if ship.id not in fleet]
+            if len(fleet) == self._fleet_size and all(ship_id in board.ships for ship_id in fleet):
+                break
+        if self._backend == 'kaggle':
+            board = board.to_board()
+
+        self.board = board
+        self.fleet = fleet
+        self.targets = [None] * self._fleet_size
+        self.turns_counter = board.step
+        self.episode_ended = False
+        self.state = self.get_state_v2()
+        self.state_history[:] = 0
+        self.state_history[:, -1] = self.state
+
+    def get_state_v2(self):
+        # [fleet_size, channels, size, size], one ego-centric state per fleet ship in one batched encode
+        return_object = self._state_encoder.encode_fleet(self.board, self.fleet, self.targets)
+        return return_object
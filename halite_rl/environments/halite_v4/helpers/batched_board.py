@@ -0,0 +1,268 @@
+import numpy as np
+from kaggle_environments.envs.halite.helpers import *
+from halite_rl.environments.helpers.array_board import array_board, CONVERT, SPAWN, _round_3, \
+    _row_delta, _col_delta
+
+# NOTE: batched_board holds N independent games and steps all of them with one vectorized update. Cell halite is a
+# [N, size, size] array (row 0 is the north edge, same as array_board), ships and shipyards are flat arrays sorted by
+# game with a game column, so every rule is applied on global cell indices (game * size * size + cell). Entities are
+# identified by an integer uid instead of the kaggle id string. Within a game, entities stay in creation order, which is
+# the order kaggle funds spawns and converts in.
+
+
+def _rank_in_group(group):
+    # position of each element within its group, groups are ranked in the order they appear
+    order = np.argsort(group, kind='stable')
+    sorted_group = group[order]
+    rank = np.empty(len(group), dtype=np.int64)
+    rank[order] = np.arange(len(group)) - np.searchsorted(sorted_group, sorted_group, side='left')
+    return rank
+
+
+class batched_board():
+    def __init__(self, batch_size, configuration, player_count):
+        self._configuration = Configuration(configuration)
+        self._batch_size = batch_size
+        self._player_count = player_count
+        self._size = self._configuration.size
+        self._next_uid = 0
+
+        self.halite = np.zeros([batch_size, self._size, self._size])
+        self.player_halite = np.zeros([batch_size, player_count])
+        self.step = np.zeros(batch_size, dtype=np.int64)
+
+        self.ship_game = np.zeros(0, dtype=np.int64)
+        self.ship_uid = np.zeros(0, dtype=np.int64)
+        self.ship_pos = np.zeros(0, dtype=np.int64)
+        self.ship_halite = np.zeros(0)
+        self.ship_owner = np.zeros(0, dtype=np.int64)
+        self.ship_action = np.zeros(0, dtype=np.int8)
+
+        self.shipyard_game = np.zeros(0, dtype=np.int64)
+        self.shipyard_uid = np.zeros(0, dtype=np.int64)
+        self.shipyard_pos = np.zeros(0, dtype=np.int64)
+        self.shipyard_owner = np.zeros(0, dtype=np.int64)
+        self.shipyard_action = np.zeros(0, dtype=np.int8)
+
+    @property
+    def configuration(self):
+        return self._configuration
+
+    @property
+    def batch_size(self):
+        return self._batch_size
+
+    @property
+    def player_count(self):
+        return self._player_count
+
+    def _new_uids(self, count):
+        uids = np.arange(self._next_uid, self._next_uid + count, dtype=np.int64)
+        self._next_uid += count
+        return uids
+
+    def load(self, game, board):
+        # replace one game with the state of an array_board, returns {kaggle id: uid} for its entities
+        self._remove_game(game)
+        self.halite[game] = board.halite.reshape(self._size, self._size)
+        self.player_halite[game] = board.player_halite
+        self.step[game] = board.step
+
+        ship_count = len(board.ship_ids)
+        shipyard_count = len(board.shipyard_ids)
+        ship_uid = self._new_uids(ship_count)
+        shipyard_uid = self._new_uids(shipyard_count)
+        self._insert_ships(np.full(ship_count, game), ship_uid, board.ship_pos, board.ship_halite,
+                           board.ship_owner, board.ship_action)
+        self._insert_shipyards(np.full(shipyard_count, game), shipyard_uid, board.shipyard_pos,
+                               board.shipyard_owner, board.shipyard_action)
+
+        uids = dict(zip(board.ship_ids, ship_uid.tolist()))
+        uids.update(zip(board.shipyard_ids, shipyard_uid.tolist()))
+        return uids
+
+    def board(self, game):
+        # export one game as an array_board (for rendering or debugging), ids are the uids as strings
+        ships = np.flatnonzero(self.ship_game == game)
+        shipyards = np.flatnonzero(self.shipyard_game == game)
+        players = []
+        for player_id in range(self._player_count):
+            player_ships = {str(self.ship_uid[i]): [int(self.ship_pos[i]), self.ship_halite[i].item()]
+                            for i in ships[self.ship_owner[ships] == player_id]}
+            player_shipyards = {str(self.shipyard_uid[i]): int(self.shipyard_pos[i])
+                                for i in shipyards[self.shipyard_owner[shipyards] == player_id]}
+            players.append([self.player_halite[game, player_id].item(), player_shipyards, player_ships])
+        observation = {'halite': self.halite[game].reshape(-1).tolist(), 'players': players, 'player': 0,
+                       'step': int(self.step[game])}
+        return array_board(observation, self._configuration)
+
+    def _remove_game(self, game):
+        keep = self.ship_game != game
+        self.ship_game, self.ship_uid, self.ship_pos, self.ship_halite, self.ship_owner, self.ship_action = \
+            self.ship_game[keep], self.ship_uid[keep], self.ship_pos[keep], self.ship_halite[keep], \
+            self.ship_owner[keep], self.ship_action[keep]
+        keep = self.shipyard_game != game
+        self.shipyard_game, self.shipyard_uid, self.shipyard_pos, self.shipyard_owner, self.shipyard_action = \
+            self.shipyard_game[keep], self.shipyard_uid[keep], self.shipyard_pos[keep], self.shipyard_owner[keep], \
+            self.shipyard_action[keep]
+
+    def _insert_ships(self, game, uid, pos, halite, owner, action):
+        # appended entities go to the end of their game
+        order = np.argsort(np.concatenate([self.ship_game, game]), kind='stable')
+        self.ship_game = np.concatenate([self.ship_game, game])[order]
+        self.ship_uid = np.concatenate([self.ship_uid, uid])[order]
+        self.ship_pos = np.concatenate([self.ship_pos, pos])[order]
+        self.ship_halite = np.concatenate([self.ship_halite, halite])[order]
+        self.ship_owner = np.concatenate([self.ship_owner, owner])[order]
+        self.ship_action = np.concatenate([self.ship_action, action]).astype(np.int8)[order]
+
+    def _insert_shipyards(self, game, uid, pos, owner, action):
+        order = np.argsort(np.concatenate([self.shipyard_game, game]), kind='stable')
+        self.shipyard_game = np.concatenate([self.shipyard_game, game])[order]
+        self.shipyard_uid = np.concatenate([self.shipyard_uid, uid])[order]
+        self.shipyard_pos = np.concatenate([self.shipyard_pos, pos])[order]
+        self.shipyard_owner = np.concatenate([self.shipyard_owner, owner])[order]
+        self.shipyard_action = np.concatenate([self.shipyard_action, action]).astype(np.int8)[order]
+
+    def player_ship_count(self, player_id):
+        return np.bincount(self.ship_game[self.ship_owner == player_id], minlength=self._batch_size)
+
+    def player_shipyard_count(self, player_id):
+        return np.bincount(self.shipyard_game[self.shipyard_owner == player_id], minlength=self._batch_size)
+
+    def advance(self):
+        configuration = self._configuration
+        size = self._size
+        cell_count = size ** 2
+        total_cells = self._batch_size * cell_count
+        spawn_cost = configuration.spawn_cost
+        convert_cost = configuration.convert_cost
+        halite = self.halite.reshape(-1)
+        player_halite = self.player_halite.reshape(-1)
+
+        ship_cell = self.ship_game * cell_count + self.ship_pos
+        shipyard_cell = self.shipyard_game * cell_count + self.shipyard_pos
+        ship_player = self.ship_game * self._player_count + self.ship_owner
+        shipyard_player = self.shipyard_game * self._player_count + self.shipyard_owner
+        cell_has_shipyard = np.zeros(total_cells, dtype=bool)
+        cell_has_shipyard[shipyard_cell] = True
+
+        # ===spawn===
+        spawning = np.flatnonzero(self.shipyard_action == SPAWN)
+        if len(spawning) > 0:
+            if spawn_cost > 0:
+                affordable = player_halite[shipyard_player[spawning]] // spawn_cost
+                spawning = spawning[_rank_in_group(shipyard_player[spawning]) < affordable]
+            np.subtract.at(player_halite, shipyard_player[spawning], spawn_cost)
+
+        # ===convert===
+        converting = np.flatnonzero((self.ship_action == CONVERT) & ~cell_has_shipyard[ship_cell])
+        if len(converting) > 0:
+            shortfall = np.maximum(convert_cost - self.ship_halite[converting], 0)
+            owners = ship_player[converting]
+            needed = np.bincount(owners, weights=shortfall, minlength=len(player_halite))
+            # players that can't fund every convert fund them one by one in ship order
+            for player in np.flatnonzero(needed > player_halite):
+                available = player_halite[player]
+                for i in np.flatnonzero(owners == player):
+                    if shortfall[i] <= available:
+                        available -= shortfall[i]
+                    else:
+                        owners[i] = -1
+            funded = owners >= 0
+            converting, shortfall = converting[funded], shortfall[funded]
+            leftover = np.maximum(self.ship_halite[converting] - convert_cost, 0)
+            np.add.at(player_halite, ship_player[converting], leftover - shortfall)
+            halite[ship_cell[converting]] = 0
+
+        # ===move===
+        action = self.ship_action
+        moving = (action > 0) & (action < CONVERT)
+        row = (self.ship_pos // size + _row_delta[action]) % size
+        col = (self.ship_pos % size + _col_delta[action]) % size
+        ship_pos = row * size + col
+        ship_halite = self.ship_halite
+        if configuration.move_cost:
+            ship_halite = np.where(moving, ship_halite * (1 - configuration.move_cost), ship_halite)
+
+        keep = np.ones(len(ship_pos), dtype=bool)
+        keep[converting] = False
+        ship_game, ship_uid, ship_owner = self.ship_game[keep], self.ship_uid[keep], self.ship_owner[keep]
+        ship_pos, ship_halite, moving = ship_pos[keep], ship_halite[keep], moving[keep]
+        if len(spawning) > 0:
+            order = np.argsort(np.concatenate([ship_game, self.shipyard_game[spawning]]), kind='stable')
+            ship_game = np.concatenate([ship_game, self.shipyard_game[spawning]])[order]
+            ship_uid = np.concatenate([ship_uid, self._new_uids(len(spawning))])[order]
+            ship_owner = np.concatenate([ship_owner, self.shipyard_owner[spawning]])[order]
+            ship_pos = np.concatenate([ship_pos, self.shipyard_pos[spawning]])[order]
+            ship_halite = np.concatenate([ship_halite, np.zeros(len(spawning))])[order]
+            moving = np.concatenate([moving, np.zeros(len(spawning), dtype=bool)])[order]
+        shipyard_game, shipyard_uid = self.shipyard_game, self.shipyard_uid
+        shipyard_pos, shipyard_owner = self.shipyard_pos, self.shipyard_owner
+        if len(converting) > 0:
+            order = np.argsort(np.concatenate([shipyard_game, self.ship_game[converting]]), kind='stable')
+            shipyard_game = np.concatenate([shipyard_game, self.ship_game[converting]])[order]
+            shipyard_uid = np.concatenate([shipyard_uid, self._new_uids(len(converting))])[order]
+            shipyard_pos = np.concatenate([shipyard_pos, self.ship_pos[converting]])[order]
+            shipyard_owner = np.concatenate([shipyard_owner, self.ship_owner[converting]])[order]
+        ship_cell = ship_game * cell_count + ship_pos
+        shipyard_cell = shipyard_game * cell_count + shipyard_pos
+
+        # ===ship to ship collisions===
+        keep = np.ones(len(ship_pos), dtype=bool)
+        ships_per_cell = np.bincount(ship_cell, minlength=total_cells)
+        if len(ship_cell) > 0 and ships_per_cell.max() > 1:
+            contested = ships_per_cell[ship_cell] > 1
+            cell_min = np.full(total_cells, np.inf)
+            np.minimum.at(cell_min, ship_cell, ship_halite)
+            is_min = ship_halite == cell_min[ship_cell]
+            min_per_cell = np.bincount(ship_cell[is_min], minlength=total_cells)
+            cell_total = np.bincount(ship_cell, weights=ship_halite, minlength=total_cells)
+            winner = contested & is_min & (min_per_cell[ship_cell] == 1)
+            ship_halite = np.where(winner, cell_total[ship_cell], ship_halite)
+            keep = ~contested | winner
+
+        # ===ship to shipyard collisions and deposits===
+        cell_ship = np.full(total_cells, -1, dtype=np.int64)
+        cell_ship[ship_cell[keep]] = np.flatnonzero(keep)
+        shipyard_keep = np.ones(len(shipyard_cell), dtype=bool)
+        docked = cell_ship[shipyard_cell]
+        occupied = docked >= 0
+        if occupied.any():
+            hostile = np.zeros(len(shipyard_cell), dtype=bool)
+            hostile[occupied] = ship_owner[docked[occupied]] != shipyard_owner[occupied]
+            shipyard_keep[hostile] = False
+            keep[docked[hostile]] = False
+            friendly = occupied & ~hostile
+            np.add.at(player_halite, shipyard_game[friendly] * self._player_count + shipyard_owner[friendly],
+                      ship_halite[docked[friendly]])
+            ship_halite[docked[friendly]] = 0
+
+        ship_game, ship_uid, ship_owner = ship_game[keep], ship_uid[keep], ship_owner[keep]
+        ship_pos, ship_halite, moving, ship_cell = ship_pos[keep], ship_halite[keep], moving[keep], ship_cell[keep]
+        shipyard_game, shipyard_uid = shipyard_game[shipyard_keep], shipyard_uid[shipyard_keep]
+        shipyard_pos, shipyard_owner = shipyard_pos[shipyard_keep], shipyard_owner[shipyard_keep]
+        shipyard_cell = shipyard_cell[shipyard_keep]
+
+        # ===collect===
+        cell_has_shipyard = np.zeros(total_cells, dtype=bool)
+        cell_has_shipyard[shipyard_cell] = True
+        collected = np.trunc(halite[ship_cell] * configuration.collect_rate)
+        collecting = ~moving & ~cell_has_shipyard[ship_cell] & (collected > 0)
+        ship_halite[collecting] += collected[collecting]
+        halite[ship_cell[collecting]] -= collected[collecting]
+
+        # ===regenerate===
+        free = np.ones(total_cells, dtype=bool)
+        free[ship_cell] = False
+        halite[free] = np.minimum(_round_3(halite[free] * (1 + configuration.regen_rate)),
+                                  configuration.max_cell_halite)
+
+        # ===store===
+        self.ship_game, self.ship_uid, self.ship_owner = ship_game, ship_uid, ship_owner
+        self.ship_pos, self.ship_halite = ship_pos, ship_halite
+        self.ship_action = np.zeros(len(ship_pos), dtype=np.int8)
+        self.shipyard_game, self.shipyard_uid, self.shipyard_owner = shipyard_game, shipyard_uid, shipyard_owner
+        self.shipyard_pos = shipyard_pos
+        self.shipyard_action = np.zeros(len(shipyard_pos), dtype=np.int8)
+        self.step += 1
@@ -0,0 +1,39 @@
+import os
+import imageio
+
+# NOTE: writes the frames of each episode into its own file, {directory}/{name}_{episode:06d}.{extension}. Frames
+# come in as BGR (cv2 / image_render order) one at a time. mp4 (needs the imageio-ffmpeg plugin) streams them to
+# ffmpeg, gif (pillow only) keeps the episode's frames until close(), so close the episode when it ends.
+
+
+class episode_writer():
+    def __init__(self, directory, name, fps=10, extension='gif'):
+        if extension not in ['gif', 'mp4']:
+            raise ValueError(f'unknown extension {extension}, expected gif or mp4')
+        self._directory = directory
+        self._name = name
+        self._fps = fps
+        self._extension = extension
+        self._writer = None
+        self.episode = -1
+        os.makedirs(directory, exist_ok=True)
+
+    def begin_episode(self, episode=None):
+        # episode numbers the file, the next one after the last episode by default
+        self.close()
+        self.episode = self.episode + 1 if episode is None else episode
+        path = os.path.join(self._directory, f'{self._name}_{self.episode:06d}.{self._extension}')
+        if self._extension == 'gif':
+            self._writer = imageio.get_writer(path, mode='I', duration=1000 / self._fps, loop=0)
+        else:
+            self._writer = imageio.get_writer(path, fps=self._fps, macro_block_size=1)
+
+    def append(self, frame):
+        if self._writer is None:
+            self.begin_episode()
+        self._writer.append_data(frame[..., ::-1])
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
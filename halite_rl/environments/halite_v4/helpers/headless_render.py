@@ -0,0 +1,77 @@
+import math
+import numpy as np
+from halite_rl.environments.helpers.array_board import array_board
+from halite_rl.environments.halite_v4.helpers.state_encoder import entity_arrays
+from halite_rl.environments.helpers.sprite_atlas import sprite_atlas
+
+# NOTE: image_render_v3 without the window and without the per cell loop. The premade sprites come as one atlas
+# (sprite_atlas, tile index -> sprite), every cell gets a tile index from the board arrays and the board image is one
+# fancy index gather atlas[tiles] written through a [row, sprite row, column, sprite column] view of the frame. Nothing
+# is shown, render_board returns the BGR frame (board on the left, state planes on the right, the layout of the two
+# image_render_v3 windows) for a writer.
+# A frame is fully described by its snapshot (cell_tiles, state_pixels), a few hundred bytes that render_worker sends
+# to its process. tiles: 0 - 9 halite level, 10 + player ship, 14 + player shipyard, 18 + player ship on shipyard
+
+_ship_tile = 10
+_shipyard_tile = 14
+_ship_and_shipyard_tile = 18
+_state_scale = np.array([200.0, 255.0], dtype=np.float32)[:, np.newaxis, np.newaxis]
+
+
+def cell_tiles(board, board_size):
+    # [size * size] uint8 atlas tile of every cell in state layout, either board backend
+    if isinstance(board, array_board):
+        halite = board.halite
+    else:
+        # read from the cells, board.observation rebuilds the whole observation (ms per call). board.cells is in
+        # x major order with y up, [x, y] flipped to rows top down is the cell index order
+        halite = np.fromiter((cell.halite for cell in board.cells.values()), np.float64,
+                             board_size * board_size).reshape(board_size, board_size).T[::-1].reshape(-1)
+    tiles = (9.0 * halite / float(board.configuration.max_cell_halite)).astype(np.uint8)
+    ship_pos, ship_owner, _, shipyard_pos, shipyard_owner = entity_arrays(board, board_size)
+    tiles[ship_pos] = _ship_tile + ship_owner
+    has_ship = np.zeros(board_size ** 2, dtype=bool)
+    has_ship[ship_pos] = True
+    tiles[shipyard_pos] = np.where(has_ship[shipyard_pos], _ship_and_shipyard_tile, _shipyard_tile) + shipyard_owner
+    return_object = tiles
+    return return_object
+
+
+def state_pixels(state):
+    # [2, size, size] uint8 state image values, plane 0 x200 and plane 1 x255 like image_render_v3
+    return_object = (state[:2] * _state_scale).astype(np.uint8)
+    return return_object
+
+
+class headless_render():
+    def __init__(self, board_size):
+        self._board_size = board_size
+        self._image_dimension = 400
+        self._sprite_size = math.floor(self._image_dimension / board_size)
+        self._atlas, _ = sprite_atlas(board_size, self._image_dimension)
+
+        # [cell row, sprite row, cell column, sprite column, BGR] views into the frame, the margin stays black
+        dimension = self._image_dimension
+        sprite_size = self._sprite_size
+        half_sprite = math.floor(sprite_size / 2)
+        self._frame = np.zeros([dimension, 2 * dimension, 3], dtype=np.uint8)
+        self._board_view = self._frame[:board_size * sprite_size, :board_size * sprite_size].reshape(
+            board_size, sprite_size, board_size, sprite_size, 3)
+        # state planes 0 and 1 at half sprite size, one above the other
+        self._state_views = [self._frame[plane * dimension // 2:plane * dimension // 2 + board_size * half_sprite,
+                                         dimension:dimension + board_size * half_sprite].reshape(
+            board_size, half_sprite, board_size, half_sprite, 3) for plane in range(2)]
+
+    def render_board(self, board, state):
+        # returns the [dimension, 2 * dimension, 3] BGR frame, overwritten by the next call
+        return_object = self.render_snapshot(cell_tiles(board, self._board_size), state_pixels(state))
+        return return_object
+
+    def render_snapshot(self, tiles, pixels):
+        # tiles [size * size] from cell_tiles, pixels [2, size, size] uint8 from state_pixels
+        size = self._board_size
+        self._board_view[...] = self._atlas[np.reshape(tiles, [size, size])].transpose(0, 2, 1, 3, 4)
+        for view, plane in zip(self._state_views, pixels):
+            view[...] = plane[:, np.newaxis, :, np.newaxis, np.newaxis]
+        return_object = self._frame
+        return return_object
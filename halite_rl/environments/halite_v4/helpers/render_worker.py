@@ -0,0 +1,142 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import numpy as np
+from halite_rl.environments.halite_v4.helpers.headless_render import headless_render, cell_tiles, state_pixels
+
+# NOTE: rendering for an env without slowing its steps. The env only takes a snapshot of the board (cell_tiles and
+# state_pixels, 3 * size * size bytes) and drops it into a bounded queue, a thread pipes the queue to a worker process
+# that draws the frame (headless_render), shows it (show) and / or writes it to a file per episode (record_dir).
+# When the worker falls behind the queue fills up and new frames are dropped, the env never waits for it. Only every
+# every_n_episodes-th episode is rendered. Like parallel_env the worker is started with `python -m`, so the trainer
+# script is not re-imported. If the worker dies rendering stops, training goes on.
+# cv2 and imageio (episode_writer) are only imported in the worker process.
+
+_begin = b'b'
+_frame = b'f'
+_end = b'e'
+_quit = b'q'
+
+
+class render_worker():
+    def __init__(self, board_size, name, show=False, record_dir=None, every_n_episodes=1, queue_size=32, fps=10,
+                 extension='gif'):
+        self._board_size = board_size
+        self._every_n_episodes = every_n_episodes
+        self.episode = -1
+        self.recording = False
+        self.dropped_frames = 0
+
+        code_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..'))
+        worker_env = dict(os.environ, PYTHONPATH=os.pathsep.join([code_dir] + sys.path))
+        arguments = json.dumps({'board_size': board_size, 'name': name, 'show': show, 'record_dir': record_dir,
+                                'fps': fps, 'extension': extension})
+        self._process = subprocess.Popen([sys.executable, '-m', __name__, arguments], stdin=subprocess.PIPE,
+                                         env=worker_env)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._sender = threading.Thread(target=self._send, daemon=True)
+        self._sender.start()
+
+    def _send(self):
+        while True:
+            message = self._queue.get()
+            try:
+                self._process.stdin.write(message)
+                self._process.stdin.flush()
+            except OSError:
+                print('render worker exited, rendering stopped')
+                return
+            if message == _quit:
+                return
+
+    def _put(self, message):
+        # never blocks, False when the message was dropped
+        if not self._sender.is_alive():
+            return False
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            return False
+        return True
+
+    def begin_episode(self):
+        self.episode += 1
+        self.recording = False
+        if self.episode % self._every_n_episodes == 0:
+            self.recording = self._put(_begin + np.int64(self.episode).tobytes())
+
+    def frame(self, board, state):
+        if not self.recording:
+            return
+        if not self._put(_frame + cell_tiles(board, self._board_size).tobytes() + state_pixels(state).tobytes()):
+            self.dropped_frames += 1
+
+    def end_episode(self):
+        # a lost end is harmless, the worker closes the episode on the next begin or on quit
+        if self.recording:
+            self._put(_end)
+        self.recording = False
+
+    def close(self):
+        if self._process is None:
+            return
+        if self._sender.is_alive():
+            try:
+                self._queue.put(_quit, timeout=10)
+            except queue.Full:
+                pass
+            self._sender.join(timeout=10)
+        try:
+            self._process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+        self._process = None
+
+    def __del__(self):
+        if getattr(self, '_process', None) is not None:
+            self.close()
+
+
+def _run_worker(arguments):
+    arguments = json.loads(arguments)
+    size = arguments['board_size']
+    renderer = headless_render(size)
+    writer = None
+    if arguments['record_dir'] is not None:
+        from halite_rl.environments.halite_v4.helpers.episode_writer import episode_writer
+        writer = episode_writer(arguments['record_dir'], arguments['name'], arguments['fps'], arguments['extension'])
+    if arguments['show']:
+        import cv2
+
+    stream = sys.stdin.buffer
+    while True:
+        command = stream.read(1)
+        if command == _frame:
+            snapshot = stream.read(3 * size ** 2)
+            tiles = np.frombuffer(snapshot[:size ** 2], dtype=np.uint8)
+            pixels = np.frombuffer(snapshot[size ** 2:], dtype=np.uint8).reshape(2, size, size)
+            frame = renderer.render_snapshot(tiles, pixels)
+            if arguments['show']:
+                cv2.imshow(arguments['name'], frame)
+                cv2.waitKey(1)
+            if writer is not None:
+                writer.append(frame)
+        elif command == _begin:
+            episode = int(np.frombuffer(stream.read(8), dtype=np.int64)[0])
+            if writer is not None:
+                writer.begin_episode(episode)
+        elif command == _end:
+            if writer is not None:
+                writer.close()
+        else:
+            break
+
+    if writer is not None:
+        writer.close()
+
+
+if __name__ == '__main__':
+    _run_worker(sys.argv[1])
@@ -0,0 +1,140 @@
+import numpy as np
+from halite_rl.environments.helpers.array_board import array_board
+from halite_rl.environments.helpers.gaussian_kernel import gaussian_points, _kernel_pair
+
+# NOTE: get_state_v2 without the per ship / per shipyard python loops. Entities come in as flat cell indices
+# (row * size + col, the same layout as the state planes), the planes are filled with scatter writes into preallocated
+# float32 buffers and the heatmaps are sums of cached gaussian responses (gaussian_kernel). The returned state is one of
+# buffer_count rotating buffers, so it stays valid for buffer_count - 1 further encode calls.
+# heatmap_mode 'wrap' spreads the heat across the board edges like the torus the board is.
+
+
+def entity_arrays(board, board_size):
+    # (ship cell, ship owner, ship ids, shipyard cell, shipyard owner) for either board backend
+    if isinstance(board, array_board):
+        return board.ship_pos, board.ship_owner, board.ship_ids, board.shipyard_pos, board.shipyard_owner
+    ships = list(board.ships.values())
+    shipyards = list(board.shipyards.values())
+    ship_pos = np.fromiter((ship.position.to_index(board_size) for ship in ships), np.int64, len(ships))
+    ship_owner = np.fromiter((ship.player_id for ship in ships), np.int64, len(ships))
+    ship_ids = [ship.id for ship in ships]
+    shipyard_pos = np.fromiter((shipyard.position.to_index(board_size) for shipyard in shipyards), np.int64,
+                               len(shipyards))
+    shipyard_owner = np.fromiter((shipyard.player_id for shipyard in shipyards), np.int64, len(shipyards))
+    return ship_pos, ship_owner, ship_ids, shipyard_pos, shipyard_owner
+
+
+class state_encoder():
+    def __init__(self, board_size, channels=2, buffer_count=2, heatmap_mode='constant'):
+        self._board_size = board_size
+        self._heatmap_mode = heatmap_mode
+        self._hot_spot = board_size * 10
+        self._attract_sigma = [board_size / 3, board_size / 3]
+        self._detract_sigma = [board_size / 20, board_size / 20]
+
+        self._attract_heatmap = np.zeros([board_size, board_size], dtype=np.float32)
+        self._detract_heatmap = np.zeros([board_size, board_size], dtype=np.float32)
+        self._states = np.zeros([buffer_count, channels, board_size, board_size], dtype=np.float32)
+        self._next_state = 0
+        self._channels = channels
+        self._buffer_count = buffer_count
+        self._fleet_states = {}  # fleet size: [buffer_count, fleet size, channels, size, size]
+        self._next_fleet_state = 0
+
+    def encode(self, board, ship_in_question_id, target=None):
+        # target: (y, x) board coordinates of the ship's current target, None when it has none
+        size = self._board_size
+        ship_pos, ship_owner, ship_ids, shipyard_pos, shipyard_owner = entity_arrays(board, size)
+        attract_heatmap = self._attract_heatmap.reshape(-1)
+        detract_heatmap = self._detract_heatmap.reshape(-1)
+        state = self._states[self._next_state]
+        self._next_state = (self._next_state + 1) % len(self._states)
+
+        enemy_pos = ship_pos[ship_owner != 0]
+        detract_heatmap[:] = 0
+        detract_heatmap[enemy_pos] = self._hot_spot
+        detract_heatmap[shipyard_pos[shipyard_owner != 0]] = self._hot_spot
+
+        self_location = state[1].reshape(-1)
+        self_location[:] = 0
+        in_question = ship_in_question_id in ship_ids
+        if in_question:
+            self_location[ship_pos[ship_ids.index(ship_in_question_id)]] = 1.0
+
+        attract_heatmap[:] = 0
+        target_pos = None
+        if in_question and target is not None:
+            target_pos = (size - target[0] - 1) * size + target[1]
+            attract_heatmap[target_pos] = self._hot_spot * 50
+
+        filtered = []
+        for heatmap, sigma in [(self._attract_heatmap, self._attract_sigma),
+                               (self._detract_heatmap, self._detract_sigma)]:
+            rows, cols = np.nonzero(heatmap)
+            filtered.append(gaussian_points(size, sigma, rows, cols, heatmap[rows, cols], self._heatmap_mode))
+        attract_filtered, detract_filtered = filtered
+
+        if target_pos is not None:
+            attract_filtered[target_pos // size, target_pos % size] = self._hot_spot
+        detract_filtered.reshape(-1)[enemy_pos] = self._hot_spot
+
+        # normalize each...
+        navigation_map = state[0]
+        navigation_map[:] = 0.5
+        for heatmap, sign in [(attract_filtered, 1.0), (detract_filtered, -1.0)]:
+            heatmap_max = heatmap.max()
+            if heatmap_max > 0:
+                navigation_map += heatmap * (sign * 0.5 / heatmap_max)
+
+        return state
+
+    def encode_fleet(self, board, ship_ids, targets):
+        # [len(ship_ids), channels, size, size], encode(board, ship_ids[i], targets[i]) for every ship in one pass: the
+        # enemy heatmap is filtered once and shared, each ship only adds its own location and target heatmap.
+        # targets[i] is (y, x) or None, a ship missing from the board gets neither. Rotating buffers like encode.
+        size = self._board_size
+        count = len(ship_ids)
+        ship_pos, ship_owner, board_ship_ids, shipyard_pos, shipyard_owner = entity_arrays(board, size)
+        if count not in self._fleet_states:
+            self._fleet_states[count] = np.zeros([self._buffer_count, count, self._channels, size, size],
+                                                 dtype=np.float32)
+        states = self._fleet_states[count][self._next_fleet_state]
+        self._next_fleet_state = (self._next_fleet_state + 1) % self._buffer_count
+        states[:] = 0
+
+        enemy_pos = ship_pos[ship_owner != 0]
+        detract_heatmap = self._detract_heatmap.reshape(-1)
+        detract_heatmap[:] = 0
+        detract_heatmap[enemy_pos] = self._hot_spot
+        detract_heatmap[shipyard_pos[shipyard_owner != 0]] = self._hot_spot
+        rows, cols = np.nonzero(self._detract_heatmap)
+        detract_filtered = gaussian_points(size, self._detract_sigma, rows, cols, self._detract_heatmap[rows, cols],
+                                           self._heatmap_mode)
+        detract_filtered.reshape(-1)[enemy_pos] = self._hot_spot
+
+        # present ships, and of those the ones with a target
+        slot_index = {ship_id: index for index, ship_id in enumerate(board_ship_ids)}
+        present = np.array([ship_id in slot_index for ship_id in ship_ids], dtype=bool)
+        pos = np.array([ship_pos[slot_index[ship_id]] for ship_id, here in zip(ship_ids, present) if here],
+                       dtype=np.int64)
+        states[np.flatnonzero(present), 1, pos // size, pos % size] = 1.0
+        targeted = np.array([present[i] and targets[i] is not None for i in range(count)], dtype=bool)
+        target_pos = np.array([(size - targets[i][0] - 1) * size + targets[i][1] for i in np.flatnonzero(targeted)],
+                              dtype=np.int64)
+
+        # one impulse per ship, its filtered board is the outer product of a row and a column response
+        kernel_y, kernel_x = _kernel_pair(size, self._attract_sigma, self._heatmap_mode)
+        attract_filtered = np.einsum('ni,nj->nij', kernel_y[:, target_pos // size].T * (self._hot_spot * 50),
+                                     kernel_x[:, target_pos % size].T)
+        attract_filtered[np.arange(len(target_pos)), target_pos // size, target_pos % size] = self._hot_spot
+
+        # normalize each...
+        navigation_maps = states[:, 0]
+        navigation_maps[:] = 0.5
+        attract_max = attract_filtered.max(axis=(1, 2))
+        navigation_maps[targeted] += attract_filtered * (0.5 / attract_max)[:, np.newaxis, np.newaxis]
+        detract_max = detract_filtered.max()
+        if detract_max > 0:
+            navigation_maps += detract_filtered * (-0.5 / detract_max)
+
+        return states
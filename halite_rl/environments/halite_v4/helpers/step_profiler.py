@@ -0,0 +1,77 @@
+import numpy as np
+from halite_rl.environments.halite_v4.helpers.stopwatch import stopwatch
+
+# NOTE: wall time per phase of a step, without an external profiler. start_step() opens a step, lap(phase) books the
+# time since the previous lap to phase and end_step() closes it. Every every_n_episodes finished episodes the mean and
+# percentiles of each phase (ms per step) and its share of the step are printed and the samples start over.
+# every_n_episodes=0 turns the profiler off, every call then returns right away.
+
+
+class step_profiler():
+    def __init__(self, name, every_n_episodes=0, percentiles=(50, 90, 99)):
+        self._name = name
+        self._every_n_episodes = every_n_episodes
+        self._percentiles = list(percentiles)
+        self.enabled = every_n_episodes > 0
+        self._stopwatch = stopwatch()
+        self._step = {}
+        self._samples = {}  # phase: [ms per step]
+        self._steps = 0
+        self.episodes = 0
+
+    def start_step(self):
+        if self.enabled:
+            self._stopwatch.lap()
+
+    def lap(self, phase):
+        if not self.enabled:
+            return
+        self._step[phase] = self._step.get(phase, 0.0) + self._stopwatch.lap()
+
+    def end_step(self, finished_episodes=0):
+        if not self.enabled:
+            return
+        for phase, seconds in self._step.items():
+            # a phase first seen late is 0 for the steps before it
+            self._samples.setdefault(phase, [0.0] * self._steps).append(seconds * 1000.0)
+        self._steps += 1
+        for phase, samples in self._samples.items():
+            if len(samples) < self._steps:
+                samples.append(0.0)
+        self._step = {}
+        self.episodes += finished_episodes
+        if self.episodes >= self._every_n_episodes:
+            self.report()
+            self.reset()
+
+    def reset(self):
+        self._step = {}
+        self._samples = {}
+        self._steps = 0
+        self.episodes = 0
+
+    def summary(self):
+        # {phase: {'mean': ms, 'p50': ms, ..., 'share': fraction of the step}}, 'total' is the whole step
+        if self._steps == 0:
+            return_object = {}
+            return return_object
+        samples = {phase: np.array(ms) for phase, ms in self._samples.items()}
+        samples['total'] = np.sum(list(samples.values()), axis=0)
+        total = max(samples['total'].mean(), 1e-12)
+        return_object = {}
+        for phase, ms in samples.items():
+            return_object[phase] = {'mean': float(ms.mean()), 'share': float(ms.mean() / total)}
+            for percentile, value in zip(self._percentiles, np.percentile(ms, self._percentiles)):
+                return_object[phase][f'p{percentile}'] = float(value)
+        return return_object
+
+    def report(self):
+        summary = self.summary()
+        if not summary:
+            return
+        columns = ['mean'] + [f'p{percentile}' for percentile in self._percentiles]
+        print(f'{self._name} step profile, {self._steps} steps / {self.episodes} episodes (ms per step)')
+        print(f'{"phase":<16}' + ''.join(f'{column:>9}' for column in columns) + f'{"share":>8}')
+        for phase, stats in summary.items():
+            print(f'{phase:<16}' + ''.join(f'{stats[column]:>9.3f}' for column in columns) +
+                  f'{stats["share"]:>8.1%}')
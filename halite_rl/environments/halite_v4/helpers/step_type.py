@@ -0,0 +1,6 @@
+# NOTE: tf_agents StepType values for the env cores and the parallel_env workers, which only import numpy and the
+# kaggle Board: importing tf_agents imports tensorflow. The wrappers hand them to time_step_buffer.write as they are.
+
+FIRST = 0
+MID = 1
+LAST = 2
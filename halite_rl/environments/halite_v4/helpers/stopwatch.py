@@ -5,12 +5,19 @@ class stopwatch:
         self.start()
     def start(self):
         self._startTime = time.time()
+        self._lapTime = time.perf_counter()
     def getStartTime(self):
         return self._startTime
     def elapsed(self, prec=3):
         prec = 3 if prec is None or not isinstance(prec, (int, int)) else prec
         diff= time.time() - self._startTime
         return round(diff, prec)
+    def lap(self):
+        # seconds (perf_counter, unrounded) since the last lap or start, starts the next lap
+        now = time.perf_counter()
+        diff = now - self._lapTime
+        self._lapTime = now
+        return diff
 
 def round(n, p=0):
     m = 100 ** p
@@ -0,0 +1,39 @@
+import numpy as np
+from tf_agents.trajectories import time_step as ts
+
+# NOTE: the TimeSteps an env hands to tf_agents, preallocated instead of a new ts.transition / ts.termination and a
+# copy of the observation every step. Two sets of step_type / reward / discount / observation arrays are written in
+# turn, so the time step returned before (the current_time_step a driver pairs with the next one in a transition)
+# stays valid until the one after it is written. Anything kept longer has to be copied, TFPyEnvironment and the replay
+# buffers copy on their own. batch_size=None is an unbatched env (scalar reward), else every field has a batch axis.
+
+
+class time_step_buffer():
+    def __init__(self, observation_shape, dtype=np.float32, batch_size=None):
+        outer = [] if batch_size is None else [batch_size]
+        self._time_steps = [ts.TimeStep(np.zeros(outer, dtype=np.int32), np.zeros(outer, dtype=np.float32),
+                                        np.zeros(outer, dtype=np.float32),
+                                        np.zeros(outer + list(observation_shape), dtype=dtype)) for _ in range(2)]
+        self._next = 0
+
+    def write(self, step_type, reward, discount, observation):
+        # values are copied (broadcast and cast to the field dtypes), the caller may reuse its arrays
+        time_step = self._time_steps[self._next]
+        self._next = 1 - self._next
+        np.copyto(time_step.step_type, step_type, casting='unsafe')
+        np.copyto(time_step.reward, reward, casting='unsafe')
+        np.copyto(time_step.discount, discount, casting='unsafe')
+        np.copyto(time_step.observation, observation, casting='unsafe')
+        return time_step
+
+    def restart(self, observation):
+        return_object = self.write(ts.StepType.FIRST, 0.0, 1.0, observation)
+        return return_object
+
+    def transition(self, observation, reward, discount=1.0):
+        return_object = self.write(ts.StepType.MID, reward, discount, observation)
+        return return_object
+
+    def termination(self, observation, reward):
+        return_object = self.write(ts.StepType.LAST, reward, 0.0, observation)
+        return return_object
@@ -0,0 +1,129 @@
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+from multiprocessing import shared_memory
+
+from tf_agents.environments import py_environment
+from tf_agents.specs import array_spec
+from halite_rl.environments.halite_v4.helpers.time_step_buffer import time_step_buffer
+from halite_rl.environments.halite_v4.parallel_worker import _fields
+
+# NOTE: K copies of an env run in worker processes, stepped together as one batched env (batch_size = sum of the worker
+# batch sizes). Workers are started with `python -m` rather than multiprocessing, so the trainer script (no __main__
+# guard) is never re-imported and the TF process is never forked. Observations, rewards, discounts, step types and
+# actions live in shared memory, the pipes only carry one byte per command. The workers (parallel_worker.py) step the
+# env cores without tf_agents, env_class is the dotted path of a core, e.g.
+# 'halite_rl.environments.halite_v4.env_core.halite_ship_navigation_core'.
+
+
+def _spec_from_json(spec):
+    return array_spec.BoundedArraySpec(shape=tuple(spec['shape']), dtype=np.dtype(spec['dtype']),
+                                       minimum=spec['minimum'], maximum=spec['maximum'], name=spec['name'])
+
+
+class parallel_halite_ship_navigation(py_environment.PyEnvironment):
+    def __init__(self, env_class, env_kwargs, num_workers):
+        # env_class: dotted path of the env core, env_kwargs: json serializable constructor arguments
+        print(f'Starting {num_workers} env workers')
+        code_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+        worker_env = dict(os.environ, PYTHONPATH=os.pathsep.join([code_dir] + sys.path))
+        # a seed in env_kwargs is split into one seed per worker, so the workers do not play the same games
+        worker_kwargs = [env_kwargs] * num_workers
+        if env_kwargs.get('seed') is not None:
+            worker_seeds = np.random.SeedSequence(env_kwargs['seed']).generate_state(num_workers)
+            worker_kwargs = [dict(env_kwargs, seed=int(seed)) for seed in worker_seeds]
+        self._workers = [subprocess.Popen([sys.executable, '-m', 'halite_rl.environments.halite_v4.parallel_worker',
+                                           json.dumps({'env_class': env_class, 'env_kwargs': kwargs})],
+                                          stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=worker_env)
+                         for kwargs in worker_kwargs]
+
+        # every worker reports its specs and batch size once its env is built
+        specs = [worker.stdout.readline() for worker in self._workers]
+        if not all(specs):
+            raise RuntimeError('env worker exited')
+        specs = [json.loads(spec) for spec in specs]
+        self._observation_spec = _spec_from_json(specs[0]['observation_spec'])
+        self._action_spec = _spec_from_json(specs[0]['action_spec'])
+        worker_batch_sizes = [spec['batch_size'] for spec in specs]
+        self._batch_size = sum(worker_batch_sizes)
+
+        shapes = {'observation': (self._batch_size,) + tuple(self._observation_spec.shape),
+                  'reward': (self._batch_size,), 'discount': (self._batch_size,), 'step_type': (self._batch_size,),
+                  'action': (self._batch_size,)}
+        dtypes = {'observation': self._observation_spec.dtype, 'reward': np.float32, 'discount': np.float32,
+                  'step_type': np.int32, 'action': self._action_spec.dtype}
+        self._shared_memory = {}
+        self._arrays = {}
+        for field in _fields:
+            nbytes = max(int(np.prod(shapes[field])) * np.dtype(dtypes[field]).itemsize, 1)
+            self._shared_memory[field] = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._arrays[field] = np.ndarray(shapes[field], dtype=dtypes[field],
+                                             buffer=self._shared_memory[field].buf)
+
+        offset = 0
+        for worker, batch_size in zip(self._workers, worker_batch_sizes):
+            layout = {field: {'name': self._shared_memory[field].name, 'shape': list(shapes[field]),
+                              'dtype': np.dtype(dtypes[field]).str} for field in _fields}
+            worker.stdin.write((json.dumps({'layout': layout, 'start': offset,
+                                            'stop': offset + batch_size}) + '\n').encode())
+            worker.stdin.flush()
+            offset += batch_size
+        # the shared memory is rewritten every step, the returned time steps are copies in reused buffers
+        self._time_steps = time_step_buffer(self._observation_spec.shape, dtype=self._observation_spec.dtype,
+                                            batch_size=self._batch_size)
+        self._command(b'.')
+
+    @property
+    def batched(self):
+        return True
+
+    @property
+    def batch_size(self):
+        return self._batch_size
+
+    def action_spec(self):
+        return self._action_spec
+
+    def observation_spec(self):
+        return self._observation_spec
+
+    def _command(self, command):
+        # send to every worker first so they work in parallel, then wait for all of them
+        for worker in self._workers:
+            worker.stdin.write(command)
+            worker.stdin.flush()
+        for worker in self._workers:
+            if worker.stdout.read(1) != b'.':
+                raise RuntimeError('env worker exited')
+
+    def _time_step(self):
+        return self._time_steps.write(self._arrays['step_type'], self._arrays['reward'], self._arrays['discount'],
+                                      self._arrays['observation'])
+
+    def _reset(self):
+        self._command(b'r')
+        return self._time_step()
+
+    def _step(self, action):
+        self._arrays['action'][:] = np.asarray(action).reshape(-1)
+        self._command(b's')
+        return self._time_step()
+
+    def close(self):
+        for worker in self._workers:
+            if worker.poll() is None:
+                worker.stdin.write(b'q')
+                worker.stdin.flush()
+                worker.wait()
+        self._workers = []
+        self._arrays = {}
+        for memory in self._shared_memory.values():
+            memory.close()
+            memory.unlink()
+        self._shared_memory = {}
+
+    def __del__(self):
+        if getattr(self, '_shared_memory', None):
+            self.close()
@@ -0,0 +1,79 @@
+import importlib
+import json
+import os
+import sys
+import numpy as np
+from multiprocessing import shared_memory
+
+from halite_rl.environments.halite_v4.helpers.step_type import LAST
+
+# NOTE: the env worker process of parallel_env, started with `python -m`. It steps an env core (env_core.py,
+# batched_env_core.py, fleet_env_core.py) through game_reset / game_step and writes the results into the shared
+# memory, so a worker imports numpy and the kaggle Board but never tensorflow / tf_agents (seconds per worker start).
+# The parent reads the specs from the core's bounds.
+
+_fields = ['observation', 'reward', 'discount', 'step_type', 'action']
+
+
+def _bounds_to_json(bounds):
+    return {'shape': list(bounds['shape']), 'dtype': np.dtype(bounds['dtype']).str,
+            'minimum': np.asarray(bounds['minimum']).tolist(), 'maximum': np.asarray(bounds['maximum']).tolist(),
+            'name': bounds['name']}
+
+
+def _attach(name, shape, dtype):
+    memory = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix':
+        # the parent owns the segment, keep this process' resource tracker from unlinking it on exit
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(memory._name, 'shared_memory')
+    return memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _run_worker(arguments):
+    # protocol output is the original stdout, anything the env prints goes to stderr
+    protocol_in = sys.stdin.buffer
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), 'wb', 0)
+    sys.stdout = sys.stderr
+
+    arguments = json.loads(arguments)
+    module_name, class_name = arguments['env_class'].rsplit('.', 1)
+    env = getattr(importlib.import_module(module_name), class_name)(**arguments['env_kwargs'])
+    batch_size = env.batch_size if env.batched else 1
+    protocol_out.write((json.dumps({'observation_spec': _bounds_to_json(env.observation_bounds()),
+                                    'action_spec': _bounds_to_json(env.action_bounds()),
+                                    'batch_size': batch_size}) + '\n').encode())
+
+    setup = json.loads(protocol_in.readline())
+    memory, arrays = [], {}
+    for field, layout in setup['layout'].items():
+        shared, array = _attach(layout['name'], tuple(layout['shape']), np.dtype(layout['dtype']))
+        memory.append(shared)
+        arrays[field] = array[setup['start']:setup['stop']]
+
+    time_step = None
+    while True:
+        command = protocol_in.read(1)
+        if command == b'r' or (command == b's' and not env.batched and time_step[0] == LAST):
+            # a single game is restarted here, batched envs restart their finished games themselves
+            time_step = env.game_reset()
+        elif command == b's':
+            action = arrays['action'] if env.batched else arrays['action'][0]
+            time_step = env.game_step(action)
+        elif command != b'.':
+            break
+        if time_step is not None:
+            step_type, reward, discount, observation = time_step
+            arrays['observation'][:] = np.reshape(observation, arrays['observation'].shape)
+            arrays['reward'][:] = reward
+            arrays['discount'][:] = discount
+            arrays['step_type'][:] = step_type
+        protocol_out.write(b'.')
+
+    del arrays
+    for shared in memory:
+        shared.close()
+
+
+if __name__ == '__main__':
+    _run_worker(sys.argv[1])
@@ -0,0 +1,537 @@
+import numpy as np
+from kaggle_environments.envs.halite.helpers import *
+
+# NOTE: array_board is a drop in replacement for the kaggle Board. The game lives in flat numpy arrays indexed the same
+# way as observation['halite'] (index = row * size + col, row 0 is the top/north edge), so index // size is already the
+# row used by get_state_v2 and the renderers. Ship, Shipyard, Player and Cell objects are only thin views created on
+# access, Board.next() rules are applied with array ops.
+
+# action codes stored in the ship / shipyard action arrays
+_ship_actions = [None, ShipAction.NORTH, ShipAction.EAST, ShipAction.SOUTH, ShipAction.WEST, ShipAction.CONVERT]
+_ship_action_codes = {action: code for code, action in enumerate(_ship_actions)}
+_shipyard_actions = [None, ShipyardAction.SPAWN]
+_shipyard_action_codes = {action: code for code, action in enumerate(_shipyard_actions)}
+
+CONVERT = _ship_action_codes[ShipAction.CONVERT]
+SPAWN = _shipyard_action_codes[ShipyardAction.SPAWN]
+
+# row / col offset per ship action code (north is up, i.e. towards row 0)
+_row_delta = np.array([0, -1, 0, 1, 0, 0])
+_col_delta = np.array([0, 0, 1, 0, -1, 0])
+
+
+def _round_3(values):
+    # np.round scales by 1000 before rounding, which can land on the other side of a half compared to python's
+    # correctly rounded round(x, 3) that kaggle uses. Only values sitting on a half need the slow path.
+    scaled = values * 1000
+    rounded = np.round(values, 3)
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(value, 3) for value in values[near_half].tolist()]
+    return rounded
+
+
+class array_board():
+    def __init__(self, raw_observation, raw_configuration, next_actions=None):
+        observation = Observation(raw_observation)
+        self._configuration = Configuration(raw_configuration)
+        self._size = self._configuration.size
+        self._step = observation.step
+        self._current_player_id = observation.player
+        self._remaining_overage_time = observation.get('remainingOverageTime', 60)
+        next_actions = next_actions or ([{}] * len(observation.players))
+
+        self.halite = np.array(observation.halite, dtype=np.float64)
+        self.player_halite = np.array([player[0] for player in observation.players], dtype=np.float64)
+
+        ship_ids, ship_pos, ship_halite, ship_owner, ship_action = [], [], [], [], []
+        shipyard_ids, shipyard_pos, shipyard_owner, shipyard_action = [], [], [], []
+        for player_id, [_, player_shipyards, player_ships] in enumerate(observation.players):
+            player_actions = next_actions[player_id] or {}
+            for ship_id, [ship_index, halite] in player_ships.items():
+                raw_action = player_actions.get(ship_id)
+                action = ShipAction[raw_action] if raw_action in ShipAction.__members__ else None
+                ship_ids.append(ship_id)
+                ship_pos.append(ship_index)
+                ship_halite.append(halite)
+                ship_owner.append(player_id)
+                ship_action.append(_ship_action_codes[action])
+            for shipyard_id, shipyard_index in player_shipyards.items():
+                raw_action = player_actions.get(shipyard_id)
+                action = ShipyardAction[raw_action] if raw_action in ShipyardAction.__members__ else None
+                shipyard_ids.append(shipyard_id)
+                shipyard_pos.append(shipyard_index)
+                shipyard_owner.append(player_id)
+                shipyard_action.append(_shipyard_action_codes[action])
+
+        self.ship_ids = ship_ids
+        self.ship_pos = np.array(ship_pos, dtype=np.int64)
+        self.ship_halite = np.array(ship_halite, dtype=np.float64)
+        self.ship_owner = np.array(ship_owner, dtype=np.int64)
+        self.ship_action = np.array(ship_action, dtype=np.int8)
+        self.shipyard_ids = shipyard_ids
+        self.shipyard_pos = np.array(shipyard_pos, dtype=np.int64)
+        self.shipyard_owner = np.array(shipyard_owner, dtype=np.int64)
+        self.shipyard_action = np.array(shipyard_action, dtype=np.int8)
+        self._reset_lookups()
+
+    def _reset_lookups(self):
+        self._ship_index = None
+        self._shipyard_index = None
+        self._cell_ship = None
+        self._cell_shipyard = None
+
+    def copy(self):
+        board = array_board.__new__(array_board)
+        board._configuration = self._configuration
+        board._size = self._size
+        board._step = self._step
+        board._current_player_id = self._current_player_id
+        board._remaining_overage_time = self._remaining_overage_time
+        board.halite = self.halite.copy()
+        board.player_halite = self.player_halite.copy()
+        board.ship_ids = list(self.ship_ids)
+        board.ship_pos = self.ship_pos.copy()
+        board.ship_halite = self.ship_halite.copy()
+        board.ship_owner = self.ship_owner.copy()
+        board.ship_action = self.ship_action.copy()
+        board.shipyard_ids = list(self.shipyard_ids)
+        board.shipyard_pos = self.shipyard_pos.copy()
+        board.shipyard_owner = self.shipyard_owner.copy()
+        board.shipyard_action = self.shipyard_action.copy()
+        board._reset_lookups()
+        return board
+
+    # ===kaggle Board compatible surface===
+    @property
+    def configuration(self):
+        return self._configuration
+
+    @property
+    def step(self):
+        return self._step
+
+    @property
+    def current_player_id(self):
+        return self._current_player_id
+
+    @property
+    def current_player(self):
+        return array_player(self, self._current_player_id)
+
+    @property
+    def players(self):
+        return {player_id: array_player(self, player_id) for player_id in range(len(self.player_halite))}
+
+    @property
+    def opponents(self):
+        return [player for player in self.players.values() if player.id != self._current_player_id]
+
+    @property
+    def ships(self):
+        return {ship_id: array_ship(self, index) for index, ship_id in enumerate(self.ship_ids)}
+
+    @property
+    def shipyards(self):
+        return {shipyard_id: array_shipyard(self, index) for index, shipyard_id in enumerate(self.shipyard_ids)}
+
+    @property
+    def cells(self):
+        return {cell.position: cell for cell in (array_cell(self, index) for index in range(self._size ** 2))}
+
+    @property
+    def observation(self):
+        players = []
+        for player_id in range(len(self.player_halite)):
+            shipyards = {self.shipyard_ids[i]: int(self.shipyard_pos[i])
+                         for i in np.flatnonzero(self.shipyard_owner == player_id)}
+            ships = {self.ship_ids[i]: [int(self.ship_pos[i]), self.ship_halite[i].item()]
+                     for i in np.flatnonzero(self.ship_owner == player_id)}
+            players.append([self.player_halite[player_id].item(), shipyards, ships])
+        return {
+            'halite': self.halite.tolist(),
+            'players': players,
+            'player': self._current_player_id,
+            'step': self._step,
+            'remainingOverageTime': self._remaining_overage_time,
+        }
+
+    def next_actions(self):
+        actions = [{} for _ in range(len(self.player_halite))]
+        for i in np.flatnonzero(self.ship_action):
+            actions[self.ship_owner[i]][self.ship_ids[i]] = _ship_actions[self.ship_action[i]].name
+        for i in np.flatnonzero(self.shipyard_action):
+            actions[self.shipyard_owner[i]][self.shipyard_ids[i]] = _shipyard_actions[self.shipyard_action[i]].name
+        return actions
+
+    def to_board(self):
+        return Board(self.observation, self._configuration, self.next_actions())
+
+    def __getitem__(self, point):
+        if not isinstance(point, Point):
+            (x, y) = point
+            point = Point(x, y)
+        return array_cell(self, (point % self._size).to_index(self._size))
+
+    def ship_index(self, ship_id):
+        if self._ship_index is None:
+            self._ship_index = {ship_id: index for index, ship_id in enumerate(self.ship_ids)}
+        return self._ship_index[ship_id]
+
+    def shipyard_index(self, shipyard_id):
+        if self._shipyard_index is None:
+            self._shipyard_index = {shipyard_id: index for index, shipyard_id in enumerate(self.shipyard_ids)}
+        return self._shipyard_index[shipyard_id]
+
+    def cell_ship(self):
+        # cell index -> ship index (-1 for empty)
+        if self._cell_ship is None:
+            self._cell_ship = np.full(self._size ** 2, -1, dtype=np.int64)
+            self._cell_ship[self.ship_pos] = np.arange(len(self.ship_pos))
+        return self._cell_ship
+
+    def cell_shipyard(self):
+        # cell index -> shipyard index (-1 for empty)
+        if self._cell_shipyard is None:
+            self._cell_shipyard = np.full(self._size ** 2, -1, dtype=np.int64)
+            self._cell_shipyard[self.shipyard_pos] = np.arange(len(self.shipyard_pos))
+        return self._cell_shipyard
+
+    # ===simulation===
+    def next(self):
+        board = self.copy()
+        board._advance()
+        return board
+
+    def _group_by_player(self):
+        order = np.argsort(self.ship_owner, kind='stable')
+        self.ship_ids = [self.ship_ids[i] for i in order]
+        self.ship_pos = self.ship_pos[order]
+        self.ship_halite = self.ship_halite[order]
+        self.ship_owner = self.ship_owner[order]
+        self.ship_action = self.ship_action[order]
+        order = np.argsort(self.shipyard_owner, kind='stable')
+        self.shipyard_ids = [self.shipyard_ids[i] for i in order]
+        self.shipyard_pos = self.shipyard_pos[order]
+        self.shipyard_owner = self.shipyard_owner[order]
+        self.shipyard_action = self.shipyard_action[order]
+        self._reset_lookups()
+
+    def _advance(self):
+        configuration = self._configuration
+        size = self._size
+        cell_count = size ** 2
+        spawn_cost = configuration.spawn_cost
+        convert_cost = configuration.convert_cost
+        uid_counter = 0
+
+        # kaggle rebuilds the board grouped by player before applying actions, new entities are appended after
+        self._group_by_player()
+        ship_pos = self.ship_pos
+        ship_halite = self.ship_halite
+        ship_owner = self.ship_owner
+        ship_action = self.ship_action
+        ship_ids = self.ship_ids
+        cell_has_shipyard = self.cell_shipyard() >= 0
+
+        ship_keep = np.ones(len(ship_pos), dtype=bool)
+        new_ship_ids, new_ship_pos, new_ship_owner = [], [], []
+        new_shipyard_ids, new_shipyard_pos, new_shipyard_owner = [], [], []
+
+        # ===spawn and convert, players in order so ids match kaggle===
+        for player_id in range(len(self.player_halite)):
+            spawning = np.flatnonzero((self.shipyard_owner == player_id) & (self.shipyard_action == SPAWN))
+            if len(spawning) > 0:
+                if spawn_cost > 0:
+                    spawning = spawning[:int(self.player_halite[player_id] // spawn_cost)]
+                self.player_halite[player_id] -= spawn_cost * len(spawning)
+                for index in spawning:
+                    uid_counter += 1
+                    new_ship_ids.append(f'{self._step + 1}-{uid_counter}')
+                    new_ship_pos.append(self.shipyard_pos[index])
+                    new_ship_owner.append(player_id)
+
+            converting = np.flatnonzero((ship_owner == player_id) & (ship_action == CONVERT) &
+                                        ~cell_has_shipyard[ship_pos])
+            if len(converting) > 0:
+                # halite a player has to top up for each convert, conversions are funded in ship order
+                shortfall = np.maximum(convert_cost - ship_halite[converting], 0)
+                if shortfall.sum() > self.player_halite[player_id]:
+                    funded = []
+                    available = self.player_halite[player_id]
+                    for index, cost in zip(converting, shortfall):
+                        if cost <= available:
+                            funded.append(index)
+                            available -= cost
+                    converting = np.array(funded, dtype=np.int64)
+                    shortfall = np.maximum(convert_cost - ship_halite[converting], 0)
+                leftover = np.maximum(ship_halite[converting] - convert_cost, 0)
+                self.player_halite[player_id] += leftover.sum() - shortfall.sum()
+                ship_keep[converting] = False
+                self.halite[ship_pos[converting]] = 0
+                for index in converting:
+                    uid_counter += 1
+                    new_shipyard_ids.append(f'{self._step + 1}-{uid_counter}')
+                    new_shipyard_pos.append(ship_pos[index])
+                    new_shipyard_owner.append(player_id)
+
+        # ===move===
+        moving = (ship_action > 0) & (ship_action < CONVERT)
+        row = (ship_pos // size + _row_delta[ship_action]) % size
+        col = (ship_pos % size + _col_delta[ship_action]) % size
+        ship_pos = row * size + col
+        if configuration.move_cost:
+            ship_halite = np.where(moving, ship_halite * (1 - configuration.move_cost), ship_halite)
+
+        # survivors of spawn/convert keep their order, spawned ships are appended
+        if not ship_keep.all():
+            kept = np.flatnonzero(ship_keep)
+            ship_ids = [ship_ids[i] for i in kept]
+            ship_pos, ship_halite, ship_owner, moving = \
+                ship_pos[kept], ship_halite[kept], ship_owner[kept], moving[kept]
+        if new_ship_ids:
+            ship_ids = ship_ids + new_ship_ids
+            ship_pos = np.concatenate([ship_pos, np.array(new_ship_pos, dtype=np.int64)])
+            ship_halite = np.concatenate([ship_halite, np.zeros(len(new_ship_ids))])
+            ship_owner = np.concatenate([ship_owner, np.array(new_ship_owner, dtype=np.int64)])
+            moving = np.concatenate([moving, np.zeros(len(new_ship_ids), dtype=bool)])
+        shipyard_ids = self.shipyard_ids
+        shipyard_pos = self.shipyard_pos
+        shipyard_owner = self.shipyard_owner
+        if new_shipyard_ids:
+            shipyard_ids = shipyard_ids + new_shipyard_ids
+            shipyard_pos = np.concatenate([shipyard_pos, np.array(new_shipyard_pos, dtype=np.int64)])
+            shipyard_owner = np.concatenate([shipyard_owner, np.array(new_shipyard_owner, dtype=np.int64)])
+
+        # ===ship to ship collisions===
+        ship_keep = np.ones(len(ship_pos), dtype=bool)
+        ships_per_cell = np.bincount(ship_pos, minlength=cell_count)
+        if len(ship_pos) > 0 and ships_per_cell.max() > 1:
+            contested = ships_per_cell[ship_pos] > 1
+            cell_min = np.full(cell_count, np.inf)
+            np.minimum.at(cell_min, ship_pos, ship_halite)
+            is_min = ship_halite == cell_min[ship_pos]
+            min_per_cell = np.bincount(ship_pos[is_min], minlength=cell_count)
+            cell_total = np.bincount(ship_pos, weights=ship_halite, minlength=cell_count)
+            # lightest ship wins and takes the cargo of the others, a tie for lightest destroys everyone
+            winner = contested & is_min & (min_per_cell[ship_pos] == 1)
+            ship_halite = np.where(winner, cell_total[ship_pos], ship_halite)
+            ship_keep = ~contested | winner
+
+        # ===ship to shipyard collisions===
+        cell_ship = np.full(cell_count, -1, dtype=np.int64)
+        cell_ship[ship_pos[ship_keep]] = np.flatnonzero(ship_keep)
+        shipyard_keep = np.ones(len(shipyard_pos), dtype=bool)
+        docked = cell_ship[shipyard_pos]
+        occupied = docked >= 0
+        if occupied.any():
+            hostile = np.zeros(len(shipyard_pos), dtype=bool)
+            hostile[occupied] = ship_owner[docked[occupied]] != shipyard_owner[occupied]
+            shipyard_keep[hostile] = False
+            ship_keep[docked[hostile]] = False
+            cell_ship[shipyard_pos[hostile]] = -1
+
+            # ===deposit===
+            friendly = occupied & ~hostile
+            np.add.at(self.player_halite, shipyard_owner[friendly], ship_halite[docked[friendly]])
+            ship_halite[docked[friendly]] = 0
+
+        if not ship_keep.all():
+            kept = np.flatnonzero(ship_keep)
+            ship_ids = [ship_ids[i] for i in kept]
+            ship_pos, ship_halite, ship_owner, moving = \
+                ship_pos[kept], ship_halite[kept], ship_owner[kept], moving[kept]
+        if not shipyard_keep.all():
+            kept = np.flatnonzero(shipyard_keep)
+            shipyard_ids = [shipyard_ids[i] for i in kept]
+            shipyard_pos, shipyard_owner = shipyard_pos[kept], shipyard_owner[kept]
+
+        # ===collect===
+        cell_has_shipyard = np.zeros(cell_count, dtype=bool)
+        cell_has_shipyard[shipyard_pos] = True
+        collected = np.trunc(self.halite[ship_pos] * configuration.collect_rate)
+        collecting = ~moving & ~cell_has_shipyard[ship_pos] & (collected > 0)
+        ship_halite[collecting] += collected[collecting]
+        self.halite[ship_pos[collecting]] -= collected[collecting]
+
+        # ===regenerate===
+        free = np.ones(cell_count, dtype=bool)
+        free[ship_pos] = False
+        self.halite[free] = np.minimum(_round_3(self.halite[free] * (1 + configuration.regen_rate)),
+                                       configuration.max_cell_halite)
+
+        # ===store===
+        self.ship_ids = ship_ids
+        self.ship_pos = ship_pos
+        self.ship_halite = ship_halite
+        self.ship_owner = ship_owner
+        self.ship_action = np.zeros(len(ship_pos), dtype=np.int8)
+        self.shipyard_ids = shipyard_ids
+        self.shipyard_pos = shipyard_pos
+        self.shipyard_owner = shipyard_owner
+        self.shipyard_action = np.zeros(len(shipyard_pos), dtype=np.int8)
+        self._step += 1
+        self._reset_lookups()
+
+
+class array_player():
+    def __init__(self, board, player_id):
+        self._board = board
+        self._id = player_id
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def halite(self):
+        return self._board.player_halite[self._id].item()
+
+    @property
+    def ship_ids(self):
+        return [self._board.ship_ids[i] for i in np.flatnonzero(self._board.ship_owner == self._id)]
+
+    @property
+    def shipyard_ids(self):
+        return [self._board.shipyard_ids[i] for i in np.flatnonzero(self._board.shipyard_owner == self._id)]
+
+    @property
+    def ships(self):
+        return [array_ship(self._board, i) for i in np.flatnonzero(self._board.ship_owner == self._id)]
+
+    @property
+    def shipyards(self):
+        return [array_shipyard(self._board, i) for i in np.flatnonzero(self._board.shipyard_owner == self._id)]
+
+    @property
+    def is_current_player(self):
+        return self._id == self._board.current_player_id
+
+    @property
+    def next_actions(self):
+        return self._board.next_actions()[self._id]
+
+
+class array_ship():
+    def __init__(self, board, index):
+        self._board = board
+        self._index = index
+
+    @property
+    def id(self):
+        return self._board.ship_ids[self._index]
+
+    @property
+    def position(self):
+        return Point.from_index(int(self._board.ship_pos[self._index]), self._board.configuration.size)
+
+    @property
+    def halite(self):
+        return self._board.ship_halite[self._index].item()
+
+    @property
+    def player_id(self):
+        return int(self._board.ship_owner[self._index])
+
+    @property
+    def player(self):
+        return array_player(self._board, self.player_id)
+
+    @property
+    def cell(self):
+        return array_cell(self._board, int(self._board.ship_pos[self._index]))
+
+    @property
+    def next_action(self):
+        return _ship_actions[self._board.ship_action[self._index]]
+
+    @next_action.setter
+    def next_action(self, value):
+        self._board.ship_action[self._index] = _ship_action_codes[value]
+
+
+class array_shipyard():
+    def __init__(self, board, index):
+        self._board = board
+        self._index = index
+
+    @property
+    def id(self):
+        return self._board.shipyard_ids[self._index]
+
+    @property
+    def position(self):
+        return Point.from_index(int(self._board.shipyard_pos[self._index]), self._board.configuration.size)
+
+    @property
+    def player_id(self):
+        return int(self._board.shipyard_owner[self._index])
+
+    @property
+    def player(self):
+        return array_player(self._board, self.player_id)
+
+    @property
+    def cell(self):
+        return array_cell(self._board, int(self._board.shipyard_pos[self._index]))
+
+    @property
+    def next_action(self):
+        return _shipyard_actions[self._board.shipyard_action[self._index]]
+
+    @next_action.setter
+    def next_action(self, value):
+        self._board.shipyard_action[self._index] = _shipyard_action_codes[value]
+
+
+class array_cell():
+    def __init__(self, board, index):
+        self._board = board
+        self._index = index
+
+    @property
+    def position(self):
+        return Point.from_index(self._index, self._board.configuration.size)
+
+    @property
+    def halite(self):
+        return self._board.halite[self._index].item()
+
+    @property
+    def ship(self):
+        index = self._board.cell_ship()[self._index]
+        return array_ship(self._board, index) if index >= 0 else None
+
+    @property
+    def ship_id(self):
+        index = self._board.cell_ship()[self._index]
+        return self._board.ship_ids[index] if index >= 0 else None
+
+    @property
+    def shipyard(self):
+        index = self._board.cell_shipyard()[self._index]
+        return array_shipyard(self._board, index) if index >= 0 else None
+
+    @property
+    def shipyard_id(self):
+        index = self._board.cell_shipyard()[self._index]
+        return self._board.shipyard_ids[index] if index >= 0 else None
+
+    def neighbor(self, offset):
+        return self._board[self.position + offset]
+
+    @property
+    def north(self):
+        return self.neighbor(ShipAction.NORTH.to_point())
+
+    @property
+    def south(self):
+        return self.neighbor(ShipAction.SOUTH.to_point())
+
+    @property
+    def east(self):
+        return self.neighbor(ShipAction.EAST.to_point())
+
+    @property
+    def west(self):
+        return self.neighbor(ShipAction.WEST.to_point())
@@ -0,0 +1,46 @@
+import numpy as np
+from kaggle_environments import make
+from kaggle_environments.envs.halite.halite import populate_board
+from kaggle_environments.envs.halite.helpers import *
+from halite_rl.environments.helpers.array_board import array_board
+
+# NOTE: make("halite") + environment.reset() costs tens of ms and reset() reuses the same random seed, so the envs used
+# to rebuild the whole kaggle environment every episode. board_template makes the kaggle environment once, draws each new
+# halite layout with kaggle's own populate_board under a fresh seed, and replays the scripted opening turns on an
+# array_board instead of Board.next().
+# The layout seeds come from the template's own generator, seed (make(..) randomSeed and that generator) makes the
+# sequence of layouts reproducible. populate_board also reseeds the global random and np.random, nothing here reads them.
+
+
+class board_template():
+    def __init__(self, configuration, agent_count, prime_turns=(), seed=None):
+        # prime_turns: [(entity, action)], entity 'ship' or 'shipyard' is player 0's first one, one entry per turn
+        if seed is not None:
+            configuration = dict(configuration, randomSeed=seed)
+        self.environment = make("halite", configuration=configuration)
+        self.environment.reset(agent_count)
+        self._prime_turns = prime_turns
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        # seed: None, an int or a np.random.SeedSequence, the layouts from here on only depend on it
+        self._rng = np.random.default_rng(seed)
+
+    def new_layout(self):
+        # fresh halite layout and starting ships, written into self.environment.state like a reset would
+        self.environment.configuration.randomSeed = int(self._rng.integers((1 << 31) - 1))
+        populate_board(self.environment.state, self.environment)
+        return self.environment.state[0].observation
+
+    def new_game(self):
+        # array_boards after each opening turn, the last one is the primed board
+        board = array_board(self.new_layout(), self.environment.configuration)
+        boards = []
+        for entity, action in self._prime_turns:
+            if entity == 'ship':
+                board.players[0].ships[0].next_action = action
+            else:
+                board.players[0].shipyards[0].next_action = action
+            board = board.next()
+            boards.append(board)
+        return boards
@@ -0,0 +1,36 @@
+import numpy as np
+
+# NOTE: replaces the state_history list (append, del [:1], np.array(...) every step). The frames live in one
+# preallocated ndarray twice the frame depth, every frame is written at i and i + frames, so the last `frames` frames
+# are always the contiguous slice buffer[i + 1:i + 1 + frames] (oldest first). append is two frame copies and frames()
+# a view, whatever the depth, observation() is the single copy handed to tf_agents.
+
+
+class frame_stack():
+    def __init__(self, frames, frame_shape, dtype=np.float32):
+        self._frame_count = frames
+        self._buffer = np.zeros([2 * frames] + list(frame_shape), dtype=dtype)
+        self._newest = frames - 1
+
+    def reset(self):
+        self._buffer[:] = 0
+        self._newest = self._frame_count - 1
+
+    def append(self, frame):
+        # values are copied (and cast to the stack dtype), the caller may reuse frame
+        self._newest = (self._newest + 1) % self._frame_count
+        self._buffer[self._newest] = frame
+        self._buffer[self._newest + self._frame_count] = frame
+
+    def frames(self):
+        # [frames, ...] view oldest to newest, only valid until the next append / reset
+        return_object = self._buffer[self._newest + 1:self._newest + 1 + self._frame_count]
+        return return_object
+
+    def newest(self):
+        return_object = self._buffer[self._newest + self._frame_count]
+        return return_object
+
+    def observation(self):
+        return_object = self.frames().copy()
+        return return_object
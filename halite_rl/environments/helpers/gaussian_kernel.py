@@ -0,0 +1,55 @@
+import numpy as np
+
+# NOTE: the heatmaps are gaussian_filter'd boards that are zero except for a few hot spots, always with the same board
+# size and sigma. gaussian_kernel caches, per (board_size, sigma, mode), the [board_size, board_size] response matrix of
+# scipy's 1d gaussian (truncate=4): column j is the filtered unit impulse at j. A 2d response is the outer product of a
+# row and a column response, so a heatmap is a sum of those (O(k * size^2) for k sources) and a dense board is
+# kernel_y @ board @ kernel_x.T, same values as ndimage.gaussian_filter.
+# mode 'constant' matches the old gaussian_filter(mode='constant'), 'wrap' treats the board as the torus it is.
+
+_kernels = {}
+
+
+def gaussian_kernel(board_size, sigma, mode='constant'):
+    key = (board_size, float(sigma), mode)
+    if key not in _kernels:
+        if mode not in ('constant', 'wrap'):
+            raise ValueError(f'unknown mode {mode}, expected constant or wrap')
+        kernel = np.zeros([board_size, board_size])
+        source = np.arange(board_size)
+        if sigma <= 0:
+            kernel[source, source] = 1.0
+        else:
+            radius = int(4.0 * sigma + 0.5)
+            offsets = np.arange(-radius, radius + 1)
+            weights = np.exp(-0.5 / sigma ** 2 * offsets ** 2)
+            weights /= weights.sum()
+            for offset, weight in zip(offsets, weights):
+                target = source + offset
+                if mode == 'wrap':
+                    kernel[target % board_size, source] += weight
+                else:
+                    inside = (target >= 0) & (target < board_size)
+                    kernel[target[inside], source[inside]] += weight
+        kernel.setflags(write=False)
+        _kernels[key] = kernel
+    return _kernels[key]
+
+
+def _kernel_pair(board_size, sigma, mode):
+    sigma_y, sigma_x = sigma if np.ndim(sigma) else (sigma, sigma)
+    return gaussian_kernel(board_size, sigma_y, mode), gaussian_kernel(board_size, sigma_x, mode)
+
+
+def gaussian_points(board_size, sigma, rows, cols, values, mode='constant'):
+    # filtered board holding values at (rows, cols), zero elsewhere. Each cell should appear once.
+    kernel_y, kernel_x = _kernel_pair(board_size, sigma, mode)
+    return_object = (kernel_y[:, rows] * values) @ kernel_x[:, cols].T
+    return return_object
+
+
+def gaussian_board(board, sigma, mode='constant'):
+    # filtered [..., board_size, board_size] boards, leading axes are independent boards
+    kernel_y, kernel_x = _kernel_pair(board.shape[-1], sigma, mode)
+    return_object = kernel_y @ board @ kernel_x.T
+    return return_object
@@ -0,0 +1,151 @@
+import copy
+import json
+import math
+import numpy as np
+from os import path
+from random import choice, randint, randrange, sample, seed
+from kaggle_environments import make
+from kaggle_environments.envs.halite.helpers import *
+from kaggle_environments import utils
+from halite_rl.environments.helpers.array_board import array_board, CONVERT, SPAWN, _ship_actions, \
+    _shipyard_actions
+
+def random_agent(board, player):
+    me = player
+    remaining_halite = me.halite
+    ships = me.ships
+    # randomize ship order
+    ships = sample(ships, len(ships))
+    for ship in ships:
+        if ship.cell.halite > ship.halite and randint(0, 1) == 0:
+            # 50% chance to mine
+            continue
+        if ship.cell.shipyard is None and remaining_halite > board.configuration.convert_cost:
+            # 5% chance to convert at any time
+            if randint(0, 19) == 0:
+                remaining_halite -= board.configuration.convert_cost
+                ship.next_action = ShipAction.CONVERT
+                continue
+            # 50% chance to convert if there are no shipyards
+            if randint(0, 1) == 0 and len(me.shipyards) == 0:
+                remaining_halite -= board.configuration.convert_cost
+                ship.next_action = ShipAction.CONVERT
+                continue
+        # None represents the chance to do nothing
+        ship.next_action = choice(ShipAction.moves())
+    shipyards = me.shipyards
+    # randomize shipyard order
+    shipyards = sample(shipyards, len(shipyards))
+    ship_count = len(player.ships)
+    for shipyard in shipyards:
+        # If there are no ships, always spawn if possible
+        if ship_count == 0 and remaining_halite > board.configuration.spawn_cost:
+            remaining_halite -= board.configuration.spawn_cost
+            shipyard.next_action = ShipyardAction.SPAWN
+        # 20% chance to spawn if no ships
+        elif randint(0, 4) == 0 and remaining_halite > board.configuration.spawn_cost:
+            remaining_halite -= board.configuration.spawn_cost
+            shipyard.next_action = ShipyardAction.SPAWN
+
+def _affordable(remaining, cost):
+    # how many purchases pass the 'remaining > cost' check when each one deducts cost
+    if cost <= 0:
+        return np.where(remaining > cost, np.inf, 0)
+    return np.maximum(np.ceil(remaining / cost) - 1, 0)
+
+
+def _rank_by(priority, group):
+    # rank of each element inside its group when the group is ordered by priority
+    order = np.lexsort((priority, group))
+    sorted_group = group[order]
+    rank = np.empty(len(group), dtype=np.int64)
+    rank[order] = np.arange(len(group)) - np.searchsorted(sorted_group, sorted_group, side='left')
+    return rank
+
+
+def _random_actions(configuration, game_count, remaining, ship_game, ship_cell_halite, ship_halite, ship_on_shipyard,
+                    shipyard_game, rng):
+    # the random_agent decisions of one player's ships and shipyards in every game, all rolls drawn in one call.
+    # the random ship/shipyard order becomes a random priority used to decide who gets funded first.
+    # returns the array_board action codes of the ships and the shipyards
+    convert_cost = configuration.convert_cost
+    spawn_cost = configuration.spawn_cost
+    remaining = np.array(remaining, dtype=np.float64)
+    rolls = rng.random((len(ship_game) + len(shipyard_game), 5))
+    ship_rolls, shipyard_rolls = rolls[:len(ship_game)], rolls[len(ship_game):]
+    shipyard_count = np.bincount(shipyard_game, minlength=game_count)
+    ship_count = np.bincount(ship_game, minlength=game_count)
+
+    # 50% chance to mine
+    mining = (ship_cell_halite > ship_halite) & (ship_rolls[:, 0] < 0.5)
+    # 5% chance to convert at any time, 50% chance to convert if there are no shipyards
+    converting = ~mining & ~ship_on_shipyard & \
+        ((ship_rolls[:, 1] < 0.05) | ((ship_rolls[:, 2] < 0.5) & (shipyard_count[ship_game] == 0)))
+    # funding is only worked out when someone asks for it, most turns nobody does
+    if converting.any():
+        converting[converting] = _rank_by(ship_rolls[converting, 4], ship_game[converting]) < \
+            _affordable(remaining, convert_cost)[ship_game[converting]]
+        remaining -= convert_cost * np.bincount(ship_game[converting], minlength=game_count)
+
+    ship_actions = 1 + (ship_rolls[:, 3] * 4).astype(np.int8)
+    ship_actions[converting] = CONVERT
+    ship_actions[mining] = 0
+
+    # always spawn if there are no ships, otherwise 20% chance to spawn
+    spawning = (ship_count[shipyard_game] == 0) | (shipyard_rolls[:, 0] < 0.2)
+    if spawning.any():
+        spawning[spawning] = _rank_by(shipyard_rolls[spawning, 4], shipyard_game[spawning]) < \
+            _affordable(remaining, spawn_cost)[shipyard_game[spawning]]
+    shipyard_actions = np.where(spawning, SPAWN, 0).astype(np.int8)
+    return ship_actions, shipyard_actions
+
+
+def batched_random_agent(board, player_id, rng):
+    # random_agent for every game of a batched_board at once, same probabilities
+    cell_count = board.configuration.size ** 2
+    ships = np.flatnonzero(board.ship_owner == player_id)
+    shipyards = np.flatnonzero(board.shipyard_owner == player_id)
+    ship_game = board.ship_game[ships]
+    ship_cell = ship_game * cell_count + board.ship_pos[ships]
+    cell_has_shipyard = np.zeros(board.batch_size * cell_count, dtype=bool)
+    cell_has_shipyard[board.shipyard_game * cell_count + board.shipyard_pos] = True
+
+    ship_actions, shipyard_actions = _random_actions(
+        board.configuration, board.batch_size, board.player_halite[:, player_id], ship_game,
+        board.halite.reshape(-1)[ship_cell], board.ship_halite[ships], cell_has_shipyard[ship_cell],
+        board.shipyard_game[shipyards], rng)
+    board.ship_action[ships] = ship_actions
+    board.shipyard_action[shipyards] = shipyard_actions
+
+
+def vectorized_random_agent(board, player_id, rng):
+    # random_agent for one player of an array_board or a kaggle Board, same probabilities, one rng call per turn
+    if isinstance(board, array_board):
+        ships = np.flatnonzero(board.ship_owner == player_id)
+        shipyards = np.flatnonzero(board.shipyard_owner == player_id)
+        ship_pos = board.ship_pos[ships]
+        ship_actions, shipyard_actions = _random_actions(
+            board.configuration, 1, board.player_halite[player_id:player_id + 1], np.zeros(len(ships), dtype=np.int64),
+            board.halite[ship_pos], board.ship_halite[ships], board.cell_shipyard()[ship_pos] >= 0,
+            np.zeros(len(shipyards), dtype=np.int64), rng)
+        board.ship_action[ships] = ship_actions
+        board.shipyard_action[shipyards] = shipyard_actions
+        return
+
+    player = board.players[player_id]
+    ships = player.ships
+    shipyards = player.shipyards
+    # [cell halite, ship halite, cell has a shipyard] of every ship
+    cells = [ship.cell for ship in ships]
+    ship_state = np.array([(cell.halite, ship.halite, cell.shipyard_id is not None) for cell, ship in zip(cells, ships)],
+                          dtype=np.float64).reshape(-1, 3)
+    ship_actions, shipyard_actions = _random_actions(
+        board.configuration, 1, [player.halite], np.zeros(len(ships), dtype=np.int64), ship_state[:, 0],
+        ship_state[:, 1], ship_state[:, 2] > 0, np.zeros(len(shipyards), dtype=np.int64), rng)
+    # mining ships and idle shipyards keep their action, like random_agent
+    for ship, code in zip(ships, ship_actions.tolist()):
+        if code != 0:
+            ship.next_action = _ship_actions[code]
+    for shipyard, code in zip(shipyards, shipyard_actions.tolist()):
+        if code != 0:
+            shipyard.next_action = _shipyard_actions[code]
@@ -0,0 +1,59 @@
+import math
+import numpy as np
+
+# NOTE: the premade sprites of image_render, image_render_v2, image_render_v3 and headless_render, built with boolean
+# masks instead of per pixel loops and stacked into one contiguous read only [sprite, s, s, 3] uint8 BGR atlas. Atlases
+# are cached per (board_size, image_dimension), every renderer (and env) of the same size shares one.
+# Halite circles match skimage.draw.circle: pixels strictly inside the radius around the center pixel.
+
+_player_colors = [(255, 0, 0), (0, 0, 255), (0, 255, 255), (0, 255, 0)]  # blue, red, yellow, green
+_halite_color = (255, 255, 0)  # cyan
+_halite_levels = 10
+
+# atlas index of every sprite, also the tile index of headless_render
+sprite_names = [f'circle_sprite_{s}' for s in range(_halite_levels)] + \
+               [f'{kind}_player_{player_id}' for kind in ['ship_sprite', 'shipyard_sprite', 'ship_and_shipyard_sprite']
+                for player_id in range(len(_player_colors))]
+
+_atlases = {}
+
+
+def sprite_masks(sprite_size):
+    # {model name: [s, s] bool}, the _sprite_models of the renderers
+    pixels = np.arange(sprite_size)
+    inner = (pixels > sprite_size / 3) & (pixels < (sprite_size / 3) * 2)
+    ship = inner[:, np.newaxis] & inner[np.newaxis, :]
+    masks = {'ship_sprite': ship, 'shipyard_sprite': ~ship,
+             'ship_and_shipyard_sprite': np.ones([sprite_size, sprite_size], dtype=bool)}
+    distance = (pixels - math.floor(sprite_size / 2)) ** 2
+    distance = distance[:, np.newaxis] + distance[np.newaxis, :]
+    for s in range(_halite_levels):
+        radius = (sprite_size * (s * 3)) / 100
+        masks[f'circle_sprite_{s}'] = distance < radius ** 2
+    return masks
+
+
+def sprite_atlas(board_size, image_dimension=400):
+    # (atlas [sprite, s, s, 3] uint8 in sprite_names order, masks), shared, do not write to either
+    key = (board_size, image_dimension)
+    if key not in _atlases:
+        sprite_size = math.floor(image_dimension / board_size)
+        masks = sprite_masks(sprite_size)
+        shapes = np.stack([masks[f'circle_sprite_{s}'] for s in range(_halite_levels)] +
+                          [masks[kind] for kind in ['ship_sprite', 'shipyard_sprite', 'ship_and_shipyard_sprite']
+                           for _ in _player_colors])
+        colors = np.array([_halite_color] * _halite_levels + _player_colors * 3, dtype=np.uint8)
+        atlas = np.where(shapes[..., np.newaxis], colors[:, np.newaxis, np.newaxis, :], np.uint8(0))
+        atlas.setflags(write=False)
+        for mask in masks.values():
+            mask.setflags(write=False)
+        _atlases[key] = (atlas, masks)
+    return_object = _atlases[key]
+    return return_object
+
+
+def premade_sprites(board_size, image_dimension=400):
+    # {sprite name: [s, s, 3] read only view into the shared atlas}, the _premade_rendered_sprites of the renderers
+    atlas, _ = sprite_atlas(board_size, image_dimension)
+    return_object = dict(zip(sprite_names, atlas))
+    return return_object
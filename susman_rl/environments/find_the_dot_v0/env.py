@@ -11,6 +11,7 @@ import tensorflow as tf
 from tf_agents.environments import py_environment
 from tf_agents.specs import array_spec
 from tf_agents.trajectories import time_step as ts
+from susman_rl.environments.helpers.frame_repeat import frame_repeat
 
 tf.compat.v1.enable_v2_behavior()
 
@@ -45,7 +46,7 @@ class find_the_dot(py_environment.PyEnvironment):
         self.player_location = {'y': 0, 'x': 0}
         self.set_goal()
         self.game_history = []
-        self.state_history = [self._state] * self.frames
+        self.state_history = frame_repeat(self.frames, self._state.shape, dtype=np.int32)
         self.save_image = False
         self.enable_render_image = True
         self.image_render_counter = 0
@@ -192,10 +193,9 @@ class find_the_dot(py_environment.PyEnvironment):
         self.set_goal()
         self.game_history = []
         self.image_history = []
-        self.state_history = [self._state] * self.frames
         self.render_image()
         self.episode += 1
-        return_object = ts.restart(np.array(self.state_history, dtype=np.int32))
+        return_object = ts.restart(self.state_history.observation(self._state))
         return return_object
 
     def _step(self, action):
@@ -287,11 +287,9 @@ class find_the_dot(py_environment.PyEnvironment):
         self.this_turn += 1
         self.render_image()
 
-        self.state_history.append(self._state)
-        del self.state_history[:1]
         if self._episode_ended:
-            return_object = ts.termination(np.array(self.state_history, dtype=np.int32), reward)
+            return_object = ts.termination(self.state_history.observation(self._state), reward)
             return return_object
         else:
-            return_object = ts.transition(np.array(self.state_history, dtype=np.int32), reward=reward, discount=1.0)
+            return_object = ts.transition(self.state_history.observation(self._state), reward=reward, discount=1.0)
             return return_object
@@ -0,0 +1,18 @@
+import numpy as np
+
+# NOTE: the find_the_dot observation, the current state repeated `frames` times. The envs kept [self._state] * frames,
+# every entry the same array mutated in place, and rebuilt the [frames, ...] tensor with np.array(...) every step. Here
+# the state is broadcast into one new array per call instead (same values, cast to dtype like np.array did), without
+# walking a list of `frames` references.
+
+
+class frame_repeat():
+    def __init__(self, frames, frame_shape, dtype=np.int32):
+        self._shape = [frames] + list(frame_shape)
+        self._dtype = dtype
+
+    def observation(self, state):
+        # new array every call, tf_agents keeps the time steps
+        return_object = np.empty(self._shape, dtype=self._dtype)
+        return_object[:] = state
+        return return_object